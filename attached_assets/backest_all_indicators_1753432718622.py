@@ -1,9 +1,15 @@
+import sys
+from pathlib import Path
 import yfinance as yf
 import ta
 import pandas as pd
 from datetime import date, timedelta, datetime
 from IPython.display import clear_output
 
+# run_stock_ta_backtest is the compiled version from the server services
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+from services.ta_backtest import run_stock_ta_backtest
+
 pd.set_option("display.max_columns", None)
 pd.set_option("display.max_rows", None)
 
@@ -649,218 +655,6 @@ drawdown_pct = (mv_df.MV / roll_max - 1) * 100
 print("Max Drawdown Value:", round(drawdown_val.min(), 0))
 print("Max Drawdown %:", round(drawdown_pct.min(), 2))
 
-def run_stock_ta_backtest(bt_df, stop_loss_lvl=None):
-    balance = 1000000
-    pnl = 0
-    position = 0
-
-    last_signal = "hold"
-    last_price = 0
-    c = 0
-
-    trade_date_start = []
-    trade_date_end = []
-    trade_days = []
-    trade_side = []
-    trade_pnl = []
-    trade_ret = []
-
-    cum_value = []
-
-    for index, row in bt_df.iterrows():
-        # check and close any positions
-        if row.EXIT_LONG and last_signal == "long":
-            trade_date_end.append(row.name)
-            trade_days.append(c)
-
-            pnl = (row.Open - last_price) * position
-            trade_pnl.append(pnl)
-            trade_ret.append((row.Open / last_price - 1) * 100)
-
-            balance = balance + row.Open * position
-
-            position = 0
-            last_signal = "hold"
-
-            c = 0
-
-        elif row.EXIT_SHORT and last_signal == "short":
-            trade_date_end.append(row.name)
-            trade_days.append(c)
-
-            pnl = (row.Open - last_price) * position
-            trade_pnl.append(pnl)
-            trade_ret.append((last_price / row.Open - 1) * 100)
-
-            balance = balance + pnl
-
-            position = 0
-            last_signal = "hold"
-
-            c = 0
-
-        # check signal and enter any possible position
-        if row.LONG and last_signal != "long":
-            last_signal = "long"
-            last_price = row.Open
-            trade_date_start.append(row.name)
-            trade_side.append("long")
-
-            position = int(balance / row.Open)
-            cost = position * row.Open
-            balance = balance - cost
-
-            c = 0
-
-        elif row.SHORT and last_signal != "short":
-            last_signal = "short"
-            last_price = row.Open
-            trade_date_start.append(row.name)
-            trade_side.append("short")
-
-            position = int(balance / row.Open) * -1
-
-            c = 0
-
-        if stop_loss_lvl:
-            # check stop loss
-            if (
-                last_signal == "long"
-                and (row.Low / last_price - 1) * 100 <= stop_loss_lvl
-            ):
-                c = c + 1
-
-                trade_date_end.append(row.name)
-                trade_days.append(c)
-
-                stop_loss_price = last_price + round(
-                    last_price * (stop_loss_lvl / 100), 4
-                )
-
-                pnl = (stop_loss_price - last_price) * position
-                trade_pnl.append(pnl)
-                trade_ret.append((stop_loss_price / last_price - 1) * 100)
-
-                balance = balance + stop_loss_price * position
-
-                position = 0
-                last_signal = "hold"
-
-                c = 0
-
-            elif (
-                last_signal == "short"
-                and (last_price / row.Low - 1) * 100 <= stop_loss_lvl
-            ):
-                c = c + 1
-
-                trade_date_end.append(row.name)
-                trade_days.append(c)
-
-                stop_loss_price = last_price - round(
-                    last_price * (stop_loss_lvl / 100), 4
-                )
-
-                pnl = (stop_loss_price - last_price) * position
-                trade_pnl.append(pnl)
-                trade_ret.append((last_price / stop_loss_price - 1) * 100)
-
-                balance = balance + pnl
-
-                position = 0
-                last_signal = "hold"
-
-                c = 0
-
-        # compute market value and count days for any possible poisition
-        if last_signal == "hold":
-            market_value = balance
-        elif last_signal == "long":
-            c = c + 1
-            market_value = position * row.Close + balance
-        else:
-            c = c + 1
-            market_value = (row.Close - last_price) * position + balance
-
-        cum_value.append(market_value)
-
-    # generate analysis
-    # performance over time
-    cum_ret_df = pd.DataFrame(cum_value, index=bt_df.index, columns=["CUM_RET"])
-    cum_ret_df["CUM_RET"] = (cum_ret_df.CUM_RET / 1000000 - 1) * 100
-    cum_ret_df["BUY_HOLD"] = (bt_df.Close / bt_df.Open.iloc[0] - 1) * 100
-    cum_ret_df["ZERO"] = 0
-
-    # trade stats
-    size = min(len(trade_date_start), len(trade_date_end))
-
-    tarde_dict = {
-        "START": trade_date_start[:size],
-        "END": trade_date_end[:size],
-        "SIDE": trade_side[:size],
-        "DAYS": trade_days[:size],
-        "PNL": trade_pnl[:size],
-        "RET": trade_ret[:size],
-    }
-
-    trade_df = pd.DataFrame(tarde_dict)
-
-    num_trades = trade_df.groupby("SIDE").count()[["START"]]
-    num_trades_win = trade_df[trade_df.PNL > 0].groupby("SIDE").count()[["START"]]
-
-    avg_days = trade_df.groupby("SIDE").mean()[["DAYS"]]
-
-    avg_ret = trade_df.groupby("SIDE").mean()[["RET"]]
-    avg_ret_win = trade_df[trade_df.PNL > 0].groupby("SIDE").mean()[["RET"]]
-    avg_ret_loss = trade_df[trade_df.PNL < 0].groupby("SIDE").mean()[["RET"]]
-
-    std_ret = trade_df.groupby("SIDE").std()[["RET"]]
-
-    detail_df = pd.concat(
-        [
-            num_trades,
-            num_trades_win,
-            avg_days,
-            avg_ret,
-            avg_ret_win,
-            avg_ret_loss,
-            std_ret,
-        ],
-        axis=1,
-        sort=False,
-    )
-
-    detail_df.columns = [
-        "NUM_TRADES",
-        "NUM_TRADES_WIN",
-        "AVG_DAYS",
-        "AVG_RET",
-        "AVG_RET_WIN",
-        "AVG_RET_LOSS",
-        "STD_RET",
-    ]
-
-    detail_df.round(2)
-
-    # max drawdown
-    mv_df = pd.DataFrame(cum_value, index=bt_df.index, columns=["MV"])
-
-    days = len(mv_df)
-
-    roll_max = mv_df.MV.rolling(window=days, min_periods=1).max()
-    drawdown_val = mv_df.MV - roll_max
-    drawdown_pct = (mv_df.MV / roll_max - 1) * 100
-
-    # return all stats
-    return {
-        "cum_ret_df": cum_ret_df,
-        "max_drawdown": {
-            "value": round(drawdown_val.min(), 0),
-            "pct": round(drawdown_pct.min(), 2),
-        },
-        "trade_stats": detail_df,
-    }
-
 result = run_stock_ta_backtest(bt_df)
 
 result["cum_ret_df"].plot(figsize=(15, 5))
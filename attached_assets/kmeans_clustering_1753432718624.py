@@ -1,21 +1,24 @@
 # Import dependencies
+import sys
+from pathlib import Path
 import pandas as pd
 from sklearn.cluster import KMeans
 import pylab as pl
 from math import sqrt
-import yfinance as yf
 import datetime as dt
-from pandas_datareader import data as pdr
 import tickers as ti
 
+# Batched, rate-limited downloads through the server's bar cache
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+from services.universe import UniverseLoader
+
 # Load stock data from Dow Jones Index
-yf.pdr_override()
 stocks = ti.tickers_dow()
-start_date = dt.datetime(2010, 1, 1)
-end_date = dt.datetime.now()
+start_date = dt.date(2010, 1, 1)
+end_date = dt.date.today()
 
 # Retrieve adjusted closing prices
-data = pdr.get_data_yahoo(stocks, start=start_date, end=end_date)['Close']
+data = UniverseLoader.close_prices(UniverseLoader().load(stocks, start_date.isoformat(), end_date.isoformat()))
 
 # Calculate annual mean returns and variances
 annual_returns = data.pct_change().mean() * 252
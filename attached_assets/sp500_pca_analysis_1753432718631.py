@@ -1,23 +1,32 @@
 # Import necessary libraries
+import sys
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import yfinance as yf
 import datetime
+import tickers as ti
 from sklearn.decomposition import PCA
-from pandas_datareader import data as pdr
 from pylab import rcParams
 
+# Batched, rate-limited downloads through the server's bar cache
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+from services.universe import UniverseLoader
+
 # Set parameters and retrieve stock tickers
 num_years = 1
 start_date = datetime.date.today() - datetime.timedelta(days=365.25 * num_years)
 end_date = datetime.date.today()
-tickers = yf.Tickers(' '.join(ti.tickers_sp500())).history(start=start_date, end=end_date)
+tickers = ti.tickers_sp500()
+
+# Adjusted closing prices of the index and all stocks, downloaded in batches
+loader = UniverseLoader()
+prices = loader.close_prices(loader.load(['^GSPC'] + tickers, start_date.isoformat(), end_date.isoformat()))
 
 # Calculate log differences of prices for market index and stocks
-market_prices = pdr.get_data_yahoo('^GSPC', start_date, end_date)['Adj Close']
+market_prices = prices.pop('^GSPC')
 market_log_returns = np.log(market_prices).diff()
-stock_prices = pdr.get_data_yahoo(tickers, start_date, end_date)['Adj Close']
+stock_prices = prices
 stock_log_returns = np.log(stock_prices).diff()
 
 # Plot daily returns of S&P 500 stocks
@@ -1,6 +1,7 @@
 # Import necessary libraries
+import sys
 import datetime as dt
-import yfinance as yf
+from pathlib import Path
 import pandas as pd
 import requests
 import bs4 as bs
@@ -8,6 +9,10 @@ import matplotlib.pyplot as plt
 from sklearn.cluster import KMeans
 from sklearn.mixture import GaussianMixture
 
+# Batched, rate-limited downloads through the server's bar cache
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+from services.universe import UniverseLoader
+
 # Function to fetch S&P 100 tickers from Wikipedia
 def fetch_sp100_tickers():
     response = requests.get("https://en.wikipedia.org/wiki/S%26P_100")
@@ -16,21 +21,16 @@ def fetch_sp100_tickers():
     tickers = [row.findAll("td")[0].text.strip() for row in table.findAll("tr")[1:]]
     return tickers
 
-# Download historical data for each ticker
+# Download historical data for all tickers in batched requests
 def download_stock_data(tickers):
-    start_date = dt.datetime(1990, 1, 1)
+    start_date = dt.date(1990, 1, 1)
     end_date = dt.date.today()
-    all_data = pd.DataFrame()
-
-    for ticker in tickers:
-        try:
-            data = yf.download(ticker, start=start_date, end=end_date)
-            data['Symbol'] = ticker
-            all_data = all_data.append(data)
-        except Exception as e:
-            print(f"Error downloading {ticker}: {e}")
-    
-    return all_data
+    loader = UniverseLoader()
+    frames = loader.load(tickers, start_date.isoformat(), end_date.isoformat())
+    for ticker, error in loader.failed.items():
+        print(f"Error downloading {ticker}: {error}")
+
+    return UniverseLoader.to_long_frame(frames)
 
 # Add technical indicators to the data
 def add_technical_indicators(data):
@@ -0,0 +1,217 @@
+"""Benchmarks for the strategies and the backtest engine on synthetic bars.
+
+Runs without network: bars are a seeded geometric Brownian motion (or plain
+random walk), so every run times identical inputs. From the ``server``
+directory::
+
+    python -m benchmarks.run_benchmarks --sizes 1000,100000 --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 1000,100000 --compare bench.json
+
+Results are JSON: environment metadata plus min/median seconds per
+``<benchmark>@<bars>``. With ``--compare`` each benchmark is reported as a
+ratio to the baseline file, and ``--fail-on-regression`` exits non-zero if
+any is slower than ``--threshold``. ``benchmarks/baseline.json`` holds the
+reference run at the default settings; compare against it on the same
+machine, or regenerate it there first::
+
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from services.backtest_service import BacktestService
+from services.strategy_service import StrategyService
+from services.ta_backtest import run_stock_ta_backtest
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_STRATEGIES = ['moving_average', 'bollinger_bands', 'rsi', 'macd', 'lstm_model']
+
+
+def synthetic_bars(n_bars: int, seed: int = 0, model: str = 'gbm') -> pd.DataFrame:
+    """Deterministic OHLCV bars in the columnar layout of DataService.fetch_bars.
+
+    ``gbm`` compounds log-normal returns; ``random_walk`` adds normal price
+    steps to a level high enough to stay positive. Bars are one minute
+    apart so 10M bars still fit in the datetime64 range.
+    """
+    rng = np.random.default_rng(seed)
+    if model == 'gbm':
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n_bars)))
+    elif model == 'random_walk':
+        close = np.abs(10_000 + np.cumsum(rng.normal(0, 1, n_bars))) + 1
+    else:
+        raise ValueError(f"Unknown synthetic price model '{model}'")
+
+    open_ = close * (1 + rng.normal(0, 0.003, n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n_bars)))
+    volume = rng.integers(100_000, 1_000_000, n_bars).astype(np.float64)
+    index = pd.date_range('1990-01-01', periods=n_bars, freq='min', name='Date')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+
+def ta_backtest_frame(bars: pd.DataFrame, fast: int = 10, slow: int = 30) -> pd.DataFrame:
+    """Research-script frame with moving-average crossover LONG/SHORT signals"""
+    close = bars['close']
+    above = close.rolling(fast).mean() > close.rolling(slow).mean()
+    long_ = (above & ~above.shift(1, fill_value=False)).shift(1, fill_value=False)
+    short = (~above & above.shift(1, fill_value=False)).shift(1, fill_value=False)
+    return pd.DataFrame({
+        'Open': bars['open'], 'High': bars['high'], 'Low': bars['low'], 'Close': close,
+        'LONG': long_, 'EXIT_LONG': short, 'SHORT': short, 'EXIT_SHORT': long_
+    }, index=bars.index)
+
+
+def time_call(func: Callable[..., Any], repeat: int,
+              setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Run ``func`` ``repeat`` times; min and median wall seconds.
+
+    With ``setup``, each call gets a fresh ``func(setup())`` and only
+    ``func`` is timed.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return {'min_s': min(timings), 'median_s': statistics.median(timings), 'repeat': repeat}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVER_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, library versions and commit the numbers were taken on"""
+    try:
+        import numba
+        numba_version = numba.__version__
+    except ImportError:
+        numba_version = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'numba': numba_version
+    }
+
+
+def run_benchmarks(sizes: List[int], strategies: List[str], repeat: int = 3,
+                   seed: int = 0, model: str = 'gbm') -> Dict[str, Any]:
+    """Time every benchmark at every size"""
+    strategy_service = StrategyService()
+    backtest = BacktestService()
+    initial_capital = 10000
+    commission = 0.001
+    results = {}
+
+    def record(name: str, n_bars: int, func: Callable[..., Any],
+               setup: Optional[Callable[[], Any]] = None) -> None:
+        key = f'{name}@{n_bars}'
+        results[key] = time_call(func, repeat, setup)
+        print(f"{key:45s} min {results[key]['min_s'] * 1000:10.2f} ms", file=sys.stderr)
+
+    for n_bars in sizes:
+        bars = synthetic_bars(n_bars, seed, model)
+
+        for strategy_name in strategies:
+            strategy = strategy_service.create_strategy_instance(strategy_name, {})
+            # A fresh frame per call, copied outside the timing, so memoized
+            # indicators are not reused across repeats
+            record(f'generate_signals.{strategy_name}', n_bars, strategy.generate_signals, bars.copy)
+
+        signals_df = strategy_service.create_strategy_instance('moving_average', {}).generate_signals(bars)
+        portfolio = backtest._simulate_portfolio(signals_df, initial_capital, commission)
+        trades = backtest._extract_trades(portfolio)
+
+        record('execute_backtest', n_bars,
+               lambda: backtest._execute_backtest(signals_df, initial_capital, commission, 'moving_average'))
+        record('extract_trades', n_bars, lambda: backtest._extract_trades(portfolio))
+        record('calculate_metrics', n_bars,
+               lambda: backtest._calculate_metrics(portfolio, trades, initial_capital))
+
+        bt_df = ta_backtest_frame(bars)
+        run_stock_ta_backtest(bt_df, -5)  # compile the kernel outside the timing
+        record('run_stock_ta_backtest', n_bars, lambda: run_stock_ta_backtest(bt_df, -5))
+
+    return {
+        'environment': environment(),
+        'settings': {'sizes': sizes, 'strategies': strategies, 'repeat': repeat, 'seed': seed, 'model': model},
+        'results': results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print current/baseline ratios; return the benchmarks slower than threshold"""
+    regressions = []
+    print(f"{'benchmark':45s} {'baseline ms':>12s} {'current ms':>12s} {'ratio':>7s}")
+    for key, timing in current['results'].items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            print(f"{key:45s} {'-':>12s} {timing['min_s'] * 1000:12.2f} {'new':>7s}")
+            continue
+        ratio = timing['min_s'] / previous['min_s'] if previous['min_s'] else float('inf')
+        flag = '  REGRESSION' if ratio > threshold else ''
+        print(f"{key:45s} {previous['min_s'] * 1000:12.2f} {timing['min_s'] * 1000:12.2f} {ratio:7.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma-separated bar counts')
+    parser.add_argument('--strategies', default=','.join(DEFAULT_STRATEGIES),
+                        help='comma-separated strategy ids')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model', choices=['gbm', 'random_walk'], default='gbm')
+    parser.add_argument('--output', help='write results JSON to this path')
+    parser.add_argument('--compare', help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='current/baseline ratio above which a benchmark counts as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    current = run_benchmarks(
+        [int(size) for size in args.sizes.split(',')],
+        [name for name in args.strategies.split(',') if name],
+        args.repeat, args.seed, args.model
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + '\n')
+    if args.compare:
+        regressions = compare(current, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+    elif not args.output:
+        print(json.dumps(current, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
+import { createInterface } from "readline";
+import path from "path";
+
+type Pending = {
+  resolve: (value: any) => void;
+  reject: (reason: Error) => void;
+  onPartial?: (partial: any) => void;
+};
+
+export class PythonWorkerError extends Error {
+  constructor(message: string, public traceback?: string) {
+    super(message);
+  }
+}
+
+// Client for one resident Python worker (server/services/worker.py), which
+// answers one JSON line per request so imports and caches stay warm.
+class PythonWorker {
+  private process: ChildProcessWithoutNullStreams | null = null;
+  private pending = new Map<number, Pending>();
+  private nextId = 1;
+
+  private start(): ChildProcessWithoutNullStreams {
+    const child = spawn("python3", ["-m", "services.worker"], {
+      cwd: path.join(process.cwd(), "server"),
+    });
+
+    createInterface({ input: child.stdout }).on("line", (line) => {
+      let message: { id: number | null; result?: any; partial?: any; error?: string; traceback?: string };
+      try {
+        message = JSON.parse(line);
+      } catch {
+        console.error(`python worker: unparseable response ${line.slice(0, 200)}`);
+        return;
+      }
+      if (message.id === null || message.id === undefined) {
+        return;
+      }
+      const pending = this.pending.get(message.id);
+      if (!pending) {
+        return;
+      }
+      // Streaming methods send partial results before the final response
+      if (message.partial !== undefined) {
+        pending.onPartial?.(message.partial);
+        return;
+      }
+      this.pending.delete(message.id);
+      if (message.error) {
+        pending.reject(new PythonWorkerError(message.error, message.traceback));
+      } else {
+        pending.resolve(message.result);
+      }
+    });
+
+    child.stderr.on("data", (data) => {
+      process.stderr.write(data);
+    });
+
+    child.on("exit", (code) => {
+      this.process = null;
+      const pending = Array.from(this.pending.values());
+      this.pending.clear();
+      for (const { reject } of pending) {
+        reject(new Error(`Python worker exited with code ${code}`));
+      }
+    });
+
+    return child;
+  }
+
+  // Requests sent and not yet answered
+  get inFlight(): number {
+    return this.pending.size;
+  }
+
+  call<T = any>(
+    method: string,
+    params: Record<string, unknown> = {},
+    onPartial?: (partial: any) => void,
+  ): Promise<T> {
+    if (!this.process) {
+      this.process = this.start();
+    }
+    const id = this.nextId++;
+    return new Promise<T>((resolve, reject) => {
+      this.pending.set(id, { resolve, reject, onPartial });
+      this.process!.stdin.write(JSON.stringify({ id, method, params }) + "\n");
+    });
+  }
+
+  stop() {
+    this.process?.kill();
+    this.process = null;
+  }
+}
+
+// Methods that can run for seconds to minutes; everything else is interactive
+const LONG_METHODS = new Set(["run_backtest", "run_backtest_batch"]);
+
+// Each worker process answers its requests one at a time, so long calls get
+// their own workers: a backtest never queues validate_ticker or
+// fetch_stock_data behind it, and concurrent backtests run in parallel.
+class PythonWorkerPool {
+  private interactive = new PythonWorker();
+  private backtests: PythonWorker[];
+
+  constructor(size: number) {
+    this.backtests = Array.from({ length: Math.max(1, size) }, () => new PythonWorker());
+  }
+
+  call<T = any>(
+    method: string,
+    params: Record<string, unknown> = {},
+    onPartial?: (partial: any) => void,
+  ): Promise<T> {
+    if (!LONG_METHODS.has(method)) {
+      return this.interactive.call<T>(method, params, onPartial);
+    }
+    const worker = this.backtests.reduce((idlest, candidate) =>
+      candidate.inFlight < idlest.inFlight ? candidate : idlest,
+    );
+    return worker.call<T>(method, params, onPartial);
+  }
+
+  stop() {
+    this.interactive.stop();
+    for (const worker of this.backtests) {
+      worker.stop();
+    }
+  }
+}
+
+// Backtest worker processes, started on first use (QUANTDECK_PYTHON_WORKERS, default 2)
+export const pythonWorker = new PythonWorkerPool(Number(process.env.QUANTDECK_PYTHON_WORKERS) || 2);
@@ -1,8 +1,7 @@
 import type { Express } from "express";
 import { createServer, type Server } from "http";
 import { storage } from "./storage";
-import { spawn } from "child_process";
-import path from "path";
+import { pythonWorker, PythonWorkerError } from "./pythonWorker";
 import { insertBacktestSchema } from "@shared/schema";
 
 export async function registerRoutes(app: Express): Promise<Server> {
@@ -34,52 +33,14 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const { ticker } = req.params;
       const { start_date, end_date } = req.query;
       
-      // Call Python service for data fetching
-      const pythonScript = path.join(process.cwd(), "server/services/data_service.py");
-      const python = spawn("python3", ["-c", `
-import sys
-import os
-sys.path.append('${path.join(process.cwd(), "server/services")}')
-os.chdir('${path.join(process.cwd(), "server/services")}')
-from data_service import DataService
-import json
-
-try:
-    data = DataService.fetch_stock_data('${ticker}', '${start_date}', '${end_date}')
-    print(json.dumps(data))
-except Exception as e:
-    import traceback
-    print(json.dumps({"error": str(e), "traceback": traceback.format_exc()}))
-      `]);
-
-      let output = "";
-      let error = "";
-
-      python.stdout.on("data", (data) => {
-        output += data.toString();
-      });
-
-      python.stderr.on("data", (data) => {
-        error += data.toString();
-      });
-
-      python.on("close", (code) => {
-        if (code !== 0) {
-          return res.status(500).json({ error: error || "Python script failed" });
-        }
-        
-        try {
-          const result = JSON.parse(output);
-          if (result.error) {
-            return res.status(400).json({ error: result.error });
-          }
-          res.json(result);
-        } catch (parseError) {
-          res.status(500).json({ error: "Failed to parse response" });
-        }
-      });
+      // Call the Python worker for data fetching
+      const data = await pythonWorker.call("fetch_stock_data", { ticker, start_date, end_date });
+      res.json(data);
 
     } catch (error) {
+      if (error instanceof PythonWorkerError) {
+        return res.status(400).json({ error: error.message });
+      }
       res.status(500).json({ error: "Failed to fetch market data" });
     }
   });
@@ -89,48 +50,13 @@ except Exception as e:
     try {
       const { ticker } = req.params;
       
-      const pythonScript = spawn("python3", ["-c", `
-import sys
-import os
-sys.path.append('${path.join(process.cwd(), "server/services")}')
-os.chdir('${path.join(process.cwd(), "server/services")}')
-from data_service import DataService
-import json
-
-try:
-    is_valid = DataService.validate_ticker('${ticker}')
-    info = DataService.get_ticker_info('${ticker}') if is_valid else {}
-    print(json.dumps({"valid": is_valid, "info": info}))
-except Exception as e:
-    import traceback
-    print(json.dumps({"valid": False, "error": str(e), "traceback": traceback.format_exc()}))
-      `]);
-
-      let output = "";
-      let error = "";
-      
-      pythonScript.stdout.on("data", (data) => {
-        output += data.toString();
-      });
-
-      pythonScript.stderr.on("data", (data) => {
-        error += data.toString();
-      });
-
-      pythonScript.on("close", (code) => {
-        if (code !== 0) {
-          return res.status(500).json({ valid: false, error: error || "Python script failed" });
-        }
-        
-        try {
-          const result = JSON.parse(output);
-          res.json(result);
-        } catch (parseError) {
-          res.json({ valid: false, error: "Failed to validate ticker" });
-        }
-      });
+      const result = await pythonWorker.call("validate_ticker", { ticker });
+      res.json(result);
 
     } catch (error) {
+      if (error instanceof PythonWorkerError) {
+        return res.json({ valid: false, error: error.message });
+      }
       res.status(500).json({ error: "Failed to validate ticker" });
     }
   });
@@ -158,69 +84,73 @@ except Exception as e:
       // Update status to running
       await storage.updateBacktest(id, { status: "running" });
 
-      // Run backtest in Python
-      const pythonScript = spawn("python3", ["-c", `
-import sys
-sys.path.append('${path.join(process.cwd(), "server/services")}')
-from backtest_service import BacktestService
-import json
-
-config = {
-    "ticker": "${backtest.ticker}",
-    "start_date": "${backtest.startDate?.toISOString().split('T')[0]}",
-    "end_date": "${backtest.endDate?.toISOString().split('T')[0]}",
-    "initial_capital": ${backtest.initialCapital},
-    "commission": ${backtest.commission},
-    "strategy_config": ${JSON.stringify(backtest.strategyConfig).replace(/"/g, '\\"')}
-}
-
-try:
-    service = BacktestService()
-    results = service.run_backtest(config)
-    print(json.dumps(results))
-except Exception as e:
-    print(json.dumps({"error": str(e)}))
-      `]);
-
-      let output = "";
-      let error = "";
+      // Run backtest in the Python worker
+      const config = {
+        ticker: backtest.ticker,
+        start_date: backtest.startDate?.toISOString().split('T')[0],
+        end_date: backtest.endDate?.toISOString().split('T')[0],
+        initial_capital: backtest.initialCapital,
+        commission: backtest.commission ?? 0.001,
+        strategy_config: backtest.strategyConfig,
+      };
+
+      try {
+        const results = await pythonWorker.call("run_backtest", { config });
+        
+        // Update backtest with results
+        await storage.updateBacktest(id, { 
+          status: "completed", 
+          results: results 
+        });
+        
+        res.json(results);
+      } catch (error) {
+        await storage.updateBacktest(id, { status: "failed" });
+        if (error instanceof PythonWorkerError) {
+          return res.status(400).json({ error: error.message });
+        }
+        res.status(500).json({ error: error instanceof Error ? error.message : "Backtest failed" });
+      }
 
-      python.stdout.on("data", (data) => {
-        output += data.toString();
-      });
+    } catch (error) {
+      res.status(500).json({ error: "Failed to run backtest" });
+    }
+  });
 
-      python.stderr.on("data", (data) => {
-        error += data.toString();
-      });
+  // Multi-ticker scan: one backtest config over `tickers` and/or a named `universe`,
+  // streamed back as one JSON line per ticker followed by a summary line
+  app.post("/api/backtests/scan", async (req, res) => {
+    const { tickers, universe, start_date, end_date, initial_capital, commission, strategy_config } = req.body ?? {};
+    if ((!Array.isArray(tickers) || tickers.length === 0) && !universe) {
+      return res.status(400).json({ error: "tickers or universe is required" });
+    }
+    if (!Array.isArray(strategy_config) || strategy_config.length === 0) {
+      return res.status(400).json({ error: "strategy_config is required" });
+    }
 
-      python.on("close", async (code) => {
-        try {
-          if (code !== 0) {
-            await storage.updateBacktest(id, { status: "failed" });
-            return res.status(500).json({ error: error || "Backtest failed" });
-          }
-          
-          const results = JSON.parse(output);
-          if (results.error) {
-            await storage.updateBacktest(id, { status: "failed" });
-            return res.status(400).json({ error: results.error });
-          }
-          
-          // Update backtest with results
-          await storage.updateBacktest(id, { 
-            status: "completed", 
-            results: results 
-          });
-          
-          res.json(results);
-        } catch (parseError) {
-          await storage.updateBacktest(id, { status: "failed" });
-          res.status(500).json({ error: "Failed to parse backtest results" });
-        }
+    const config = {
+      tickers,
+      universe,
+      start_date,
+      end_date,
+      initial_capital: initial_capital ?? 10000,
+      commission: commission ?? 0.001,
+      strategy_config,
+      max_points: req.body.max_points,
+      result_format: req.body.result_format,
+    };
+
+    res.setHeader("Content-Type", "application/x-ndjson");
+    try {
+      const summary = await pythonWorker.call("run_backtest_batch", { config }, (partial) => {
+        res.write(JSON.stringify(partial) + "\n");
       });
-
+      res.end(JSON.stringify({ done: true, ...summary }) + "\n");
     } catch (error) {
-      res.status(500).json({ error: "Failed to run backtest" });
+      if (!res.headersSent) {
+        return res.status(400).json({ error: error instanceof Error ? error.message : "Scan failed" });
+      }
+      res.end(JSON.stringify({ done: true, error: error instanceof Error ? error.message : "Scan failed" }) + "\n");
     }
   });
 
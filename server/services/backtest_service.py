@@ -1,59 +1,57 @@
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 from .strategy_service import StrategyService
 from .data_service import DataService
+from .indicators import IndicatorGraph
+from .result_cache import ResultCache
+from .profiling import StageProfiler, profiling_requested
+from .result_format import to_compact, encode_json
+from .downsampling import downsample_result
+from .robustness import RobustnessService
+from .universe import resolve_tickers, UniverseLoader
+from .kernels import (
+    exit_rules_kernel, metrics_kernel, SIDE_LONG, SIDE_SHORT,
+    METRIC_SHARPE, METRIC_MAX_DRAWDOWN, METRIC_WINS, METRIC_LOSSES,
+    METRIC_WIN_RATE, METRIC_AVG_WIN, METRIC_AVG_LOSS, METRIC_PROFIT_FACTOR
+)
 
 logger = logging.getLogger(__name__)
 
+# Intrabar exit rules, given in config as percentages
+EXIT_RULES = ('stop_loss', 'take_profit', 'trailing_stop')
+EXIT_REASONS = np.array(['signal', 'stop_loss', 'take_profit', 'trailing_stop'])
+
+# Tickers of a multi-ticker run backtested at once
+DEFAULT_BATCH_WORKERS = int(os.environ.get('QUANTDECK_BATCH_WORKERS', 8))
+
 class BacktestService:
     """Service for running backtests"""
     
+    result_cache = ResultCache()
+    
     def __init__(self):
         self.strategy_service = StrategyService()
         
     def run_backtest(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Run a complete backtest"""
+        """Run a complete backtest.
+        
+        A config with ``tickers`` and/or a ``universe`` instead of ``ticker``
+        runs the backtest on every ticker, see iter_backtest_batch.
+        """
+        if 'ticker' not in config and (config.get('tickers') or config.get('universe')):
+            return self.run_backtest_batch(config)
         try:
-            # Extract configuration
-            ticker = config['ticker']
-            start_date = config['start_date']
-            end_date = config['end_date']
-            initial_capital = config['initial_capital']
-            commission = config.get('commission', 0.001)
-            strategy_config = config['strategy_config']
-            
-            # Fetch data
-            data_response = DataService.fetch_stock_data(ticker, start_date, end_date)
-            df = DataService.prepare_data_for_strategy(data_response['data'], 'technical')
-            
-            # Execute strategies
-            results = []
-            for strategy in strategy_config:
-                strategy_name = strategy['name']
-                parameters = strategy['parameters']
-                
-                # Create strategy instance and generate signals
-                strategy_instance = self.strategy_service.create_strategy_instance(strategy_name, parameters)
-                signals_df = strategy_instance.generate_signals(df)
-                
-                # Run backtest for this strategy
-                backtest_results = self._execute_backtest(
-                    signals_df, initial_capital, commission, strategy_name
-                )
-                results.append(backtest_results)
-            
-            # Combine results if multiple strategies
-            if len(results) == 1:
-                final_results = results[0]
-            else:
-                final_results = self._combine_strategy_results(results)
-            
-            # Add metadata
-            final_results['config'] = config
-            final_results['data_metadata'] = data_response['metadata']
+            with StageProfiler(enabled=profiling_requested(config)) as profiler:
+                final_results = self._run_backtest_stages(config, profiler)
+            profiler.log(ticker=config['ticker'],
+                         strategies=[strategy['name'] for strategy in config['strategy_config']])
+            if config.get('profile'):
+                final_results['profile'] = profiler.summary()
             
             return final_results
             
@@ -61,32 +59,215 @@ class BacktestService:
             logger.error(f"Backtest failed: {str(e)}")
             raise
     
-    def _execute_backtest(self, signals_df: pd.DataFrame, initial_capital: float, 
-                         commission: float, strategy_name: str) -> Dict[str, Any]:
-        """Execute backtest for a single strategy"""
+    def run_backtest_batch(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Backtest every ticker of a multi-ticker config; results and errors keyed by ticker"""
+        tickers = resolve_tickers(config)
+        outcomes = {item['ticker']: item for item in self.iter_backtest_batch(config)}
+        return {
+            'tickers': tickers,
+            'results': {t: outcomes[t]['result'] for t in tickers if 'result' in outcomes[t]},
+            'errors': {t: outcomes[t]['error'] for t in tickers if 'error' in outcomes[t]}
+        }
+    
+    def iter_backtest_batch(self, config: Dict[str, Any],
+                            max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Backtest the config on each of its tickers, yielding results as they finish.
         
-        # Initialize portfolio
-        portfolio = pd.DataFrame(index=signals_df.index)
-        portfolio['signal'] = signals_df['signal']
-        portfolio['position'] = signals_df['position']
-        portfolio['price'] = signals_df['close']
+        Yields ``{'ticker', 'result'}`` or ``{'ticker', 'error'}`` per ticker,
+        in completion order. Tickers run on a thread pool of up to
+        ``QUANTDECK_BATCH_WORKERS`` threads sharing this service, so strategy
+        classes, the bar cache and the result cache stay warm across tickers.
+        Uncached bars are first downloaded for all tickers in batched
+        requests (UniverseLoader). Profiled runs go one ticker at a time.
+        """
+        tickers = resolve_tickers(config)
+        base_config = {key: value for key, value in config.items() if key not in ('tickers', 'universe')}
         
-        # Calculate returns
-        portfolio['returns'] = portfolio['price'].pct_change()
-        portfolio['strategy_returns'] = portfolio['position'].shift(1) * portfolio['returns']
+        # Resolve the strategies once up front, so a bad config fails before any download
+        for strategy in config['strategy_config']:
+            self.strategy_service.create_strategy_instance(strategy['name'], strategy['parameters'])
         
-        # Account for commission
-        portfolio['trades'] = portfolio['position'].diff().abs()
-        portfolio['commission_cost'] = portfolio['trades'] * commission
-        portfolio['strategy_returns'] -= portfolio['commission_cost']
+        if len(tickers) > 1:
+            # Batched multi-symbol downloads fill the bar cache, so each ticker's fetch below is a cache hit
+            UniverseLoader().load(tickers, config['start_date'], config['end_date'])
         
-        # Calculate cumulative returns
-        portfolio['cumulative_returns'] = (1 + portfolio['strategy_returns']).cumprod()
-        portfolio['portfolio_value'] = initial_capital * portfolio['cumulative_returns']
+        workers = 1 if profiling_requested(config) else min(max_workers or DEFAULT_BATCH_WORKERS, len(tickers))
+        logger.info(f"Backtesting {len(tickers)} tickers on {workers} threads")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.run_backtest, {**base_config, 'ticker': ticker}): ticker
+                for ticker in tickers
+            }
+            try:
+                for future in as_completed(futures):
+                    ticker = futures.pop(future)
+                    try:
+                        yield {'ticker': ticker, 'result': future.result()}
+                    except Exception as e:
+                        yield {'ticker': ticker, 'error': str(e)}
+            finally:
+                # A consumer that stops early does not wait for the remaining tickers
+                for future in futures:
+                    future.cancel()
+    
+    def _run_backtest_stages(self, config: Dict[str, Any], profiler: StageProfiler) -> Dict[str, Any]:
+        """Fetch, signal, simulate and summarize, timing each stage"""
+        ticker = config['ticker']
+        start_date = config['start_date']
+        end_date = config['end_date']
+        initial_capital = config['initial_capital']
+        commission = config.get('commission', 0.001)
+        strategy_config = config['strategy_config']
+        
+        # Fetch data
+        with profiler.stage('data_fetch'):
+            bars = DataService.fetch_bars(ticker, start_date, end_date)
+        
+        # Identical configs on identical bars reuse the previous result
+        use_result_cache = config.get('use_result_cache', True) and ResultCache.cacheable(config)
+        with profiler.stage('result_cache'):
+            cache_key = ResultCache.make_key(config, bars) if use_result_cache else None
+            cached = self.result_cache.get(cache_key) if use_result_cache else None
+        if cached is not None:
+            logger.info(f"Backtest result cache hit for {ticker}")
+            cached['config'] = config
+            return self._format_result(cached, config, bars.index, profiler)
+        
+        df = DataService.prepare_data_for_strategy(bars, 'raw')
+        
+        # Indicators are computed on demand, once per run, and shared by all strategies
+        indicator_graph = IndicatorGraph(df)
+        strategy_instances = []
+        for strategy in strategy_config:
+            with profiler.stage('indicator_prep', strategy['name']):
+                strategy_instance = self.strategy_service.create_strategy_instance(
+                    strategy['name'], strategy['parameters']
+                )
+                strategy_instance.bind_indicators(indicator_graph)
+                indicator_graph.compute(strategy_instance.required_indicators())
+            strategy_instances.append((strategy['name'], strategy_instance))
+        
+        # Execute strategies
+        exits = self._exit_levels(config)
+        results = []
+        portfolios = []
+        ledgers = []
+        for strategy_name, strategy_instance in strategy_instances:
+            with profiler.stage('generate_signals', strategy_name):
+                signals_df = strategy_instance.generate_signals(df)
+            
+            # Run backtest for this strategy
+            with profiler.stage('execute_backtest', strategy_name):
+                portfolio = self._simulate_portfolio(signals_df, initial_capital, commission, df, exits)
+            with profiler.stage('extract_trades', strategy_name):
+                trades = self._extract_trades(portfolio)
+            with profiler.stage('metrics', strategy_name):
+                results.append(self._summarize_backtest(
+                    signals_df, portfolio, trades, initial_capital, strategy_name
+                ))
+            portfolios.append(portfolio)
+            ledgers.append(trades)
+        
+        # Combine results if multiple strategies
+        if len(results) == 1:
+            final_results = results[0]
+        else:
+            with profiler.stage('combine'):
+                final_results = self._combine_strategy_results(
+                    results, portfolios, ledgers, initial_capital,
+                    config.get('portfolio', {}),
+                    [strategy.get('weight') for strategy in strategy_config]
+                )
+        
+        if config.get('robustness'):
+            with profiler.stage('robustness'):
+                final_results['robustness'] = self._robustness(
+                    final_results, ledgers, config['robustness'], initial_capital
+                )
+        
+        # Add metadata
+        final_results['data_metadata'] = DataService.summarize_bars(bars, start_date, end_date)
+        if use_result_cache:
+            with profiler.stage('cache_store'):
+                self.result_cache.put(cache_key, final_results)
+        final_results['config'] = config
+        
+        return self._format_result(final_results, config, bars.index, profiler)
+    
+    @staticmethod
+    def _robustness(result: Dict[str, Any], ledgers: List[pd.DataFrame], robustness_config: Dict[str, Any],
+                    initial_capital: float) -> Dict[str, Any]:
+        """Bootstrap report of the final equity curve or the trades of every strategy"""
+        trades = ledgers[0] if len(ledgers) == 1 else pd.concat(ledgers, ignore_index=True)
+        try:
+            return RobustnessService.analyze(result['portfolio_value'], trades, robustness_config, initial_capital)
+        except ValueError as e:
+            logger.warning(f"Robustness analysis skipped: {str(e)}")
+            return {'error': str(e)}
+    
+    def _format_result(self, result: Dict[str, Any], config: Dict[str, Any], index: pd.DatetimeIndex,
+                       profiler: StageProfiler) -> Dict[str, Any]:
+        """Downsample if ``max_points`` is set, then apply the requested result format:
+        'json' lists (default) or 'compact' typed arrays"""
+        if config.get('max_points'):
+            with profiler.stage('downsample'):
+                result, kept = downsample_result(result, int(config['max_points']))
+                index = index[kept]
+        
+        result_format = config.get('result_format', 'json')
+        if result_format not in ('json', 'compact'):
+            raise ValueError(f"Unknown result format '{result_format}'")
+        with profiler.stage('serialize'):
+            if result_format == 'compact':
+                result = to_compact(result, index, config.get('result_sidecar_dir'))
+            if profiler.enabled:
+                # The worker encodes the response itself; a profiled run encodes it
+                # once more here so the stage includes the JSON encoding cost
+                encode_json(result)
+        return result
+    
+    @staticmethod
+    def _exit_levels(config: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        """Exit rules from config percentages as fractions, or None if none is set"""
+        levels = {rule: float(config.get(rule) or 0) / 100 for rule in EXIT_RULES}
+        if any(level < 0 for level in levels.values()):
+            raise ValueError("Stop loss, take profit and trailing stop must be positive percentages")
+        return levels if any(levels.values()) else None
+    
+    @staticmethod
+    def _apply_exit_rules(bars: pd.DataFrame, targets: np.ndarray,
+                          exits: Dict[str, Any]) -> Tuple[np.ndarray, ...]:
+        """Run exit_rules_kernel for a bars x runs target matrix; levels are scalars or one per run"""
+        runs = targets.shape[1]
+        levels = [
+            np.nan_to_num(np.broadcast_to(np.asarray(exits.get(rule, 0), dtype=np.float64), (runs,)).copy())
+            for rule in EXIT_RULES
+        ]
+        return exit_rules_kernel(
+            bars['open'].to_numpy(dtype=np.float64),
+            bars['high'].to_numpy(dtype=np.float64),
+            bars['low'].to_numpy(dtype=np.float64),
+            bars['close'].to_numpy(dtype=np.float64),
+            np.nan_to_num(np.ascontiguousarray(targets, dtype=np.float64)),
+            *levels
+        )
+    
+    def _execute_backtest(self, signals_df: pd.DataFrame, initial_capital: float, 
+                         commission: float, strategy_name: str, bars: Optional[pd.DataFrame] = None,
+                         exits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Execute backtest for a single strategy"""
+        
+        portfolio = self._simulate_portfolio(signals_df, initial_capital, commission, bars, exits)
         
         # Extract trades
         trades = self._extract_trades(portfolio)
         
+        return self._summarize_backtest(signals_df, portfolio, trades, initial_capital, strategy_name)
+    
+    def _summarize_backtest(self, signals_df: pd.DataFrame, portfolio: pd.DataFrame, trades: pd.DataFrame,
+                            initial_capital: float, strategy_name: str) -> Dict[str, Any]:
+        """Build the result payload of one simulated strategy"""
+        
         # Calculate metrics
         metrics = self._calculate_metrics(portfolio, trades, initial_capital)
         
@@ -94,7 +275,7 @@ class BacktestService:
             'strategy_name': strategy_name,
             'portfolio_value': portfolio['portfolio_value'].tolist(),
             'dates': portfolio.index.strftime('%Y-%m-%d').tolist(),
-            'trades': trades,
+            'trades': self._trades_to_records(trades),
             'metrics': metrics,
             'signals': {
                 'dates': signals_df.index.strftime('%Y-%m-%d').tolist(),
@@ -103,82 +284,325 @@ class BacktestService:
             }
         }
     
-    def _extract_trades(self, portfolio: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Extract individual trades from portfolio"""
-        trades = []
-        position = 0
-        entry_price = 0
-        entry_date = None
-        
-        for date, row in portfolio.iterrows():
-            if row['position'] != position:
-                if position != 0:  # Closing existing position
-                    exit_price = row['price']
-                    pnl = (exit_price - entry_price) * position
-                    return_pct = (pnl / (entry_price * abs(position))) * 100
-                    
-                    trades.append({
-                        'entry_date': entry_date.strftime('%Y-%m-%d'),
-                        'exit_date': date.strftime('%Y-%m-%d'),
-                        'side': 'LONG' if position > 0 else 'SHORT',
-                        'entry_price': round(entry_price, 2),
-                        'exit_price': round(exit_price, 2),
-                        'quantity': abs(position),
-                        'pnl': round(pnl, 2),
-                        'return_pct': round(return_pct, 2)
-                    })
-                
-                if row['position'] != 0:  # Opening new position
-                    position = row['position']
-                    entry_price = row['price']
-                    entry_date = date
-                else:
-                    position = 0
+    def _simulate_portfolio(self, signals_df: pd.DataFrame, initial_capital: float,
+                            commission: float, bars: Optional[pd.DataFrame] = None,
+                            exits: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Simulate returns and portfolio value of a signal frame.
+        
+        With ``exits`` (fractions keyed by EXIT_RULES) the strategy's
+        positions become targets for exit_rules_kernel, which checks the
+        stops against the High/Low of ``bars``. Position changes then no
+        longer line up with signal bars; code that needs the trade bars
+        (such as downsample_result) reads them from the trade ledger.
+        """
         
+        # Initialize portfolio
+        portfolio = pd.DataFrame(index=signals_df.index)
+        portfolio['signal'] = signals_df['signal']
+        portfolio['position'] = signals_df['position']
+        portfolio['price'] = signals_df['close']
+        
+        # Calculate returns
+        portfolio['returns'] = portfolio['price'].pct_change()
+        
+        if exits:
+            if bars is None:
+                raise ValueError("Exit rules need OHLC bars")
+            positions, gross, turnover, exit_price, exit_reason = self._apply_exit_rules(
+                bars.loc[signals_df.index], signals_df['position'].to_numpy()[:, None], exits
+            )
+            portfolio['target_position'] = portfolio['position']
+            portfolio['position'] = positions[:, 0]
+            portfolio['strategy_returns'] = gross[:, 0]
+            portfolio['trades'] = turnover[:, 0]
+            portfolio['exit_price'] = exit_price[:, 0]
+            portfolio['exit_reason'] = exit_reason[:, 0]
+        else:
+            portfolio['strategy_returns'] = portfolio['position'].shift(1) * portfolio['returns']
+            portfolio['trades'] = portfolio['position'].diff().abs()
+        
+        # Account for commission
+        portfolio['commission_cost'] = portfolio['trades'] * commission
+        portfolio['strategy_returns'] -= portfolio['commission_cost']
+        
+        # Calculate cumulative returns
+        portfolio['cumulative_returns'] = (1 + portfolio['strategy_returns']).cumprod()
+        portfolio['portfolio_value'] = initial_capital * portfolio['cumulative_returns']
+        
+        return portfolio
+    
+    def _extract_trades(self, portfolio: pd.DataFrame) -> pd.DataFrame:
+        """Extract individual trades from portfolio as a columnar ledger.
+        
+        A trade opens wherever the position changes to a non-zero value and
+        closes at the next change; a position still open on the last bar is
+        not a trade. Values are unrounded; see _trades_to_records.
+        """
+        positions = portfolio['position'].fillna(0).to_numpy(dtype=np.float64)
+        prices = portfolio['price'].to_numpy(dtype=np.float64)
+        
+        previous = np.empty_like(positions)
+        previous[:1] = 0
+        previous[1:] = positions[:-1]
+        change_points = np.flatnonzero(positions != previous)
+        
+        # Each change point opens a segment that the following change point closes
+        entries = change_points[:-1]
+        exits = change_points[1:]
+        held = positions[entries]
+        is_trade = held != 0
+        entries = entries[is_trade]
+        exits = exits[is_trade]
+        held = held[is_trade]
+        
+        entry_price = prices[entries]
+        # Intrabar exits fill at their stop/target level rather than the close
+        exit_prices = portfolio['exit_price'] if 'exit_price' in portfolio.columns else portfolio['price']
+        exit_price = exit_prices.to_numpy(dtype=np.float64)[exits]
+        quantity = np.abs(held)
+        pnl = (exit_price - entry_price) * held
+        
+        trades = pd.DataFrame({
+            'entry_date': portfolio.index[entries],
+            'exit_date': portfolio.index[exits],
+            'side': np.where(held > 0, 'LONG', 'SHORT'),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'quantity': quantity,
+            'pnl': pnl,
+            'return_pct': (pnl / (entry_price * quantity)) * 100
+        })
+        if 'exit_reason' in portfolio.columns:
+            trades['exit_reason'] = EXIT_REASONS[portfolio['exit_reason'].to_numpy()[exits]]
         return trades
     
-    def _calculate_metrics(self, portfolio: pd.DataFrame, trades: List[Dict], 
+    @staticmethod
+    def _trades_to_records(trades: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Serialize a trade ledger to rounded JSON-ready dicts"""
+        records = pd.DataFrame({
+            'entry_date': trades['entry_date'].dt.strftime('%Y-%m-%d'),
+            'exit_date': trades['exit_date'].dt.strftime('%Y-%m-%d'),
+            'side': trades['side'],
+            'entry_price': trades['entry_price'].round(2),
+            'exit_price': trades['exit_price'].round(2),
+            'quantity': trades['quantity'],
+            'pnl': trades['pnl'].round(2),
+            'return_pct': trades['return_pct'].round(2)
+        })
+        if 'exit_reason' in trades.columns:
+            records['exit_reason'] = trades['exit_reason']
+        return records.to_dict('records')
+    
+    def _calculate_metrics(self, portfolio: pd.DataFrame, trades: pd.DataFrame, 
                           initial_capital: float) -> Dict[str, Any]:
         """Calculate performance metrics"""
         
         final_value = portfolio['portfolio_value'].iloc[-1]
         total_return = (final_value - initial_capital) / initial_capital * 100
         
-        # Sharpe ratio
-        returns = portfolio['strategy_returns'].dropna()
-        sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
-        
-        # Maximum drawdown
-        cumulative = portfolio['cumulative_returns']
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min() * 100
-        
-        # Trade statistics
-        winning_trades = [t for t in trades if t['pnl'] > 0]
-        losing_trades = [t for t in trades if t['pnl'] < 0]
-        
-        win_rate = len(winning_trades) / len(trades) * 100 if trades else 0
-        avg_win = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0
-        profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf')
+        # Sharpe ratio, drawdown and trade statistics in one compiled pass;
+        # P&L is rounded to cents as reported per trade
+        pnl = trades['pnl'].to_numpy(dtype=np.float64).round(2)
+        summary, _ = metrics_kernel(
+            portfolio['strategy_returns'].to_numpy(dtype=np.float64),
+            portfolio['cumulative_returns'].to_numpy(dtype=np.float64),
+            np.where(trades['side'].to_numpy() == 'LONG', SIDE_LONG, SIDE_SHORT),
+            np.zeros(len(pnl), dtype=np.int64),
+            pnl,
+            trades['return_pct'].to_numpy(dtype=np.float64),
+            252.0
+        )
+        sharpe_ratio = summary[METRIC_SHARPE]
+        max_drawdown = summary[METRIC_MAX_DRAWDOWN] * 100
+        win_rate = summary[METRIC_WIN_RATE]
+        avg_win = summary[METRIC_AVG_WIN]
+        avg_loss = summary[METRIC_AVG_LOSS]
+        profit_factor = summary[METRIC_PROFIT_FACTOR]
         
         return {
             'total_return': round(total_return, 2),
             'sharpe_ratio': round(sharpe_ratio, 2),
             'max_drawdown': round(max_drawdown, 2),
             'win_rate': round(win_rate, 1),
-            'total_trades': len(trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
+            'total_trades': len(pnl),
+            'winning_trades': int(summary[METRIC_WINS]),
+            'losing_trades': int(summary[METRIC_LOSSES]),
             'avg_win': round(avg_win, 2),
             'avg_loss': round(avg_loss, 2),
             'profit_factor': round(profit_factor, 2),
             'final_value': round(final_value, 2)
         }
     
-    def _combine_strategy_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Combine results from multiple strategies"""
-        # For simplicity, we'll just return the first strategy's results
-        # In a real implementation, you might want to combine or ensemble the strategies
-        return results[0]
+    def _execute_backtest_batch(self, close: np.ndarray, positions: np.ndarray,
+                                initial_capital: float, commission: float,
+                                bars: Optional[pd.DataFrame] = None,
+                                exits: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Simulate and score many position columns over the same prices at once.
+        
+        ``positions`` is bars x runs. ``exits`` holds exit-rule fractions,
+        scalar or one per run, applied against the OHLC ``bars``. Returns
+        one row of _calculate_metrics fields per column, computed with
+        whole-matrix operations.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        positions = np.asarray(positions, dtype=np.float64)
+        n_bars, n_runs = positions.shape
+        if n_bars < 2:
+            raise ValueError("At least two bars are required")
+        
+        # Same accounting as _simulate_portfolio, without its leading NaN row
+        if exits:
+            positions, gross, turnover, exit_prices, _ = self._apply_exit_rules(bars, positions, exits)
+            strategy_returns = gross[1:] - turnover[1:] * commission
+        else:
+            returns = close[1:] / close[:-1] - 1
+            trades = np.abs(np.diff(positions, axis=0))
+            strategy_returns = positions[:-1] * returns[:, None] - trades * commission
+            exit_prices = None
+        cumulative = np.nancumprod(1 + strategy_returns, axis=0)
+        final_value = initial_capital * cumulative[-1]
+        total_return = (final_value - initial_capital) / initial_capital * 100
+        
+        # Sharpe ratio
+        mean = np.nanmean(strategy_returns, axis=0)
+        std = np.nanstd(strategy_returns, axis=0, ddof=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe_ratio = np.where(std != 0, mean / std * np.sqrt(252), 0.0)
+        
+        # Maximum drawdown
+        running_max = np.maximum.accumulate(cumulative, axis=0)
+        max_drawdown = ((cumulative - running_max) / running_max).min(axis=0) * 100
+        
+        # Trades: consecutive position changes within the same run, as in _extract_trades
+        by_run = positions.T
+        previous = np.zeros_like(by_run)
+        previous[:, 1:] = by_run[:, :-1]
+        run, bar = np.nonzero(by_run != previous)
+        same_run = run[1:] == run[:-1]
+        run, entry, exit_ = run[:-1][same_run], bar[:-1][same_run], bar[1:][same_run]
+        held = by_run[run, entry]
+        is_trade = held != 0
+        run, entry, exit_, held = run[is_trade], entry[is_trade], exit_[is_trade], held[is_trade]
+        exit_price = close[exit_] if exit_prices is None else exit_prices[exit_, run]
+        pnl = ((exit_price - close[entry]) * held).round(2)
+        
+        total_trades = np.bincount(run, minlength=n_runs)
+        winning_trades = np.bincount(run, weights=pnl > 0, minlength=n_runs).astype(np.int64)
+        losing_trades = np.bincount(run, weights=pnl < 0, minlength=n_runs).astype(np.int64)
+        win_sum = np.bincount(run, weights=np.where(pnl > 0, pnl, 0.0), minlength=n_runs)
+        loss_sum = np.bincount(run, weights=np.where(pnl < 0, pnl, 0.0), minlength=n_runs)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            win_rate = np.where(total_trades > 0, winning_trades / total_trades * 100, 0.0)
+            avg_win = np.where(winning_trades > 0, win_sum / winning_trades, 0.0)
+            avg_loss = np.where(losing_trades > 0, loss_sum / losing_trades, 0.0)
+            profit_factor = np.where(avg_loss != 0, np.abs(avg_win / avg_loss), np.inf)
+        
+        return pd.DataFrame({
+            'total_return': total_return.round(2),
+            'sharpe_ratio': sharpe_ratio.round(2),
+            'max_drawdown': max_drawdown.round(2),
+            'win_rate': win_rate.round(1),
+            'total_trades': total_trades,
+            'winning_trades': winning_trades,
+            'losing_trades': losing_trades,
+            'avg_win': avg_win.round(2),
+            'avg_loss': avg_loss.round(2),
+            'profit_factor': profit_factor.round(2),
+            'final_value': final_value.round(2)
+        })
+    
+    @staticmethod
+    def _portfolio_weights(returns: pd.DataFrame, weighting: str,
+                           fixed_weights: List[Optional[float]], lookback: int) -> pd.DataFrame:
+        """Per-bar strategy weights, bars x strategies, each row summing to 1.
+        
+        ``inverse_volatility`` sizes each strategy by 1 / std of its returns
+        over the previous ``lookback`` bars (shifted, so a bar's weight never
+        uses its own return) and falls back to equal weights until a full
+        window is available.
+        """
+        n_strategies = returns.shape[1]
+        equal = np.full(n_strategies, 1.0 / n_strategies)
+        
+        if weighting == 'equal':
+            weights = np.tile(equal, (len(returns), 1))
+        elif weighting == 'fixed':
+            if any(weight is None for weight in fixed_weights):
+                raise ValueError("Fixed weighting requires a weight for every strategy")
+            fixed = np.asarray(fixed_weights, dtype=np.float64)
+            if fixed.sum() <= 0:
+                raise ValueError("Fixed weights must sum to a positive value")
+            weights = np.tile(fixed / fixed.sum(), (len(returns), 1))
+        elif weighting == 'inverse_volatility':
+            volatility = returns.rolling(lookback, min_periods=lookback).std().shift(1).to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                inverse = np.where(volatility > 0, 1.0 / volatility, np.nan)
+                weights = inverse / inverse.sum(axis=1, keepdims=True)
+            # Rows with any missing or zero volatility fall back to equal weights
+            incomplete = ~np.isfinite(weights).all(axis=1)
+            weights[incomplete] = equal
+        else:
+            raise ValueError(f"Unknown portfolio weighting '{weighting}'")
+        
+        return pd.DataFrame(weights, index=returns.index, columns=returns.columns)
+    
+    def _combine_strategy_results(self, results: List[Dict[str, Any]], portfolios: List[pd.DataFrame],
+                                  ledgers: List[pd.DataFrame], initial_capital: float,
+                                  portfolio_config: Dict[str, Any],
+                                  fixed_weights: List[Optional[float]]) -> Dict[str, Any]:
+        """Combine several strategies into one daily-rebalanced portfolio.
+        
+        The already simulated return streams are aligned on date and weighted
+        per ``portfolio_config['weighting']`` ('equal', 'fixed' from each
+        strategy's ``weight``, or 'inverse_volatility' over
+        ``portfolio_config['lookback']`` bars); no strategy is re-run.
+        """
+        weighting = portfolio_config.get('weighting', 'equal')
+        lookback = int(portfolio_config.get('lookback', 63))
+        
+        names = [result['strategy_name'] for result in results]
+        keys = [f"{name}_{i}" for i, name in enumerate(names)]
+        
+        # Bars a strategy has no return for contribute nothing on that bar
+        returns = pd.concat(
+            [portfolio['strategy_returns'] for portfolio in portfolios], axis=1, keys=keys
+        ).fillna(0.0)
+        weights = self._portfolio_weights(returns, weighting, fixed_weights, lookback)
+        
+        portfolio = pd.DataFrame(index=returns.index)
+        portfolio['strategy_returns'] = (returns.to_numpy() * weights.to_numpy()).sum(axis=1)
+        portfolio['cumulative_returns'] = (1 + portfolio['strategy_returns']).cumprod()
+        portfolio['portfolio_value'] = initial_capital * portfolio['cumulative_returns']
+        
+        # Trades are reported per strategy; P&L stays per unit as in each strategy's ledger
+        trades = pd.concat(ledgers, keys=range(len(ledgers)), names=['strategy', None])
+        trades = trades.reset_index(level=0).sort_values('entry_date', kind='stable')
+        metrics = self._calculate_metrics(portfolio, trades, initial_capital)
+        
+        trade_records = self._trades_to_records(trades)
+        for record, strategy in zip(trade_records, trades['strategy'].to_numpy()):
+            record['strategy'] = names[strategy]
+        
+        # Net signal: sign of the weighted sum of the strategies' signals
+        signals = pd.concat(
+            [pd.Series(result['signals']['signals'], index=portfolio.index) for result in results],
+            axis=1, keys=keys
+        ).fillna(0)
+        net_signal = np.sign((signals.to_numpy() * weights.to_numpy()).sum(axis=1))
+        
+        return {
+            'strategy_name': ' + '.join(names),
+            'portfolio_value': portfolio['portfolio_value'].tolist(),
+            'dates': portfolio.index.strftime('%Y-%m-%d').tolist(),
+            'trades': trade_records,
+            'metrics': metrics,
+            'signals': {
+                'dates': results[0]['signals']['dates'],
+                'prices': results[0]['signals']['prices'],
+                'signals': net_signal.astype(np.int64).tolist()
+            },
+            'weighting': weighting,
+            # Weights on the last bar, in strategy_config order
+            'weights': weights.iloc[-1].round(4).tolist(),
+            'strategies': results
+        }
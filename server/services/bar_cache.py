@@ -0,0 +1,158 @@
+import os
+import tempfile
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'quantdeck' / 'bars'
+
+# Fetcher signature: (ticker, start_date, end_date, interval) -> OHLCV DataFrame
+Fetcher = Callable[[str, str, str, str], pd.DataFrame]
+
+
+class BarCache:
+    """On-disk columnar OHLCV store, one file per ticker/interval.
+
+    Each file is an uncompressed ``.npz`` archive holding the bar index as
+    int64 nanoseconds, one float64 array per column and the half-open date
+    range ``[covered_start, covered_end)`` that has already been downloaded.
+    Only the parts of a request outside that range are fetched again.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or os.environ.get('QUANTDECK_CACHE_DIR', DEFAULT_CACHE_DIR))
+
+    def _path(self, ticker: str, interval: str) -> Path:
+        safe_ticker = ticker.upper().replace('/', '_')
+        return self.cache_dir / interval / f'{safe_ticker}.npz'
+
+    def load(self, ticker: str, interval: str = '1d') -> Optional[Tuple[pd.DataFrame, pd.Timestamp, pd.Timestamp]]:
+        """Load cached bars and their covered date range, or None on a miss"""
+        path = self._path(ticker, interval)
+        if not path.exists():
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                columns = [str(c) for c in archive['columns']]
+                tz = str(archive['tz']) or None
+                index = pd.DatetimeIndex(archive['index'].astype('datetime64[ns]'))
+                if tz:
+                    index = index.tz_localize('UTC').tz_convert(tz)
+                index.name = str(archive['index_name'])
+                bars = pd.DataFrame({col: archive[f'col_{i}'] for i, col in enumerate(columns)}, index=index)
+                covered_start = pd.Timestamp(int(archive['covered'][0]))
+                covered_end = pd.Timestamp(int(archive['covered'][1]))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable bar cache {path}: {str(e)}")
+            return None
+
+        return bars, covered_start, covered_end
+
+    def store(self, ticker: str, interval: str, bars: pd.DataFrame,
+              covered_start: pd.Timestamp, covered_end: pd.Timestamp) -> None:
+        """Atomically write bars and their covered date range"""
+        path = self._path(ticker, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        index = bars.index
+        tz = str(index.tz) if index.tz is not None else ''
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+
+        numeric = bars.select_dtypes(include=[np.number])
+        arrays = {f'col_{i}': numeric[col].to_numpy(dtype=np.float64) for i, col in enumerate(numeric.columns)}
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    index=index.asi8,
+                    index_name=np.array(bars.index.name or 'Date'),
+                    tz=np.array(tz),
+                    columns=np.array([str(c) for c in numeric.columns]),
+                    covered=np.array([covered_start.value, covered_end.value], dtype=np.int64),
+                    **arrays
+                )
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def missing_ranges(start: pd.Timestamp, end: pd.Timestamp,
+                       covered_start: pd.Timestamp, covered_end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the half-open ranges of [start, end) not inside the covered range.
+
+        A request that does not overlap the covered range is widened to bridge
+        the gap, so the covered range always stays contiguous.
+        """
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    @staticmethod
+    def _match_tz(fetched: pd.DataFrame, tz) -> pd.DataFrame:
+        """Put fetched bars on the cached bars' timezone.
+
+        Batched downloads return naive exchange-local timestamps while
+        single-ticker history is timezone-aware, and both land in one file.
+        """
+        if tz is not None:
+            return fetched.tz_convert(tz) if fetched.index.tz is not None else fetched.tz_localize(tz)
+        return fetched.tz_localize(None) if fetched.index.tz is not None else fetched
+
+    def get_bars(self, ticker: str, start_date: str, end_date: str, interval: str,
+                 fetch: Fetcher) -> pd.DataFrame:
+        """Return bars for [start_date, end_date), fetching only uncached ranges"""
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        # The current session is still forming, so never mark it as covered
+        today = pd.Timestamp(date.today())
+        coverable_end = min(end, today)
+
+        cached = self.load(ticker, interval)
+        if cached is None:
+            bars = fetch(ticker, start_date, end_date, interval)
+            if not bars.empty and coverable_end > start:
+                self.store(ticker, interval, bars, start, coverable_end)
+            return bars
+
+        bars, covered_start, covered_end = cached
+        missing = self.missing_ranges(start, end, covered_start, covered_end)
+
+        if missing:
+            frames = [bars]
+            coverage = (covered_start, covered_end)
+            for range_start, range_end in missing:
+                fetched = fetch(ticker, range_start.strftime('%Y-%m-%d'), range_end.strftime('%Y-%m-%d'), interval)
+                logger.info(f"Bar cache miss for {ticker} {interval} "
+                            f"[{range_start.date()}, {range_end.date()}): {len(fetched)} bars")
+                if not fetched.empty:
+                    frames.append(self._match_tz(fetched, bars.index.tz))
+                # The ticker has bars, so an empty past range (weekend, holiday) is covered
+                # as well; the part from today on is fetched again on the next call
+                if range_start < covered_start:
+                    covered_start = range_start
+                if range_end > covered_end:
+                    covered_end = max(covered_end, min(range_end, today))
+
+            if len(frames) > 1:
+                bars = pd.concat(frames)
+                bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+            if len(frames) > 1 or (covered_start, covered_end) != coverage:
+                self.store(ticker, interval, bars, covered_start, covered_end)
+
+        local_index = bars.index.tz_localize(None) if bars.index.tz is not None else bars.index
+        return bars[(local_index >= start) & (local_index < end)]
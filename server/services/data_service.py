@@ -2,48 +2,127 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 import logging
+from .bar_cache import BarCache
+from .indicators import IndicatorGraph
 
 logger = logging.getLogger(__name__)
 
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
 class DataService:
     """Service for fetching and processing market data"""
     
+    bar_cache = BarCache()
+    
+    @staticmethod
+    def _download_history(ticker: str, start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+        """Download bars for [start_date, end_date) from yfinance"""
+        stock = yf.Ticker(ticker)
+        return stock.history(start=start_date, end=end_date, interval=interval)
+    
+    @staticmethod
+    def _load_history(ticker: str, start_date: str, end_date: str, interval: str,
+                      use_cache: bool) -> pd.DataFrame:
+        """Load raw yfinance-shaped bars, reading through the local bar cache"""
+        if use_cache:
+            data = DataService.bar_cache.get_bars(
+                ticker, start_date, end_date, interval, DataService._download_history
+            )
+        else:
+            data = DataService._download_history(ticker, start_date, end_date, interval)
+        
+        if data.empty:
+            raise ValueError(f"No data found for ticker {ticker}")
+        
+        return data
+    
     @staticmethod
-    def fetch_stock_data(ticker: str, start_date: str, end_date: str) -> Dict[str, Any]:
-        """Fetch stock data from yfinance"""
+    def _to_columnar(data: pd.DataFrame) -> pd.DataFrame:
+        """Convert raw yfinance bars to lower-case float64 OHLCV columns on a naive DatetimeIndex"""
+        index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        bars = pd.DataFrame({
+            column.lower(): data[column].to_numpy(dtype=np.float64)
+            for column in OHLCV_COLUMNS
+        }, index=pd.DatetimeIndex(index, name='Date'))
+        return bars
+    
+    @staticmethod
+    def fetch_bars(ticker: str, start_date: str, end_date: str, interval: str = '1d',
+                   use_cache: bool = True) -> pd.DataFrame:
+        """Fetch bars as open/high/low/close/volume columns indexed by date.
+        
+        This is the internal columnar API; records are only built for HTTP
+        responses by fetch_stock_data.
+        """
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(start=start_date, end=end_date)
-            
-            if data.empty:
-                raise ValueError(f"No data found for ticker {ticker}")
+            data = DataService._load_history(ticker, start_date, end_date, interval, use_cache)
+            return DataService._to_columnar(data)
+        except Exception as e:
+            logger.error(f"Error fetching data for {ticker}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def bars_panel(bars_by_ticker: Dict[str, pd.DataFrame],
+                   fields: Tuple[str, ...] = ('open', 'high', 'low', 'close', 'volume')
+                   ) -> Tuple[pd.DatetimeIndex, List[str], Dict[str, np.ndarray]]:
+        """Align columnar bars of several tickers into bars x tickers arrays.
+        
+        The time axis is the sorted union of every ticker's dates, built with
+        one concat; a ticker's missing bars are NaN, which the panel
+        indicators skip rather than fill. Returns the axis, the
+        ticker order of the columns and one array per field, the panel
+        layout of BaseStrategy.generate_signals_panel.
+        """
+        tickers = list(bars_by_ticker)
+        wide = pd.concat({ticker: bars_by_ticker[ticker][list(fields)] for ticker in tickers}, axis=1).sort_index()
+        panel = {
+            field: wide.xs(field, axis=1, level=1)[tickers].to_numpy(dtype=np.float64)
+            for field in fields
+        }
+        return wide.index, tickers, panel
+    
+    @staticmethod
+    def summarize_bars(bars: pd.DataFrame, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Summary metadata for columnar bars"""
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_records': len(bars),
+            'price_range': {
+                'min': float(bars['low'].min()),
+                'max': float(bars['high'].max())
+            },
+            'avg_volume': float(bars['volume'].mean()),
+            'volatility': float(bars['close'].pct_change().std() * np.sqrt(252) * 100)
+        }
+    
+    @staticmethod
+    def fetch_stock_data(ticker: str, start_date: str, end_date: str, interval: str = '1d',
+                         use_cache: bool = True) -> Dict[str, Any]:
+        """Fetch stock data as JSON-serializable records"""
+        try:
+            data = DataService._load_history(ticker, start_date, end_date, interval, use_cache)
             
             # Convert to the format expected by our application
             data_records = data.reset_index()
+            # Intraday history is indexed by 'Datetime' rather than 'Date'
+            data_records.rename(columns={data.index.name: 'Date'}, inplace=True)
             # Convert datetime columns to strings for JSON serialization
-            data_records['Date'] = data_records['Date'].dt.strftime('%Y-%m-%d')
+            date_format = '%Y-%m-%d' if interval.endswith(('d', 'wk', 'mo')) else '%Y-%m-%d %H:%M:%S'
+            data_records['Date'] = data_records['Date'].dt.strftime(date_format)
             
             # Ensure all numeric values are JSON serializable
-            for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
+            for col in OHLCV_COLUMNS:
                 if col in data_records.columns:
                     data_records[col] = data_records[col].astype(float)
             
             processed_data = {
                 'ticker': ticker,
+                'interval': interval,
                 'data': data_records.to_dict('records'),
-                'metadata': {
-                    'start_date': start_date,
-                    'end_date': end_date,
-                    'total_records': len(data),
-                    'price_range': {
-                        'min': float(data['Low'].min()),
-                        'max': float(data['High'].max())
-                    },
-                    'avg_volume': float(data['Volume'].mean()),
-                    'volatility': float(data['Close'].pct_change().std() * np.sqrt(252) * 100)
-                }
+                'metadata': DataService.summarize_bars(DataService._to_columnar(data), start_date, end_date)
             }
             
             return processed_data
@@ -82,53 +161,66 @@ class DataService:
             return {'symbol': ticker, 'name': 'Unknown', 'sector': 'Unknown'}
     
     @staticmethod
-    def calculate_technical_indicators(data: pd.DataFrame) -> pd.DataFrame:
-        """Calculate common technical indicators"""
+    def calculate_technical_indicators(data: pd.DataFrame, graph: Optional[IndicatorGraph] = None) -> pd.DataFrame:
+        """Calculate common technical indicators.
+        
+        Indicators are taken from ``graph`` (or a new one) so overlapping
+        inputs, e.g. the 20-period SMA behind both SMA_20 and BB_Middle, are
+        computed once.
+        """
         df = data.copy()
+        graph = graph if graph is not None else IndicatorGraph(data)
+        source = 'close' if 'close' in data.columns else 'Close'
         
         # Simple Moving Averages
         for period in [20, 50, 200]:
-            df[f'SMA_{period}'] = df['Close'].rolling(window=period).mean()
-            df[f'EMA_{period}'] = df['Close'].ewm(span=period).mean()
+            df[f'SMA_{period}'] = graph.get('sma', period=period, source=source)
+            df[f'EMA_{period}'] = graph.get('ema', period=period, source=source)
         
         # Bollinger Bands
-        df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-        bb_std = df['Close'].rolling(window=20).std()
-        df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-        df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+        bands = graph.get('bollinger', period=20, std_dev=2, source=source)
+        df['BB_Middle'] = bands['middle']
+        df['BB_Upper'] = bands['upper']
+        df['BB_Lower'] = bands['lower']
         
         # RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        df['RSI'] = graph.get('rsi', period=14, source=source)
         
         # MACD
-        df['MACD'] = df['Close'].ewm(span=12).mean() - df['Close'].ewm(span=26).mean()
-        df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
-        df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
+        macd = graph.get('macd', fast=12, slow=26, signal=9, source=source)
+        df['MACD'] = macd['macd']
+        df['MACD_Signal'] = macd['signal']
+        df['MACD_Histogram'] = macd['histogram']
         
         return df
     
     @staticmethod
-    def prepare_data_for_strategy(data: List[Dict], strategy_type: str) -> pd.DataFrame:
-        """Prepare data for strategy execution"""
-        df = pd.DataFrame(data)
-        
-        # Ensure we have the required columns
-        df['Date'] = pd.to_datetime(df['Date'])
-        df.set_index('Date', inplace=True)
+    def prepare_data_for_strategy(data: Union[pd.DataFrame, List[Dict]], strategy_type: str) -> pd.DataFrame:
+        """Prepare data for strategy execution.
         
-        # Rename columns to match strategy expectations
-        column_mapping = {
-            'Open': 'open',
-            'High': 'high', 
-            'Low': 'low',
-            'Close': 'close',
-            'Volume': 'volume'
-        }
-        df.rename(columns=column_mapping, inplace=True)
+        Columnar bars from fetch_bars are used as-is; records (as returned by
+        fetch_stock_data) are still accepted and parsed. Use strategy_type
+        'raw' to skip the eager indicator set and let strategies pull only
+        what they need from an IndicatorGraph.
+        """
+        if isinstance(data, pd.DataFrame):
+            df = data
+        else:
+            df = pd.DataFrame(data)
+            
+            # Ensure we have the required columns
+            df['Date'] = pd.to_datetime(df['Date'])
+            df.set_index('Date', inplace=True)
+            
+            # Rename columns to match strategy expectations
+            column_mapping = {
+                'Open': 'open',
+                'High': 'high', 
+                'Low': 'low',
+                'Close': 'close',
+                'Volume': 'volume'
+            }
+            df.rename(columns=column_mapping, inplace=True)
         
         # Calculate technical indicators if needed
         if strategy_type in ['technical', 'hybrid']:
@@ -0,0 +1,131 @@
+import logging
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-triangle-three-buckets: the indices of ``n_out`` visually representative points.
+
+    The first and last points are always kept; from each bucket in between
+    the point forming the largest triangle with the previous pick and the
+    next bucket's mean is chosen. NaNs are filled from their neighbours for
+    the area computation only.
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    y = pd.Series(values, dtype=np.float64).ffill().bfill().fillna(0.0).to_numpy()
+    edges = (np.floor(np.arange(n_out - 1) * (n - 2) / (n_out - 2)) + 1).astype(np.int64)
+    edges[-1] = n - 1
+
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0] = 0
+    picks[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = (end + next_end - 1) / 2
+        next_y = y[end:next_end].mean()
+        xs = np.arange(start, end)
+        area = np.abs((previous - next_x) * (y[start:end] - y[previous])
+                      - (previous - xs) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        picks[bucket + 1] = previous
+    return picks
+
+
+def drawdown_extremes(equity: np.ndarray) -> List[int]:
+    """Peak and trough bars of the maximum drawdown, plus the series' high and low"""
+    equity = np.asarray(equity, dtype=np.float64)
+    finite = np.isfinite(equity)
+    if not finite.any():
+        return []
+    filled = np.where(finite, equity, -np.inf)
+    running_max = np.maximum.accumulate(filled)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(finite & (running_max > 0), equity / running_max - 1, 0.0)
+    trough = int(np.argmin(drawdown))
+    peak = int(np.argmax(filled[:trough + 1]))
+    return [peak, trough, int(np.nanargmax(equity)), int(np.nanargmin(equity))]
+
+
+def _trade_bars(result: Dict[str, Any]) -> List[np.ndarray]:
+    """Bars of every trade's entry and exit date, in the result and nested strategy results.
+
+    Exit rules close trades on bars whose signal is 0, so the trade bars
+    come from the ledger rather than the signals. Trade dates are days:
+    where several bars share a date (intraday), the first and last bar of
+    that date are kept.
+    """
+    bars = []
+    if result.get('trades') and result.get('dates'):
+        axis = np.asarray(result['dates'])
+        trade_dates = np.asarray([trade[key] for trade in result['trades'] for key in ('entry_date', 'exit_date')])
+        first = np.searchsorted(axis, trade_dates, side='left')
+        last = np.searchsorted(axis, trade_dates, side='right') - 1
+        on_axis = last >= first
+        bars.extend([first[on_axis], last[on_axis]])
+    for strategy in result.get('strategies', []):
+        bars.extend(_trade_bars(strategy))
+    return bars
+
+
+def _take(result: Dict[str, Any], indices: np.ndarray) -> Dict[str, Any]:
+    """Slice every per-bar list of a result (and nested strategy results)"""
+    sliced = dict(result)
+    for key in ('portfolio_value', 'dates'):
+        if key in result:
+            values = result[key]
+            sliced[key] = [values[i] for i in indices]
+    if result.get('signals'):
+        sliced['signals'] = {key: [values[i] for i in indices] for key, values in result['signals'].items()}
+    if 'strategies' in result:
+        sliced['strategies'] = [_take(strategy, indices) for strategy in result['strategies']]
+    return sliced
+
+
+def _lttb_budget(values: np.ndarray, n_out: int) -> np.ndarray:
+    """LTTB picks for a point budget; below LTTB's minimum of 3 only the endpoints"""
+    if n_out < 3:
+        return np.asarray([0, len(values) - 1], dtype=np.int64)
+    return lttb_indices(values, n_out)
+
+
+def downsample_result(result: Dict[str, Any], max_points: int) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Downsample a backtest result's per-bar series for charting.
+
+    The entry and exit bars of every trade in the ledgers and the drawdown
+    extremes are always kept. The rest of the ``max_points`` budget goes
+    to LTTB picks, split between the equity curve and the price series,
+    so the union stays within ``max_points`` unless the trade bars alone
+    exceed it. All series are sliced to that union so they keep sharing
+    one date axis. Returns the result and the kept bar positions.
+    """
+    equity = np.asarray(result['portfolio_value'], dtype=np.float64)
+    n_bars = len(equity)
+    if not n_bars:
+        return result, np.arange(0)
+    required = np.unique(np.concatenate(
+        [np.asarray(drawdown_extremes(equity), dtype=np.int64)] + _trade_bars(result)
+    ))
+    budget = max_points - len(required)
+    keep = [required]
+    if result.get('signals'):
+        keep.append(_lttb_budget(equity, budget - budget // 2))
+        keep.append(_lttb_budget(np.asarray(result['signals']['prices'], dtype=np.float64), budget // 2))
+    else:
+        keep.append(_lttb_budget(equity, budget))
+    indices = np.unique(np.concatenate(keep))
+
+    if len(indices) >= n_bars:
+        return result, np.arange(n_bars)
+
+    sliced = _take(result, indices)
+    sliced['downsampled'] = {'points': len(indices), 'total_points': n_bars}
+    return sliced, indices
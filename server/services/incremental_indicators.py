@@ -0,0 +1,351 @@
+import json
+import math
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+# type name -> class, used to rebuild indicators from serialized state
+INCREMENTAL_INDICATORS: Dict[str, Type['IncrementalIndicator']] = {}
+
+
+def register_incremental(cls: Type['IncrementalIndicator']) -> Type['IncrementalIndicator']:
+    """Register an incremental indicator class for state deserialization"""
+    INCREMENTAL_INDICATORS[cls.__name__] = cls
+    return cls
+
+
+class IncrementalIndicator:
+    """Stateful indicator that updates in constant time per new bar.
+
+    Values follow the conventions of the pandas versions in
+    services/indicators.py (rolling windows are NaN until full, EMAs use
+    ``adjust=True``), so a series built bar by bar matches a full recompute.
+    Multi-line indicators return a tuple ordered as ``outputs``.
+    """
+
+    outputs: Tuple[str, ...] = ()
+
+    def update(self, value: float) -> Any:
+        """Consume one bar and return the indicator value after it"""
+        raise NotImplementedError
+
+    def update_many(self, values) -> List[Any]:
+        """Consume several bars in order and return the value after each"""
+        return [self.update(float(v)) for v in values]
+
+    def get_params(self) -> Dict[str, Any]:
+        """Return constructor parameters"""
+        raise NotImplementedError
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return the running state as JSON-serializable values"""
+        raise NotImplementedError
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore running state produced by get_state"""
+        raise NotImplementedError
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize type, parameters and running state"""
+        return {'type': self.__class__.__name__, 'params': self.get_params(), 'state': self.get_state()}
+
+    @staticmethod
+    def from_state(payload: Dict[str, Any]) -> 'IncrementalIndicator':
+        """Rebuild an indicator serialized with to_state"""
+        if payload['type'] not in INCREMENTAL_INDICATORS:
+            raise ValueError(f"Incremental indicator '{payload['type']}' not found")
+        indicator = INCREMENTAL_INDICATORS[payload['type']](**payload['params'])
+        indicator.set_state(payload['state'])
+        return indicator
+
+
+class _RollingWindow:
+    """Fixed-size window with O(1) mean and sample variance (add/remove Welford).
+
+    The running moments are recomputed from the window once every ``period``
+    pushes, which keeps rounding drift bounded at amortized O(1) cost. A
+    window holding only zeros has its moments clamped to exactly zero, so
+    drift cannot leave a tiny non-zero mean (as a run of unchanged prices
+    would in RSI gains and losses).
+    """
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._pushes = 0
+        self._nonzero = 0
+
+    def _resync(self) -> None:
+        window = np.fromiter(self.values, dtype=np.float64, count=len(self.values))
+        self.mean = float(window.mean())
+        self.m2 = float(((window - self.mean) ** 2).sum())
+        self._pushes = 0
+
+    def push(self, value: float) -> None:
+        self._pushes += 1
+        if self.full and self.values[0] != 0:
+            self._nonzero -= 1
+        if value != 0:
+            self._nonzero += 1
+        if self._pushes >= self.period and self.full:
+            self.values.append(value)
+            self._resync()
+            return
+        if len(self.values) == self.period:
+            old = self.values[0]
+            n = len(self.values)
+            if n == 1:
+                self.mean = 0.0
+                self.m2 = 0.0
+            else:
+                old_mean = self.mean
+                self.mean = (n * old_mean - old) / (n - 1)
+                self.m2 -= (old - old_mean) * (old - self.mean)
+        self.values.append(value)
+        n = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+        if self._nonzero == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.period
+
+    def current_mean(self) -> float:
+        return self.mean if self.full else NAN
+
+    def current_std(self) -> float:
+        if not self.full or self.period < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.period - 1))
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'values': list(self.values), 'mean': self.mean, 'm2': self.m2, 'pushes': self._pushes}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.values = deque(state['values'], maxlen=self.period)
+        self.mean = state['mean']
+        self.m2 = state['m2']
+        # The resync schedule is part of the state: a reload must resync on the same bars
+        self._pushes = state.get('pushes', 0)
+        self._nonzero = sum(1 for value in self.values if value != 0)
+
+
+@register_incremental
+class IncrementalSMA(IncrementalIndicator):
+    """Simple moving average"""
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._window = _RollingWindow(period)
+
+    def update(self, value: float) -> float:
+        self._window.push(value)
+        return self._window.current_mean()
+
+    def get_params(self) -> Dict[str, Any]:
+        return {'period': self.period}
+
+    def get_state(self) -> Dict[str, Any]:
+        return self._window.get_state()
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._window.set_state(state)
+
+
+@register_incremental
+class IncrementalEMA(IncrementalIndicator):
+    """Exponential moving average matching ``ewm(span=period).mean()``"""
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._decay = 1.0 - 2.0 / (period + 1.0)
+        self._numerator = 0.0
+        self._denominator = 0.0
+
+    def update(self, value: float) -> float:
+        self._numerator = value + self._decay * self._numerator
+        self._denominator = 1.0 + self._decay * self._denominator
+        return self._numerator / self._denominator
+
+    def get_params(self) -> Dict[str, Any]:
+        return {'period': self.period}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'numerator': self._numerator, 'denominator': self._denominator}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._numerator = state['numerator']
+        self._denominator = state['denominator']
+
+
+@register_incremental
+class IncrementalBollinger(IncrementalIndicator):
+    """Bollinger Bands"""
+
+    outputs = ('upper', 'middle', 'lower')
+
+    def __init__(self, period: int = 20, std_dev: float = 2):
+        self.period = period
+        self.std_dev = std_dev
+        self._window = _RollingWindow(period)
+
+    def update(self, value: float):
+        self._window.push(value)
+        middle = self._window.current_mean()
+        std = self._window.current_std()
+        return middle + std * self.std_dev, middle, middle - std * self.std_dev
+
+    def get_params(self) -> Dict[str, Any]:
+        return {'period': self.period, 'std_dev': self.std_dev}
+
+    def get_state(self) -> Dict[str, Any]:
+        return self._window.get_state()
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._window.set_state(state)
+
+
+@register_incremental
+class IncrementalRSI(IncrementalIndicator):
+    """RSI over simple rolling means of gains and losses"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._gains = _RollingWindow(period)
+        self._losses = _RollingWindow(period)
+        self._previous: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        # The first bar has no change and counts as a zero gain and loss
+        delta = 0.0 if self._previous is None else value - self._previous
+        self._previous = value
+        self._gains.push(delta if delta > 0 else 0.0)
+        self._losses.push(-delta if delta < 0 else 0.0)
+
+        gain = self._gains.current_mean()
+        loss = self._losses.current_mean()
+        if math.isnan(gain) or math.isnan(loss) or gain + loss == 0:
+            return NAN
+        if loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + gain / loss))
+
+    def get_params(self) -> Dict[str, Any]:
+        return {'period': self.period}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'gains': self._gains.get_state(), 'losses': self._losses.get_state(), 'previous': self._previous}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._gains.set_state(state['gains'])
+        self._losses.set_state(state['losses'])
+        self._previous = state['previous']
+
+
+@register_incremental
+class IncrementalMACD(IncrementalIndicator):
+    """MACD line, signal line and histogram"""
+
+    outputs = ('macd', 'signal', 'histogram')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self._fast = IncrementalEMA(fast)
+        self._slow = IncrementalEMA(slow)
+        self._signal = IncrementalEMA(signal)
+
+    def update(self, value: float):
+        macd = self._fast.update(value) - self._slow.update(value)
+        signal = self._signal.update(macd)
+        return macd, signal, macd - signal
+
+    def get_params(self) -> Dict[str, Any]:
+        return {'fast': self.fast, 'slow': self.slow, 'signal': self.signal}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'fast': self._fast.get_state(), 'slow': self._slow.get_state(), 'signal': self._signal.get_state()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._fast.set_state(state['fast'])
+        self._slow.set_state(state['slow'])
+        self._signal.set_state(state['signal'])
+
+
+class IncrementalIndicatorSet:
+    """Named incremental indicators fed from one price series.
+
+    Remembers the timestamp of the last bar it consumed, so a refresh with
+    the full history only processes bars that are newer than that.
+    """
+
+    def __init__(self, indicators: Dict[str, IncrementalIndicator],
+                 last_timestamp: Optional[pd.Timestamp] = None):
+        self.indicators = indicators
+        self.last_timestamp = last_timestamp
+
+    def update(self, prices: pd.Series) -> pd.DataFrame:
+        """Consume bars newer than the last one seen; return their indicator values"""
+        if self.last_timestamp is not None:
+            prices = prices[prices.index > self.last_timestamp]
+
+        columns = {}
+        for name, indicator in self.indicators.items():
+            values = indicator.update_many(prices.to_numpy(dtype=np.float64))
+            if indicator.outputs:
+                lines = list(zip(*values)) if values else [[] for _ in indicator.outputs]
+                for output, line in zip(indicator.outputs, lines):
+                    columns[f'{name}_{output}'] = line
+            else:
+                columns[name] = values
+
+        if len(prices):
+            self.last_timestamp = prices.index[-1]
+
+        return pd.DataFrame(columns, index=prices.index)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize every indicator and the last consumed timestamp"""
+        return {
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            'indicators': {name: indicator.to_state() for name, indicator in self.indicators.items()}
+        }
+
+    @staticmethod
+    def from_state(payload: Dict[str, Any]) -> 'IncrementalIndicatorSet':
+        """Rebuild a set serialized with to_state"""
+        last_timestamp = payload.get('last_timestamp')
+        return IncrementalIndicatorSet(
+            {name: IncrementalIndicator.from_state(state) for name, state in payload['indicators'].items()},
+            pd.Timestamp(last_timestamp) if last_timestamp else None
+        )
+
+    def save(self, path: str) -> None:
+        """Write state as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_text(json.dumps(self.to_state()))
+        tmp_path.replace(path)
+
+    @staticmethod
+    def load(path: str) -> 'IncrementalIndicatorSet':
+        """Read state written by save"""
+        return IncrementalIndicatorSet.from_state(json.loads(Path(path).read_text()))
@@ -0,0 +1,271 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# name -> (compute function, default parameters)
+INDICATOR_REGISTRY: Dict[str, Tuple[Callable[..., Any], Dict[str, Any]]] = {}
+
+IndicatorRequirement = Tuple[str, Dict[str, Any]]
+
+
+def register_indicator(name: str, **defaults):
+    """Register an indicator function under ``name`` with default parameters.
+
+    The function receives the IndicatorGraph as its first argument and must
+    request any inputs it depends on through ``graph.get``/``graph.source``,
+    so shared sub-indicators are computed once.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        INDICATOR_REGISTRY[name] = (func, defaults)
+        return func
+    return decorator
+
+
+class IndicatorGraph:
+    """Demand-driven, memoized indicator evaluation over one price frame.
+
+    Each unique (indicator, parameters) node is computed at most once per
+    graph; dependencies are resolved recursively on first use. One graph is
+    shared by every strategy in a backtest run.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._cache: Dict[Tuple[str, Tuple], Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(name: str, params: Dict[str, Any]) -> Tuple[str, Tuple]:
+        return name, tuple(sorted(params.items()))
+
+    def get(self, name: str, **params) -> Any:
+        """Return the indicator ``name`` for ``params``, computing it on first use"""
+        if name not in INDICATOR_REGISTRY:
+            raise ValueError(f"Indicator '{name}' not found")
+
+        func, defaults = INDICATOR_REGISTRY[name]
+        resolved = {**defaults, **params}
+        key = self._key(name, resolved)
+
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        value = func(self, **resolved)
+        self._cache[key] = value
+        return value
+
+    def source(self, name: str) -> pd.Series:
+        """Resolve an input series: a column of the frame or a parameterless indicator"""
+        if name in self.data.columns:
+            return self.data[name]
+        return self.get(name)
+
+    def compute(self, requirements: List[IndicatorRequirement]) -> None:
+        """Evaluate a list of declared (name, parameters) requirements"""
+        for name, params in requirements:
+            self.get(name, **params)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+@register_indicator('returns', source='close')
+def _returns(graph: IndicatorGraph, source: str) -> pd.Series:
+    return graph.source(source).pct_change()
+
+
+@register_indicator('price_change', source='close')
+def _price_change(graph: IndicatorGraph, source: str) -> pd.Series:
+    return graph.source(source).diff()
+
+
+@register_indicator('sma', period=20, source='close')
+def _sma(graph: IndicatorGraph, period: int, source: str) -> pd.Series:
+    return graph.source(source).rolling(window=period).mean()
+
+
+@register_indicator('ema', period=20, source='close')
+def _ema(graph: IndicatorGraph, period: int, source: str) -> pd.Series:
+    return graph.source(source).ewm(span=period).mean()
+
+
+@register_indicator('rolling_std', period=20, source='close')
+def _rolling_std(graph: IndicatorGraph, period: int, source: str) -> pd.Series:
+    return graph.source(source).rolling(window=period).std()
+
+
+@register_indicator('bollinger', period=20, std_dev=2, source='close')
+def _bollinger(graph: IndicatorGraph, period: int, std_dev: float, source: str) -> pd.DataFrame:
+    middle = graph.get('sma', period=period, source=source)
+    std = graph.get('rolling_std', period=period, source=source)
+    return pd.DataFrame({
+        'upper': middle + (std * std_dev),
+        'middle': middle,
+        'lower': middle - (std * std_dev)
+    })
+
+
+@register_indicator('rsi', period=14, source='close')
+def _rsi(graph: IndicatorGraph, period: int, source: str) -> pd.Series:
+    delta = graph.get('price_change', source=source)
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+@register_indicator('macd', fast=12, slow=26, signal=9, source='close')
+def _macd(graph: IndicatorGraph, fast: int, slow: int, signal: int, source: str) -> pd.DataFrame:
+    macd = graph.get('ema', period=fast, source=source) - graph.get('ema', period=slow, source=source)
+    macd_signal = macd.ewm(span=signal).mean()
+    return pd.DataFrame({
+        'macd': macd,
+        'signal': macd_signal,
+        'histogram': macd - macd_signal
+    })
+
+
+def _window_sums(cumulative: np.ndarray, period: int) -> np.ndarray:
+    """Trailing ``period`` sums from a zero-prefixed cumulative sum; NaN until the window is full"""
+    n = cumulative.shape[0] - 1
+    sums = np.full(n, np.nan)
+    if period <= n:
+        sums[period - 1:] = cumulative[period:] - cumulative[:-period]
+    return sums
+
+
+def _prefixed_cumsum(values: np.ndarray) -> np.ndarray:
+    cumulative = np.empty(values.shape[0] + 1)
+    cumulative[0] = 0.0
+    np.cumsum(values, out=cumulative[1:])
+    return cumulative
+
+
+def _centred(values: np.ndarray) -> Tuple[np.ndarray, float, Optional[np.ndarray]]:
+    """Values centred on their mean with NaN zeroed, the mean, and the cumulative NaN count (None without NaN)"""
+    missing = np.isnan(values)
+    offset = float(np.nanmean(values)) if len(values) and not missing.all() else 0.0
+    if not missing.any():
+        return values - offset, offset, None
+    return np.where(missing, 0.0, values - offset), offset, _prefixed_cumsum(missing.astype(np.float64))
+
+
+def _mask_nan_windows(sums: np.ndarray, nan_counts: Optional[np.ndarray], period: int) -> np.ndarray:
+    """NaN out the windows holding a NaN, as ``Series.rolling(p)`` does"""
+    if nan_counts is not None:
+        sums[_window_sums(nan_counts, period) > 0] = np.nan
+    return sums
+
+
+def rolling_mean_batch(values: np.ndarray, periods: List[int]) -> np.ndarray:
+    """Rolling means of one series for several windows, as a bars x periods matrix.
+
+    All windows are differenced from one shared cumulative sum. Values are
+    centred first to limit cancellation, so results agree with
+    ``Series.rolling(p).mean()`` to floating-point noise rather than bit for bit.
+    A NaN only makes the windows holding it NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    centred, offset, nan_counts = _centred(values)
+    cumulative = _prefixed_cumsum(centred)
+    out = np.empty((len(values), len(periods)))
+    for j, period in enumerate(periods):
+        out[:, j] = _mask_nan_windows(_window_sums(cumulative, period), nan_counts, period) / period + offset
+    return out
+
+
+def rolling_std_batch(values: np.ndarray, periods: List[int]) -> np.ndarray:
+    """Rolling sample standard deviations (ddof=1) for several windows from shared cumulative sums"""
+    values = np.asarray(values, dtype=np.float64)
+    centred, _, nan_counts = _centred(values)
+    cumulative = _prefixed_cumsum(centred)
+    cumulative_sq = _prefixed_cumsum(centred * centred)
+    out = np.empty((len(values), len(periods)))
+    for j, period in enumerate(periods):
+        if period < 2:
+            out[:, j] = np.nan
+            continue
+        sums = _mask_nan_windows(_window_sums(cumulative, period), nan_counts, period)
+        sums_sq = _window_sums(cumulative_sq, period)
+        variance = (sums_sq - sums * sums / period) / (period - 1)
+        out[:, j] = np.sqrt(np.maximum(variance, 0.0))
+    return out
+
+
+# Panel versions of the indicators above: bars x tickers arrays in, bars x tickers arrays out.
+# A NaN cell is a bar the ticker does not have on the shared axis. Columns are grouped by
+# their valid rows and each group is one pandas call over just those rows, so column j
+# equals the indicator of ticker j's own series; missing bars stay NaN.
+
+PanelResult = Union[np.ndarray, Dict[str, np.ndarray]]
+
+
+def _on_valid_rows(values: np.ndarray, compute: Callable[[pd.DataFrame], PanelResult]) -> PanelResult:
+    """Run compute on each group of columns sharing the same valid rows and scatter the results back"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    if valid.all():
+        return compute(pd.DataFrame(values))
+    
+    groups: Dict[bytes, List[int]] = {}
+    for j in range(values.shape[1]):
+        groups.setdefault(valid[:, j].tobytes(), []).append(j)
+    
+    out: Dict[str, np.ndarray] = {}
+    for columns in groups.values():
+        rows = valid[:, columns[0]]
+        result = compute(pd.DataFrame(values[np.ix_(rows, columns)]))
+        for key, array in (result.items() if isinstance(result, dict) else [(None, result)]):
+            if key not in out:
+                out[key] = np.full(values.shape, np.nan)
+            out[key][np.ix_(rows, columns)] = array
+    return out[None] if None in out else out
+
+
+def panel_previous(values: np.ndarray) -> np.ndarray:
+    """Each cell's value on the ticker's previous bar, skipping bars it does not have"""
+    return _on_valid_rows(values, lambda frame: frame.shift(1).to_numpy())
+
+
+def panel_sma(values: np.ndarray, period: int) -> np.ndarray:
+    return _on_valid_rows(values, lambda frame: frame.rolling(window=period).mean().to_numpy())
+
+
+def panel_ema(values: np.ndarray, period: int) -> np.ndarray:
+    return _on_valid_rows(values, lambda frame: frame.ewm(span=period).mean().to_numpy())
+
+
+def panel_bollinger(values: np.ndarray, period: int, std_dev: float) -> Dict[str, np.ndarray]:
+    def compute(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        middle = frame.rolling(window=period).mean().to_numpy()
+        std = frame.rolling(window=period).std().to_numpy()
+        return {'upper': middle + (std * std_dev), 'middle': middle, 'lower': middle - (std * std_dev)}
+    return _on_valid_rows(values, compute)
+
+
+def panel_rsi(values: np.ndarray, period: int) -> np.ndarray:
+    def compute(frame: pd.DataFrame) -> np.ndarray:
+        delta = frame.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        rs = gain / loss
+        return (100 - (100 / (1 + rs))).to_numpy()
+    return _on_valid_rows(values, compute)
+
+
+def panel_macd(values: np.ndarray, fast: int, slow: int, signal: int) -> Dict[str, np.ndarray]:
+    def compute(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        macd = frame.ewm(span=fast).mean() - frame.ewm(span=slow).mean()
+        macd_signal = macd.ewm(span=signal).mean()
+        return {
+            'macd': macd.to_numpy(),
+            'signal': macd_signal.to_numpy(),
+            'histogram': (macd - macd_signal).to_numpy()
+        }
+    return _on_valid_rows(values, compute)
@@ -0,0 +1,398 @@
+"""Compiled array kernels for the backtest hot loops.
+
+Kernels take plain float64/bool/int64 NumPy arrays and are compiled with
+numba when it is installed; without numba they run as ordinary Python, so
+results are the same either way, only slower.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional at runtime
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+SIDE_LONG = 1
+SIDE_SHORT = -1
+
+
+@njit(cache=True)
+def ta_backtest_kernel(open_, low, close, long_, exit_long, short, exit_short,
+                       stop_loss_offsets, use_stop_loss, stop_loss_lvl, initial_balance):
+    """State machine of run_stock_ta_backtest over bar arrays.
+
+    ``stop_loss_offsets[i]`` is ``round(open_[i] * (stop_loss_lvl / 100), 4)``
+    precomputed by the caller with Python rounding.
+
+    Returns (market_value, trade_start_idx, trade_side, trade_end_idx,
+    trade_days, trade_pnl, trade_ret, n_starts, n_ends); the trade arrays are
+    only valid up to n_starts/n_ends.
+    """
+    n = open_.shape[0]
+    market_values = np.empty(n, dtype=np.float64)
+    start_idx = np.empty(n, dtype=np.int64)
+    sides = np.empty(n, dtype=np.int64)
+    end_idx = np.empty(n, dtype=np.int64)
+    days = np.empty(n, dtype=np.int64)
+    pnls = np.empty(n, dtype=np.float64)
+    rets = np.empty(n, dtype=np.float64)
+    n_starts = 0
+    n_ends = 0
+
+    balance = initial_balance
+    position = 0
+    last_signal = 0  # 0 hold, 1 long, -1 short
+    last_price = 0.0
+    last_entry = 0
+    c = 0
+
+    for i in range(n):
+        # check and close any positions
+        if exit_long[i] and last_signal == SIDE_LONG:
+            end_idx[n_ends] = i
+            days[n_ends] = c
+            pnls[n_ends] = (open_[i] - last_price) * position
+            rets[n_ends] = (open_[i] / last_price - 1) * 100
+            n_ends += 1
+            balance = balance + open_[i] * position
+            position = 0
+            last_signal = 0
+            c = 0
+        elif exit_short[i] and last_signal == SIDE_SHORT:
+            end_idx[n_ends] = i
+            days[n_ends] = c
+            pnl = (open_[i] - last_price) * position
+            pnls[n_ends] = pnl
+            rets[n_ends] = (last_price / open_[i] - 1) * 100
+            n_ends += 1
+            balance = balance + pnl
+            position = 0
+            last_signal = 0
+            c = 0
+
+        # check signal and enter any possible position
+        if long_[i] and last_signal != SIDE_LONG:
+            last_signal = SIDE_LONG
+            last_price = open_[i]
+            last_entry = i
+            start_idx[n_starts] = i
+            sides[n_starts] = SIDE_LONG
+            n_starts += 1
+            position = int(balance / open_[i])
+            balance = balance - position * open_[i]
+            c = 0
+        elif short[i] and last_signal != SIDE_SHORT:
+            last_signal = SIDE_SHORT
+            last_price = open_[i]
+            last_entry = i
+            start_idx[n_starts] = i
+            sides[n_starts] = SIDE_SHORT
+            n_starts += 1
+            position = int(balance / open_[i]) * -1
+            c = 0
+
+        if use_stop_loss:
+            # check stop loss
+            if last_signal == SIDE_LONG and (low[i] / last_price - 1) * 100 <= stop_loss_lvl:
+                c = c + 1
+                end_idx[n_ends] = i
+                days[n_ends] = c
+                stop_loss_price = last_price + stop_loss_offsets[last_entry]
+                pnls[n_ends] = (stop_loss_price - last_price) * position
+                rets[n_ends] = (stop_loss_price / last_price - 1) * 100
+                n_ends += 1
+                balance = balance + stop_loss_price * position
+                position = 0
+                last_signal = 0
+                c = 0
+            elif last_signal == SIDE_SHORT and (last_price / low[i] - 1) * 100 <= stop_loss_lvl:
+                c = c + 1
+                end_idx[n_ends] = i
+                days[n_ends] = c
+                stop_loss_price = last_price - stop_loss_offsets[last_entry]
+                pnl = (stop_loss_price - last_price) * position
+                pnls[n_ends] = pnl
+                rets[n_ends] = (last_price / stop_loss_price - 1) * 100
+                n_ends += 1
+                balance = balance + pnl
+                position = 0
+                last_signal = 0
+                c = 0
+
+        # compute market value and count days for any possible position
+        if last_signal == 0:
+            market_values[i] = balance
+        elif last_signal == SIDE_LONG:
+            c = c + 1
+            market_values[i] = position * close[i] + balance
+        else:
+            c = c + 1
+            market_values[i] = (close[i] - last_price) * position + balance
+
+    return market_values, start_idx, sides, end_idx, days, pnls, rets, n_starts, n_ends
+
+
+EXIT_NONE = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_TRAILING_STOP = 3
+
+
+@njit(cache=True)
+def exit_rules_kernel(open_, high, low, close, targets, stop_loss, take_profit, trailing_stop):
+    """Apply stop-loss, take-profit and trailing-stop exits to target positions.
+
+    ``targets`` is bars x runs of the positions a strategy wants at each
+    close; ``stop_loss``/``take_profit``/``trailing_stop`` hold one fraction
+    per run (0 disables). Positions are entered at the close. On later bars
+    the stops are checked against the bar's low (high for shorts) and the
+    take profit against its high (low), filling at the level or at the open
+    if the bar gaps through it; a stop wins when both trigger in one bar.
+    The trailing stop follows the best high (low) since entry, up to the
+    previous bar. After an exit the run stays flat until the target changes.
+
+    Returns (positions, gross_returns, turnover, exit_price, exit_reason),
+    each bars x runs; gross_returns and turnover are NaN on the first bar,
+    and exit_price is the close on bars without an intrabar exit.
+    """
+    n, runs = targets.shape
+    positions = np.zeros((n, runs))
+    gross = np.zeros((n, runs))
+    turnover = np.zeros((n, runs))
+    exit_price = np.empty((n, runs))
+    exit_reason = np.zeros((n, runs), dtype=np.int8)
+
+    for r in range(runs):
+        sl = stop_loss[r]
+        tp = take_profit[r]
+        ts = trailing_stop[r]
+        pos = 0.0
+        entry = 0.0
+        best = 0.0
+        waiting = False
+
+        for t in range(n):
+            exit_price[t, r] = close[t]
+            traded = 0.0
+            if t == 0:
+                gross[t, r] = np.nan
+            elif pos == 0.0:
+                gross[t, r] = 0.0
+            else:
+                reason = EXIT_NONE
+                reason_stop = EXIT_NONE
+                fill = close[t]
+                if pos > 0:
+                    stop = -np.inf
+                    if sl > 0:
+                        stop = entry * (1 - sl)
+                        reason_stop = EXIT_STOP_LOSS
+                    if ts > 0 and best * (1 - ts) > stop:
+                        stop = best * (1 - ts)
+                        reason_stop = EXIT_TRAILING_STOP
+                    if low[t] <= stop:
+                        reason = reason_stop
+                        fill = min(open_[t], stop)
+                    elif tp > 0 and high[t] >= entry * (1 + tp):
+                        reason = EXIT_TAKE_PROFIT
+                        fill = max(open_[t], entry * (1 + tp))
+                else:
+                    stop = np.inf
+                    if sl > 0:
+                        stop = entry * (1 + sl)
+                        reason_stop = EXIT_STOP_LOSS
+                    if ts > 0 and best * (1 + ts) < stop:
+                        stop = best * (1 + ts)
+                        reason_stop = EXIT_TRAILING_STOP
+                    if high[t] >= stop:
+                        reason = reason_stop
+                        fill = max(open_[t], stop)
+                    elif tp > 0 and low[t] <= entry * (1 - tp):
+                        reason = EXIT_TAKE_PROFIT
+                        fill = min(open_[t], entry * (1 - tp))
+
+                gross[t, r] = pos * (fill / close[t - 1] - 1)
+                if reason != EXIT_NONE:
+                    exit_price[t, r] = fill
+                    exit_reason[t, r] = reason
+                    traded += abs(pos)
+                    pos = 0.0
+                    waiting = True
+
+            # Follow the strategy's target, except while flat after an exit
+            target = targets[t, r]
+            if t > 0 and target != targets[t - 1, r]:
+                waiting = False
+            desired = 0.0 if waiting else target
+            if desired != pos:
+                traded += abs(desired - pos)
+                if desired != 0.0 and (pos == 0.0 or (desired > 0) != (pos > 0)):
+                    entry = close[t]
+                    best = close[t]
+                pos = desired
+            elif pos > 0:
+                best = max(best, high[t])
+            elif pos < 0:
+                best = min(best, low[t])
+
+            positions[t, r] = pos
+            turnover[t, r] = np.nan if t == 0 else traded
+
+    return positions, gross, turnover, exit_price, exit_reason
+
+
+@njit(cache=True)
+def _compensated_add(sums, compensation, row, column, value):
+    """Kahan summation step, as pandas groupby means accumulate"""
+    y = value - compensation[row, column]
+    t = sums[row, column] + y
+    compensation[row, column] = t - sums[row, column] - y
+    if compensation[row, column] != compensation[row, column]:
+        # An infinite value makes the compensation NaN; keep the sum infinite instead
+        compensation[row, column] = 0.0
+    sums[row, column] = t
+
+
+# Layout of the summary array returned by metrics_kernel
+METRIC_RETURN_MEAN = 0
+METRIC_RETURN_STD = 1
+METRIC_SHARPE = 2
+METRIC_MAX_DRAWDOWN = 3
+METRIC_MAX_DRAWDOWN_VALUE = 4
+METRIC_MAX_DRAWDOWN_PCT = 5
+METRIC_TRADES = 6
+METRIC_WINS = 7
+METRIC_LOSSES = 8
+METRIC_WIN_RATE = 9
+METRIC_AVG_WIN = 10
+METRIC_AVG_LOSS = 11
+METRIC_PROFIT_FACTOR = 12
+N_METRICS = 13
+
+# Columns of the per-side array returned by metrics_kernel; row 0 is long, row 1 short
+SIDE_TRADES = 0
+SIDE_WINS = 1
+SIDE_LOSSES = 2
+SIDE_AVG_DAYS = 3
+SIDE_AVG_RET = 4
+SIDE_AVG_RET_WIN = 5
+SIDE_AVG_RET_LOSS = 6
+SIDE_STD_RET = 7
+N_SIDE_METRICS = 8
+
+
+@njit(cache=True)
+def metrics_kernel(returns, equity, sides, days, pnl, trade_returns, periods_per_year):
+    """Performance and trade statistics in one pass over each array.
+
+    ``returns`` are per-bar strategy returns and ``equity`` the curve the
+    drawdown is measured on; NaNs in either are skipped. The trade arrays
+    are parallel: side (SIDE_LONG/SIDE_SHORT), bars held, P&L and return.
+    A trade wins on P&L > 0 and loses on P&L < 0.
+
+    Returns (summary, per_side) laid out by the METRIC_* and SIDE_*
+    constants. The return std and per-side std use ddof=1; per-side means
+    use compensated sums and the std Welford updates, as pandas groupby
+    does, so they match it exactly. Statistics without enough
+    observations are NaN, except the summary trade statistics, which are
+    0 (profit factor inf without losses) as in the reported metrics.
+    """
+    summary = np.empty(N_METRICS)
+
+    # Sharpe: Welford mean/variance of the returns
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(returns.shape[0]):
+        value = returns[i]
+        if np.isnan(value):
+            continue
+        count += 1
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+    summary[METRIC_RETURN_MEAN] = mean if count > 0 else np.nan
+    summary[METRIC_RETURN_STD] = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    std = summary[METRIC_RETURN_STD]
+    summary[METRIC_SHARPE] = summary[METRIC_RETURN_MEAN] / std * np.sqrt(periods_per_year) if std != 0 else 0.0
+
+    # Drawdown against the running peak, as a fraction, a value and a percentage
+    peak = -np.inf
+    drawdown = np.nan
+    drawdown_value = np.nan
+    drawdown_ratio = np.nan
+    for i in range(equity.shape[0]):
+        value = equity[i]
+        if np.isnan(value):
+            continue
+        if value > peak:
+            peak = value
+        fraction = (value - peak) / peak
+        ratio = value / peak - 1
+        if np.isnan(drawdown) or fraction < drawdown:
+            drawdown = fraction
+        if np.isnan(drawdown_value) or value - peak < drawdown_value:
+            drawdown_value = value - peak
+        if np.isnan(drawdown_ratio) or ratio < drawdown_ratio:
+            drawdown_ratio = ratio
+    summary[METRIC_MAX_DRAWDOWN] = drawdown
+    summary[METRIC_MAX_DRAWDOWN_VALUE] = drawdown_value
+    summary[METRIC_MAX_DRAWDOWN_PCT] = drawdown_ratio * 100
+
+    # Trades, overall and per side
+    sums = np.zeros((2, 4))  # days, return, winning return, losing return
+    compensation = np.zeros((2, 4))
+    counts = np.zeros((2, 3))  # trades, wins, losses
+    side_mean = np.zeros(2)
+    side_m2 = np.zeros(2)
+    win_sum = 0.0
+    loss_sum = 0.0
+    for k in range(pnl.shape[0]):
+        s = 0 if sides[k] == SIDE_LONG else 1
+        value = trade_returns[k]
+        counts[s, 0] += 1
+        _compensated_add(sums, compensation, s, 0, float(days[k]))
+        _compensated_add(sums, compensation, s, 1, value)
+        old_mean = side_mean[s]
+        side_mean[s] += (value - old_mean) / counts[s, 0]
+        side_m2[s] += (value - side_mean[s]) * (value - old_mean)
+        if pnl[k] > 0:
+            counts[s, 1] += 1
+            _compensated_add(sums, compensation, s, 2, value)
+            win_sum += pnl[k]
+        elif pnl[k] < 0:
+            counts[s, 2] += 1
+            _compensated_add(sums, compensation, s, 3, value)
+            loss_sum += pnl[k]
+
+    per_side = np.full((2, N_SIDE_METRICS), np.nan)
+    for s in range(2):
+        trades, wins, losses = counts[s, 0], counts[s, 1], counts[s, 2]
+        per_side[s, SIDE_TRADES] = trades
+        per_side[s, SIDE_WINS] = wins
+        per_side[s, SIDE_LOSSES] = losses
+        if trades > 0:
+            per_side[s, SIDE_AVG_DAYS] = sums[s, 0] / trades
+            per_side[s, SIDE_AVG_RET] = sums[s, 1] / trades
+        if wins > 0:
+            per_side[s, SIDE_AVG_RET_WIN] = sums[s, 2] / wins
+        if losses > 0:
+            per_side[s, SIDE_AVG_RET_LOSS] = sums[s, 3] / losses
+        if trades > 1:
+            per_side[s, SIDE_STD_RET] = np.sqrt(side_m2[s] / (trades - 1))
+
+    n_trades = counts[0, 0] + counts[1, 0]
+    n_wins = counts[0, 1] + counts[1, 1]
+    n_losses = counts[0, 2] + counts[1, 2]
+    avg_win = win_sum / n_wins if n_wins > 0 else 0.0
+    avg_loss = loss_sum / n_losses if n_losses > 0 else 0.0
+    summary[METRIC_TRADES] = n_trades
+    summary[METRIC_WINS] = n_wins
+    summary[METRIC_LOSSES] = n_losses
+    summary[METRIC_WIN_RATE] = n_wins / n_trades * 100 if n_trades > 0 else 0.0
+    summary[METRIC_AVG_WIN] = avg_win
+    summary[METRIC_AVG_LOSS] = avg_loss
+    summary[METRIC_PROFIT_FACTOR] = abs(avg_win / avg_loss) if avg_loss != 0 else np.inf
+    return summary, per_side
@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def profiling_requested(config: Dict[str, Any]) -> bool:
+    """Profile when the config asks for it or QUANTDECK_PROFILE is set"""
+    return bool(config.get('profile')) or os.environ.get('QUANTDECK_PROFILE', '') not in ('', '0')
+
+
+class StageProfiler:
+    """Records wall time, CPU time and peak allocation of named stages.
+
+    Stages are flat (not nested); each one resets the tracemalloc peak on
+    entry, so ``peak_kb`` is the most memory allocated above the level at
+    the start of that stage. A disabled profiler only runs the wrapped
+    code, so the stages can stay in place on the hot path.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True):
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.records: List[Dict[str, Any]] = []
+        self._started_tracing = False
+        self._start = time.perf_counter()
+
+    def __enter__(self) -> 'StageProfiler':
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, strategy: Optional[str] = None):
+        """Time the enclosed block as one stage, optionally per strategy"""
+        if not self.enabled:
+            yield
+            return
+
+        if self.trace_memory:
+            base_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'stage': name,
+                'strategy': strategy,
+                'wall_ms': round((time.perf_counter() - wall_start) * 1000, 3),
+                'cpu_ms': round((time.process_time() - cpu_start) * 1000, 3)
+            }
+            if self.trace_memory:
+                record['peak_kb'] = round((tracemalloc.get_traced_memory()[1] - base_memory) / 1024, 1)
+            self.records.append(record)
+
+    def summary(self) -> Dict[str, Any]:
+        """Stage records plus the wall time since the profiler started"""
+        return {
+            'total_wall_ms': round((time.perf_counter() - self._start) * 1000, 3),
+            'memory_traced': self.trace_memory,
+            'stages': self.records
+        }
+
+    def log(self, **context) -> None:
+        """Emit the summary as one JSON log line"""
+        if self.enabled:
+            logger.info(f"backtest_profile {json.dumps({**context, **self.summary()}, default=str)}")
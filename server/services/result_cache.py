@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import tempfile
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Config keys that do not change a backtest's output
+NON_SEMANTIC_KEYS = ('use_result_cache', 'profile', 'result_format', 'result_sidecar_dir', 'max_points')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ResultCache:
+    """Backtest results keyed by a canonical config hash and a bar fingerprint.
+
+    Results are held as serialized JSON, so every hit returns a fresh copy
+    and entry sizes are exact. The memory tier evicts least recently used
+    entries beyond ``max_bytes``; when a cache directory is configured
+    (``QUANTDECK_RESULT_CACHE_DIR``) entries are also written there and a
+    memory miss falls back to disk.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, cache_dir: Optional[str] = None):
+        self.max_bytes = max_bytes or int(os.environ.get('QUANTDECK_RESULT_CACHE_BYTES', DEFAULT_MAX_BYTES))
+        cache_dir = cache_dir or os.environ.get('QUANTDECK_RESULT_CACHE_DIR')
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        # Multi-ticker runs read and fill the cache from several threads
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def config_hash(config: Dict[str, Any]) -> str:
+        """Hash of the config with sorted keys, independent of dict order and whitespace"""
+        semantic = {key: value for key, value in config.items() if key not in NON_SEMANTIC_KEYS}
+        canonical = json.dumps(semantic, sort_keys=True, separators=(',', ':'), default=_json_default)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @staticmethod
+    def cacheable(config: Dict[str, Any]) -> bool:
+        """Whether a config's result depends only on the config and the bars.
+
+        Robustness analysis without a ``seed`` draws new bootstrap paths on
+        every run, so replaying a stored report would pass one random draw
+        off as deterministic.
+        """
+        robustness = config.get('robustness')
+        return not robustness or robustness.get('seed') is not None
+
+    @staticmethod
+    def bars_fingerprint(bars: pd.DataFrame) -> str:
+        """Hash of the bar timestamps, column names and values"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(bars.index.asi8).tobytes())
+        for column in bars.columns:
+            digest.update(str(column).encode())
+            digest.update(np.ascontiguousarray(bars[column].to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(config: Dict[str, Any], bars: pd.DataFrame) -> str:
+        """Cache key of a backtest config run on the given bars"""
+        return f"{ResultCache.config_hash(config)[:32]}-{ResultCache.bars_fingerprint(bars)}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}.json'
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(payload) > self.max_bytes:
+                return
+            self._entries[key] = payload
+            self.size += len(payload)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached result, or None on a miss"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+        if payload is None and self.cache_dir is not None:
+            try:
+                payload = self._path(key).read_bytes()
+                self._remember(key, payload)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable result cache entry {key}: {str(e)}")
+
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(payload)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result in memory and, if configured, on disk"""
+        payload = json.dumps(result, default=_json_default).encode()
+        self._remember(key, payload)
+
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f"Failed to write result cache entry {key}: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop the memory tier"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
@@ -0,0 +1,185 @@
+"""Compact columnar encoding of backtest results.
+
+The default result repeats the date axis as ``'%Y-%m-%d'`` strings and
+stores every series as a JSON list of numbers. The compact format stores
+the axis once and each series as a typed little-endian array::
+
+    {
+      "format": "compact-v1",
+      "axis": {"unit": "day", "values": <int32 days since 1970-01-01>},
+      "series": {"portfolio_value": <float64>, "price": <float64>, "signal": <int8>},
+      ...metrics, trades and the other keys unchanged
+    }
+
+An array is ``{"dtype", "length", "data"}`` with base64 data, or
+``{"dtype", "length", "offset", "nbytes"}`` pointing into the binary
+sidecar file named by the top-level ``"sidecar"`` key. Intraday axes use
+``"unit": "second"`` with int64 seconds since the epoch; from_compact
+expands them to ``'%Y-%m-%dT%H:%M:%S'`` timestamps rather than dates.
+"""
+import os
+import json
+import math
+import uuid
+import base64
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COMPACT_FORMAT = 'compact-v1'
+
+NANOS_PER_SECOND = 1_000_000_000
+SECONDS_PER_DAY = 86_400
+
+
+def _json_default(value: Any) -> Any:
+    """json.dumps fallback for NumPy and pandas values"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return str(value)
+
+
+def _finite(value: Any) -> Any:
+    """Replace NaN and infinities with None; JSON.parse rejects them"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def encode_json(value: Any) -> str:
+    """Strict JSON text of a result, as the worker sends it to the Node server"""
+    return json.dumps(_finite(value), default=_json_default, allow_nan=False)
+
+
+class _ArrayWriter:
+    """Encodes arrays inline as base64 or appends them to a sidecar buffer"""
+
+    def __init__(self, sidecar: bool):
+        self.sidecar = sidecar
+        self.chunks: List[bytes] = []
+        self.offset = 0
+
+    def encode(self, values: np.ndarray, dtype: str) -> Dict[str, Any]:
+        data = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()
+        block = {'dtype': dtype, 'length': len(values)}
+        if not self.sidecar:
+            block['data'] = base64.b64encode(data).decode('ascii')
+            return block
+        block['offset'] = self.offset
+        block['nbytes'] = len(data)
+        self.chunks.append(data)
+        self.offset += len(data)
+        return block
+
+
+def encode_axis(index: pd.DatetimeIndex, writer: _ArrayWriter) -> Dict[str, Any]:
+    """Epoch days for daily bars, epoch seconds otherwise"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    nanos = index.asi8
+    seconds = nanos // NANOS_PER_SECOND
+    if len(seconds) and np.all(seconds % SECONDS_PER_DAY == 0):
+        return {'unit': 'day', 'values': writer.encode(seconds // SECONDS_PER_DAY, 'int32')}
+    return {'unit': 'second', 'values': writer.encode(seconds, 'int64')}
+
+
+def decode_array(block: Dict[str, Any], sidecar: Optional[bytes] = None) -> np.ndarray:
+    """Decode an array block produced by to_compact"""
+    dtype = np.dtype(block['dtype']).newbyteorder('<')
+    if 'data' in block:
+        data = base64.b64decode(block['data'])
+    else:
+        data = sidecar[block['offset']:block['offset'] + block['nbytes']]
+    return np.frombuffer(data, dtype=dtype, count=block['length'])
+
+
+def _compact_series(result: Dict[str, Any], writer: _ArrayWriter) -> Dict[str, Any]:
+    """Move one result's list series into typed arrays; other keys are kept"""
+    compact = {
+        key: value for key, value in result.items()
+        if key not in ('portfolio_value', 'dates', 'signals', 'strategies')
+    }
+    series = {'portfolio_value': writer.encode(np.asarray(result['portfolio_value'], dtype=np.float64), 'float64')}
+    signals = result.get('signals')
+    if signals:
+        series['price'] = writer.encode(np.asarray(signals['prices'], dtype=np.float64), 'float64')
+        series['signal'] = writer.encode(np.asarray(signals['signals'], dtype=np.float64), 'int8')
+    compact['series'] = series
+    if 'strategies' in result:
+        compact['strategies'] = [_compact_series(strategy, writer) for strategy in result['strategies']]
+    return compact
+
+
+def to_compact(result: Dict[str, Any], index: pd.DatetimeIndex,
+               sidecar_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Convert a backtest result to the compact format.
+
+    ``index`` is the bar index every series of the result is aligned to.
+    With ``sidecar_dir`` the arrays go to a ``.bin`` file there instead of
+    inline base64.
+    """
+    if len(index) != len(result['portfolio_value']):
+        raise ValueError("Result series are not aligned to the given index")
+
+    writer = _ArrayWriter(sidecar=sidecar_dir is not None)
+    compact = {'format': COMPACT_FORMAT, 'axis': encode_axis(pd.DatetimeIndex(index), writer)}
+    compact.update(_compact_series(result, writer))
+
+    if sidecar_dir is not None:
+        directory = Path(sidecar_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{uuid.uuid4().hex}.bin'
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            for chunk in writer.chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+        compact['sidecar'] = str(path)
+
+    return compact
+
+
+def from_compact(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact result back to the list-based format"""
+    sidecar = Path(compact['sidecar']).read_bytes() if 'sidecar' in compact else None
+    axis = decode_array(compact['axis']['values'], sidecar).astype(np.int64)
+    if compact['axis']['unit'] == 'day':
+        dates = pd.to_datetime(axis * SECONDS_PER_DAY, unit='s').strftime('%Y-%m-%d').tolist()
+    else:
+        # Intraday bars share a date, so they keep their time of day
+        dates = pd.to_datetime(axis, unit='s').strftime('%Y-%m-%dT%H:%M:%S').tolist()
+
+    def expand(block: Dict[str, Any]) -> Dict[str, Any]:
+        result = {
+            key: value for key, value in block.items()
+            if key not in ('format', 'axis', 'series', 'sidecar', 'strategies')
+        }
+        series = block['series']
+        result['portfolio_value'] = decode_array(series['portfolio_value'], sidecar).tolist()
+        result['dates'] = dates
+        if 'signal' in series:
+            result['signals'] = {
+                'dates': dates,
+                'prices': decode_array(series['price'], sidecar).tolist(),
+                'signals': decode_array(series['signal'], sidecar).astype(np.int64).tolist()
+            }
+        if 'strategies' in block:
+            result['strategies'] = [expand(strategy) for strategy in block['strategies']]
+        return result
+
+    return expand(compact)
@@ -0,0 +1,160 @@
+import os
+import logging
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_METHODS = ('iid', 'block')
+BOOTSTRAP_SOURCES = ('returns', 'trades')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Upper bound on the working memory of one chunk of paths
+DEFAULT_CHUNK_BYTES = int(os.environ.get('QUANTDECK_BOOTSTRAP_CHUNK_BYTES', 64 * 1024 * 1024))
+
+# paths x periods arrays of one chunk alive at once: indices, resampled returns, growth, peak
+_ARRAYS_PER_CHUNK = 4
+
+
+class RobustnessService:
+    """Bootstrap resampling of a backtest's returns or trades"""
+
+    @staticmethod
+    def bootstrap_indices(rng: np.random.Generator, n_obs: int, n_paths: int, path_length: int,
+                          block_size: int = 1) -> np.ndarray:
+        """Observation indices of ``n_paths`` resampled paths, paths x path_length.
+
+        ``block_size`` 1 draws observations independently; larger blocks are
+        a circular block bootstrap, drawing runs of consecutive observations
+        (wrapping at the end) so autocorrelation within a block survives.
+        """
+        if block_size <= 1:
+            return rng.integers(0, n_obs, size=(n_paths, path_length))
+        n_blocks = -(-path_length // block_size)
+        starts = rng.integers(0, n_obs, size=(n_paths, n_blocks, 1))
+        indices = (starts + np.arange(block_size)).reshape(n_paths, n_blocks * block_size)[:, :path_length]
+        return indices % n_obs
+
+    @staticmethod
+    def path_statistics(returns: np.ndarray, initial_capital: float,
+                        periods_per_year: float) -> Dict[str, np.ndarray]:
+        """Final value, max drawdown (%) and Sharpe ratio of each row of a paths x periods matrix.
+
+        Drawdowns are measured from the initial capital onwards, so a path
+        that only ever loses still shows its full drawdown.
+        """
+        mean = returns.mean(axis=1)
+        std = returns.std(axis=1, ddof=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe_ratio = np.where(std != 0, mean / std * np.sqrt(periods_per_year), 0.0)
+
+        growth = np.add(returns, 1.0)
+        np.cumprod(growth, axis=1, out=growth)
+        final_value = initial_capital * growth[:, -1]
+        peak = np.maximum.accumulate(growth, axis=1)
+        np.maximum(peak, 1.0, out=peak)
+        np.divide(growth, peak, out=growth)
+        max_drawdown = (growth.min(axis=1) - 1) * 100
+
+        return {'final_value': final_value, 'max_drawdown': max_drawdown, 'sharpe_ratio': sharpe_ratio}
+
+    @staticmethod
+    def bootstrap(returns: np.ndarray, n_paths: int = 10000, block_size: int = 1,
+                  initial_capital: float = 10000, periods_per_year: float = 252,
+                  seed: Optional[int] = None, chunk_bytes: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Resample ``returns`` into ``n_paths`` paths of the same length; per-path statistics.
+
+        Paths are generated and scored in chunks sized so one chunk's
+        matrices stay under ``chunk_bytes``; only the per-path statistics
+        are kept, so memory does not grow with ``n_paths``.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[np.isfinite(returns)]
+        n_obs = len(returns)
+        if n_obs < 2:
+            raise ValueError("Bootstrapping needs at least two observations")
+        if n_paths < 1:
+            raise ValueError("Bootstrapping needs at least one path")
+
+        rng = np.random.default_rng(seed)
+        chunk_bytes = chunk_bytes or DEFAULT_CHUNK_BYTES
+        chunk_paths = max(1, chunk_bytes // (n_obs * 8 * _ARRAYS_PER_CHUNK))
+        samples = {key: np.empty(n_paths) for key in ('final_value', 'max_drawdown', 'sharpe_ratio')}
+        for start in range(0, n_paths, chunk_paths):
+            stop = min(start + chunk_paths, n_paths)
+            indices = RobustnessService.bootstrap_indices(rng, n_obs, stop - start, n_obs, block_size)
+            statistics = RobustnessService.path_statistics(returns[indices], initial_capital, periods_per_year)
+            for key, values in statistics.items():
+                samples[key][start:stop] = values
+        return samples
+
+    @staticmethod
+    def summarize(samples: Dict[str, np.ndarray], observed: Dict[str, float],
+                  initial_capital: float) -> Dict[str, Any]:
+        """Mean, std and percentiles of each statistic, and where the actual backtest falls"""
+        summary = {}
+        for key, values in samples.items():
+            summary[key] = {
+                'mean': round(float(values.mean()), 2),
+                'std': round(float(values.std()), 2),
+                'percentiles': {
+                    str(q): round(float(v), 2) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+                },
+                'observed': round(float(observed[key]), 2),
+                # Share of resampled paths at or below the actual backtest
+                'observed_percentile': round(float((values <= observed[key]).mean() * 100), 1)
+            }
+        summary['probability_of_loss'] = round(float((samples['final_value'] < initial_capital).mean() * 100), 1)
+        return summary
+
+    @staticmethod
+    def analyze(portfolio_value: np.ndarray, trades: pd.DataFrame, config: Dict[str, Any],
+                initial_capital: float) -> Dict[str, Any]:
+        """Robustness report of one backtest.
+
+        ``config`` keys: ``source`` ('returns' resamples per-bar strategy
+        returns, 'trades' the trades' returns in exit order), ``method``
+        ('iid' or 'block'), ``paths`` (default 10000), ``block_size``
+        (default 20, block method only) and ``seed``. Trade returns exclude
+        commission, and trade Sharpe ratios are annualized by the ledger's
+        trades per year.
+        """
+        source = config.get('source', 'returns')
+        method = config.get('method', 'iid')
+        if source not in BOOTSTRAP_SOURCES:
+            raise ValueError(f"Unknown bootstrap source '{source}'")
+        if method not in BOOTSTRAP_METHODS:
+            raise ValueError(f"Unknown bootstrap method '{method}'")
+        n_paths = int(config.get('paths', 10000))
+        block_size = int(config.get('block_size', 20)) if method == 'block' else 1
+
+        if source == 'returns':
+            values = np.asarray(portfolio_value, dtype=np.float64)
+            returns = values[1:] / values[:-1] - 1
+            periods_per_year = 252.0
+        else:
+            ordered = trades.sort_values('exit_date', kind='stable')
+            returns = ordered['return_pct'].to_numpy(dtype=np.float64) / 100
+            span_days = (ordered['exit_date'].max() - ordered['entry_date'].min()).days if len(ordered) else 0
+            periods_per_year = len(ordered) / (span_days / 365.25) if span_days > 0 else float(len(ordered))
+
+        samples = RobustnessService.bootstrap(
+            returns, n_paths, block_size, initial_capital, periods_per_year, config.get('seed')
+        )
+        finite = returns[np.isfinite(returns)]
+        observed = {
+            key: values[0]
+            for key, values in RobustnessService.path_statistics(
+                finite[None, :], initial_capital, periods_per_year
+            ).items()
+        }
+        return {
+            'source': source,
+            'method': method,
+            'paths': n_paths,
+            'block_size': block_size,
+            'path_length': len(finite),
+            **RobustnessService.summarize(samples, observed, initial_capital)
+        }
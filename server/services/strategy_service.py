@@ -1,71 +1,125 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Type
 import importlib
+import json
 import logging
+from pathlib import Path
 from .base_strategy import BaseStrategy
 
 logger = logging.getLogger(__name__)
 
+# Strategy id -> class name in strategies/<id>.py
+STRATEGY_CLASSES = {
+    'moving_average': 'MovingAverageStrategy',
+    'bollinger_bands': 'BollingerBandsStrategy',
+    'rsi': 'RSIStrategy',
+    'macd': 'MACDStrategy',
+    'lstm_model': 'LSTMStrategy'
+}
+
+MANIFEST_PATH = Path(__file__).resolve().parents[1] / 'strategies' / 'manifest.json'
+
 class StrategyService:
-    """Service for managing trading strategies"""
-    
-    def __init__(self):
-        self.strategies = {}
-        self._load_strategies()
-    
-    def _load_strategies(self):
-        """Load all available strategies"""
-        strategy_classes = {
-            'moving_average': 'MovingAverageStrategy',
-            'bollinger_bands': 'BollingerBandsStrategy', 
-            'rsi': 'RSIStrategy',
-            'macd': 'MACDStrategy',
-            'lstm_model': 'LSTMStrategy'
-        }
-        
-        for strategy_name, class_name in strategy_classes.items():
+    """Service for managing trading strategies.
+
+    Strategy metadata comes from strategies/manifest.json, so listing
+    strategies imports nothing; a strategy module is imported the first
+    time an instance of it is created. Regenerate the manifest after
+    changing a strategy with ``python -m services.strategy_service``.
+    """
+
+    def __init__(self, manifest_path: Optional[Path] = None):
+        self.manifest_path = Path(manifest_path or MANIFEST_PATH)
+        self.strategies: Dict[str, Type[BaseStrategy]] = {}
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Read strategy metadata, building it by import if the manifest is missing or stale"""
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+            if set(manifest) == set(STRATEGY_CLASSES):
+                return manifest
+            logger.warning(f"Strategy manifest {self.manifest_path} is out of date, rebuilding in memory")
+        except FileNotFoundError:
+            logger.warning(f"Strategy manifest {self.manifest_path} not found, rebuilding in memory")
+        except Exception as e:
+            logger.error(f"Failed to read strategy manifest: {str(e)}")
+        return self.build_manifest()
+
+    def _load_strategy(self, strategy_name: str) -> Type[BaseStrategy]:
+        """Import a strategy class on first use"""
+        if strategy_name in self.strategies:
+            return self.strategies[strategy_name]
+        if strategy_name not in self.manifest:
+            raise ValueError(f"Strategy '{strategy_name}' not found")
+
+        entry = self.manifest[strategy_name]
+        module = importlib.import_module(entry['module'])
+        strategy_class = getattr(module, entry['class'])
+        self.strategies[strategy_name] = strategy_class
+        logger.info(f"Loaded strategy: {strategy_name}")
+        return strategy_class
+
+    @staticmethod
+    def build_manifest() -> Dict[str, Dict[str, Any]]:
+        """Import every strategy and collect its metadata"""
+        manifest = {}
+        for strategy_name, class_name in STRATEGY_CLASSES.items():
             try:
-                module = importlib.import_module(f'strategies.{strategy_name}')
-                strategy_class = getattr(module, class_name)
-                self.strategies[strategy_name] = strategy_class
-                logger.info(f"Loaded strategy: {strategy_name}")
+                module_name = f'strategies.{strategy_name}'
+                strategy_class = getattr(importlib.import_module(module_name), class_name)
+                manifest[strategy_name] = {
+                    'module': module_name,
+                    'class': class_name,
+                    'name': class_name.replace('Strategy', ''),
+                    'type': 'technical' if strategy_name != 'lstm_model' else 'ml',
+                    'description': strategy_class.__doc__ or 'No description available',
+                    'parameters': strategy_class({}).get_parameter_config()
+                }
             except Exception as e:
                 logger.error(f"Failed to load strategy {strategy_name}: {str(e)}")
-    
+        return manifest
+
+    @staticmethod
+    def write_manifest(manifest_path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+        """Rebuild the manifest from the strategy modules and save it"""
+        manifest = StrategyService.build_manifest()
+        Path(manifest_path or MANIFEST_PATH).write_text(json.dumps(manifest, indent=2) + '\n')
+        return manifest
+
     def get_available_strategies(self) -> List[Dict[str, Any]]:
         """Get list of available strategies with metadata"""
-        strategies = []
-        
-        for name, strategy_class in self.strategies.items():
-            # Create temporary instance to get metadata
-            temp_instance = strategy_class({})
-            strategies.append({
+        return [
+            {
                 'id': name,
-                'name': strategy_class.__name__.replace('Strategy', ''),
-                'type': 'technical' if name != 'lstm_model' else 'ml',
-                'description': strategy_class.__doc__ or 'No description available',
-                'parameters': temp_instance.get_parameter_config()
-            })
-        
-        return strategies
-    
+                'name': entry['name'],
+                'type': entry['type'],
+                'description': entry['description'],
+                'parameters': entry['parameters']
+            }
+            for name, entry in self.manifest.items()
+        ]
+
     def create_strategy_instance(self, strategy_name: str, parameters: Dict[str, Any]) -> BaseStrategy:
         """Create an instance of the specified strategy"""
-        if strategy_name not in self.strategies:
-            raise ValueError(f"Strategy '{strategy_name}' not found")
-        
-        strategy_class = self.strategies[strategy_name]
+        strategy_class = self._load_strategy(strategy_name)
         return strategy_class(parameters)
-    
+
     def validate_parameters(self, strategy_name: str, parameters: Dict[str, Any]) -> bool:
         """Validate strategy parameters"""
-        if strategy_name not in self.strategies:
+        if strategy_name not in self.manifest:
             return False
-        
+
         try:
             # Create temporary instance to validate parameters
-            strategy_class = self.strategies[strategy_name]
+            strategy_class = self._load_strategy(strategy_name)
             strategy_class(parameters)
             return True
         except Exception as e:
             logger.error(f"Parameter validation failed for {strategy_name}: {str(e)}")
             return False
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    manifest = StrategyService.write_manifest()
+    print(f"Wrote {len(manifest)} strategies to {MANIFEST_PATH}")
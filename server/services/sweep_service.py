@@ -0,0 +1,211 @@
+import os
+import math
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .backtest_service import BacktestService, EXIT_RULES
+from .data_service import DataService
+from .indicators import IndicatorGraph
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on bars x combinations evaluated as one batch (~160 MB per float64 matrix)
+MAX_BATCH_CELLS = 20_000_000
+
+# Per-process state of sweep workers, filled by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(bars_by_ticker: Dict[str, pd.DataFrame]) -> None:
+    """Receive the OHLCV frames once per worker process, not once per task"""
+    _worker_state['bars'] = bars_by_ticker
+    _worker_state['backtest'] = BacktestService()
+    _worker_state['graphs'] = {}
+    _worker_state['batches'] = {}
+
+
+def _indicator_graph(ticker: str) -> IndicatorGraph:
+    """The worker's indicator graph for a ticker, built on first use"""
+    graph = _worker_state['graphs'].get(ticker)
+    if graph is None:
+        graph = _worker_state['graphs'][ticker] = IndicatorGraph(_worker_state['bars'][ticker])
+    return graph
+
+
+def _run_chunk(task: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Backtest one strategy over a chunk of parameter sets for one ticker.
+
+    The whole chunk is evaluated as one bars x combinations matrix; if that
+    fails, each combination is run on its own so one bad set cannot sink
+    the rest.
+    """
+    ticker = task['ticker']
+    bars = _worker_state['bars'][ticker]
+    backtest = _worker_state['backtest']
+
+    # Indicators shared by several parameter sets are computed once per worker
+    graph = _indicator_graph(ticker)
+
+    # Every parameter set is run once per exit-rule set (percentages, see BacktestService)
+    exit_sets = task.get('exit_sets') or [{}]
+    runs = [
+        (parameters, exit_set) for exit_set in exit_sets for parameters in task['parameter_sets']
+    ]
+    
+    try:
+        strategy = backtest.strategy_service.create_strategy_instance(task['strategy_name'], {})
+        strategy.bind_indicators(graph)
+        batch = strategy.generate_signals_batch(bars, task['parameter_sets'])
+        positions = np.tile(batch['position'], (1, len(exit_sets)))
+        exits = {
+            rule: np.repeat([float(exit_set.get(rule) or 0) / 100 for exit_set in exit_sets],
+                            len(task['parameter_sets']))
+            for rule in EXIT_RULES
+        }
+        metrics = backtest._execute_backtest_batch(
+            bars['close'].to_numpy(), positions, task['initial_capital'], task['commission'],
+            bars, exits if any(exits[rule].any() for rule in EXIT_RULES) else None
+        )
+        return [
+            {'ticker': ticker, 'strategy': task['strategy_name'], **parameters, **exit_set, **row}
+            for (parameters, exit_set), row in zip(runs, metrics.to_dict('records'))
+        ]
+    except Exception as e:
+        logger.warning(f"Batched sweep failed for {ticker}, running combinations one by one: {str(e)}")
+    
+    rows = []
+    for parameters, exit_set in runs:
+        row = {'ticker': ticker, 'strategy': task['strategy_name'], **parameters, **exit_set}
+        try:
+            strategy = backtest.strategy_service.create_strategy_instance(task['strategy_name'], parameters)
+            strategy.bind_indicators(graph)
+            signals_df = strategy.generate_signals(bars)
+            portfolio = backtest._simulate_portfolio(
+                signals_df, task['initial_capital'], task['commission'], bars, backtest._exit_levels(exit_set)
+            )
+            trades = backtest._extract_trades(portfolio)
+            row.update(backtest._calculate_metrics(portfolio, trades, task['initial_capital']))
+        except Exception as e:
+            logger.error(f"Sweep run failed for {ticker} {parameters} {exit_set}: {str(e)}")
+            row['error'] = str(e)
+        rows.append(row)
+    return rows
+
+
+class SweepService:
+    """Service for running strategy parameter sweeps across a process pool"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backtest_service = BacktestService()
+
+    @staticmethod
+    def _slider_values(spec: Dict[str, Any]) -> List[Union[int, float]]:
+        """Expand a slider's min/max/step into its values, inclusive of max"""
+        start, stop, step = spec['min'], spec['max'], spec.get('step', 1)
+        values = np.round(np.arange(start, stop + step / 2, step), 10)
+        if all(float(v).is_integer() for v in (start, stop, step)):
+            return [int(v) for v in values]
+        return [float(v) for v in values]
+
+    @staticmethod
+    def parameter_grid(parameter_config: Dict[str, Any],
+                       parameter_ranges: Optional[Dict[str, Any]] = None,
+                       normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+                       ) -> List[Dict[str, Any]]:
+        """Build every parameter combination from UI parameter config.
+
+        Sliders expand to their min..max by step and selects to their options.
+        ``parameter_ranges`` overrides a parameter with an explicit list of
+        values or a ``{'min', 'max', 'step'}`` dict. With ``normalize`` (a
+        strategy's normalize_parameters) combinations that normalize to the
+        same set are kept once.
+        """
+        parameter_ranges = parameter_ranges or {}
+        names = []
+        axes = []
+        for name, spec in parameter_config.items():
+            override = parameter_ranges.get(name)
+            if isinstance(override, (list, tuple)):
+                values = list(override)
+            elif isinstance(override, dict):
+                values = SweepService._slider_values({**spec, **override})
+            elif spec.get('type') == 'slider':
+                values = SweepService._slider_values(spec)
+            elif spec.get('type') == 'select':
+                values = list(spec['options'])
+            else:
+                values = [spec.get('default')]
+            names.append(name)
+            axes.append(values)
+
+        grid = [dict(zip(names, combination)) for combination in itertools.product(*axes)]
+        if normalize is None:
+            return grid
+        unique = {}
+        for parameters in map(normalize, grid):
+            unique.setdefault(tuple(parameters.items()), parameters)
+        return list(unique.values())
+
+    def run_sweep(self, strategy_name: str, tickers: List[str], start_date: str, end_date: str,
+                  parameter_ranges: Optional[Dict[str, Any]] = None, initial_capital: float = 10000,
+                  commission: float = 0.001,
+                  bars_by_ticker: Optional[Dict[str, pd.DataFrame]] = None,
+                  exit_ranges: Optional[Dict[str, List[float]]] = None) -> pd.DataFrame:
+        """Backtest every parameter combination on every ticker; one row per run.
+        
+        ``exit_ranges`` maps exit rules (stop_loss, take_profit,
+        trailing_stop) to lists of percentages; every parameter combination
+        is then also run with every combination of those levels.
+        """
+        strategy = self.backtest_service.strategy_service.create_strategy_instance(strategy_name, {})
+        parameter_sets = self.parameter_grid(strategy.get_parameter_config(), parameter_ranges,
+                                             strategy.normalize_parameters)
+        exit_ranges = exit_ranges or {}
+        unknown_rules = set(exit_ranges) - set(EXIT_RULES)
+        if unknown_rules:
+            raise ValueError(f"Unknown exit rules: {', '.join(sorted(unknown_rules))}")
+        exit_sets = [
+            dict(zip(exit_ranges, levels)) for levels in itertools.product(*exit_ranges.values())
+        ]
+
+        if bars_by_ticker is None:
+            bars_by_ticker = {
+                ticker: DataService.fetch_bars(ticker, start_date, end_date) for ticker in tickers
+            }
+
+        # A few chunks per worker keeps the pool busy without per-combination overhead,
+        # capped so one chunk's bars x combinations matrices stay a bounded size
+        chunk_size = max(1, math.ceil(len(parameter_sets) * len(tickers) / (self.max_workers * 4)))
+        max_bars = max(len(bars) for bars in bars_by_ticker.values())
+        chunk_size = min(chunk_size, max(1, MAX_BATCH_CELLS // max(max_bars * max(len(exit_sets), 1), 1)))
+        tasks = [
+            {
+                'ticker': ticker,
+                'strategy_name': strategy_name,
+                'parameter_sets': parameter_sets[i:i + chunk_size],
+                'initial_capital': initial_capital,
+                'commission': commission,
+                'exit_sets': exit_sets
+            }
+            for ticker in tickers
+            for i in range(0, len(parameter_sets), chunk_size)
+        ]
+        logger.info(f"Sweeping {strategy_name}: {len(parameter_sets)} combinations x "
+                    f"{max(len(exit_sets), 1)} exit sets x {len(tickers)} tickers "
+                    f"in {len(tasks)} tasks on {self.max_workers} workers")
+
+        if self.max_workers == 1:
+            _init_worker(bars_by_ticker)
+            chunks = [_run_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(bars_by_ticker,)) as executor:
+                chunks = list(executor.map(_run_chunk, tasks))
+
+        return pd.DataFrame([row for chunk in chunks for row in chunk])
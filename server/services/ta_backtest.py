@@ -0,0 +1,139 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Optional, Callable
+import logging
+from .kernels import (
+    ta_backtest_kernel, metrics_kernel, METRIC_MAX_DRAWDOWN_VALUE, METRIC_MAX_DRAWDOWN_PCT,
+    SIDE_TRADES, SIDE_WINS, SIDE_AVG_DAYS, SIDE_AVG_RET, SIDE_AVG_RET_WIN, SIDE_AVG_RET_LOSS, SIDE_STD_RET
+)
+
+logger = logging.getLogger(__name__)
+
+INITIAL_BALANCE = 1000000
+
+SIGNAL_COLUMNS = ['LONG', 'EXIT_LONG', 'SHORT', 'EXIT_SHORT']
+
+TRADE_STATS_COLUMNS = [
+    ("NUM_TRADES", SIDE_TRADES),
+    ("NUM_TRADES_WIN", SIDE_WINS),
+    ("AVG_DAYS", SIDE_AVG_DAYS),
+    ("AVG_RET", SIDE_AVG_RET),
+    ("AVG_RET_WIN", SIDE_AVG_RET_WIN),
+    ("AVG_RET_LOSS", SIDE_AVG_RET_LOSS),
+    ("STD_RET", SIDE_STD_RET),
+]
+
+
+def prepare_stock_ta_backtest_data(df: pd.DataFrame, start_date: str, end_date: str,
+                                   strategy: Callable[..., pd.DataFrame], **strategy_params) -> pd.DataFrame:
+    """Apply a research-script strategy and trim to the backtest window"""
+    df_strategy = strategy(df, **strategy_params)
+    bt_df = df_strategy[
+        (df_strategy.index >= start_date) & (df_strategy.index <= end_date)
+    ]
+    return bt_df
+
+
+def _python_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Element-wise ``round(float(v), ndigits)`` without a Python loop per element.
+
+    np.round scales by 10**ndigits before rounding, which only disagrees with
+    Python's correctly rounded ``round`` when the scaled value sits within a
+    few ulps of a half; those rare elements are redone with ``round``.
+    """
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.round(values, ndigits)
+    distance = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5)
+    ambiguous = np.flatnonzero(distance <= 1e-6 * np.maximum(1.0, np.abs(scaled)))
+    for i in ambiguous:
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def _signal_array(bt_df: pd.DataFrame, column: str) -> np.ndarray:
+    # Python truthiness, as in the row loop: NaN left by shift(1) counts as True
+    return bt_df[column].astype(bool).to_numpy()
+
+
+def simulate_stock_ta_backtest(bt_df: pd.DataFrame, stop_loss_lvl: Optional[float] = None) -> Dict[str, Any]:
+    """Run the compiled backtest state machine and return its raw arrays"""
+    open_ = bt_df['Open'].to_numpy(dtype=np.float64)
+    low = bt_df['Low'].to_numpy(dtype=np.float64)
+    close = bt_df['Close'].to_numpy(dtype=np.float64)
+
+    use_stop_loss = bool(stop_loss_lvl)
+    if use_stop_loss:
+        stop_loss_offsets = _python_round(open_ * (stop_loss_lvl / 100), 4)
+    else:
+        stop_loss_offsets = np.zeros(len(open_), dtype=np.float64)
+
+    (market_values, start_idx, sides, end_idx, days,
+     pnls, rets, n_starts, n_ends) = ta_backtest_kernel(
+        open_, low, close,
+        *(_signal_array(bt_df, column) for column in SIGNAL_COLUMNS),
+        stop_loss_offsets, use_stop_loss, float(stop_loss_lvl or 0), float(INITIAL_BALANCE)
+    )
+
+    # Trades still open at the end of the window are dropped
+    size = min(n_starts, n_ends)
+    return {
+        'market_value': market_values,
+        'start_idx': start_idx[:size],
+        'end_idx': end_idx[:size],
+        'side': sides[:size],
+        'days': days[:size],
+        'pnl': pnls[:size],
+        'ret': rets[:size]
+    }
+
+
+def _trade_stats_frame(per_side: np.ndarray) -> pd.DataFrame:
+    """Per-side trade statistics laid out like the groupby("SIDE") summary.
+
+    Rows are the sides that traded ("long" before "short"); trade counts are
+    integers, and NUM_TRADES_WIN is NaN (so float) for a side without wins.
+    """
+    rows = [s for s in range(2) if per_side[s, SIDE_TRADES] > 0]
+    index = pd.Index(np.array(["long", "short"], dtype=object)[rows], name="SIDE")
+    stats = per_side[rows]
+    columns = {}
+    for name, column in TRADE_STATS_COLUMNS:
+        values = stats[:, column]
+        if name == "NUM_TRADES":
+            values = values.astype(np.int64)
+        elif name == "NUM_TRADES_WIN":
+            values = np.where(values > 0, values, np.nan)
+            if not np.isnan(values).any():
+                values = values.astype(np.int64)
+        columns[name] = values
+    return pd.DataFrame(columns, index=index)
+
+
+def run_stock_ta_backtest(bt_df: pd.DataFrame, stop_loss_lvl: Optional[float] = None) -> Dict[str, Any]:
+    """Backtest LONG/EXIT_LONG/SHORT/EXIT_SHORT signals with open-price fills and an optional stop loss"""
+    sim = simulate_stock_ta_backtest(bt_df, stop_loss_lvl)
+    cum_value = sim['market_value']
+
+    # generate analysis
+    # performance over time
+    cum_ret_df = pd.DataFrame(cum_value, index=bt_df.index, columns=["CUM_RET"])
+    cum_ret_df["CUM_RET"] = (cum_ret_df.CUM_RET / INITIAL_BALANCE - 1) * 100
+    cum_ret_df["BUY_HOLD"] = (bt_df.Close / bt_df.Open.iloc[0] - 1) * 100
+    cum_ret_df["ZERO"] = 0
+
+    # trade stats and max drawdown in one compiled pass
+    summary, per_side = metrics_kernel(
+        np.empty(0), cum_value, sim['side'], sim['days'], sim['pnl'], sim['ret'], 252.0
+    )
+    detail_df = _trade_stats_frame(per_side)
+
+    # return all stats
+    return {
+        "cum_ret_df": cum_ret_df,
+        "max_drawdown": {
+            "value": round(summary[METRIC_MAX_DRAWDOWN_VALUE], 0),
+            "pct": round(summary[METRIC_MAX_DRAWDOWN_PCT], 2),
+        },
+        "trade_stats": detail_df,
+    }
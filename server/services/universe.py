@@ -0,0 +1,263 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+from .bar_cache import BarCache, Fetcher
+from .data_service import DataService
+
+logger = logging.getLogger(__name__)
+
+# Symbols per multi-ticker download request
+DEFAULT_BATCH_SIZE = int(os.environ.get('QUANTDECK_DOWNLOAD_BATCH_SIZE', 50))
+# Download requests in flight at once
+DEFAULT_DOWNLOAD_WORKERS = int(os.environ.get('QUANTDECK_DOWNLOAD_WORKERS', 4))
+# Download requests started per second, across all threads
+DEFAULT_REQUESTS_PER_SECOND = float(os.environ.get('QUANTDECK_DOWNLOAD_RATE', 2))
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# A half-open [start, end) date range
+DateRange = Tuple[pd.Timestamp, pd.Timestamp]
+
+# Built-in ticker universes; more can be added as <name>.txt files in QUANTDECK_UNIVERSE_DIR
+UNIVERSES: Dict[str, List[str]] = {
+    'dow30': [
+        'AAPL', 'AMGN', 'AMZN', 'AXP', 'BA', 'CAT', 'CRM', 'CSCO', 'CVX', 'DIS',
+        'GS', 'HD', 'HON', 'IBM', 'JNJ', 'JPM', 'KO', 'MCD', 'MMM', 'MRK',
+        'MSFT', 'NKE', 'NVDA', 'PG', 'SHW', 'TRV', 'UNH', 'V', 'VZ', 'WMT'
+    ],
+    'sector_etfs': ['XLB', 'XLC', 'XLE', 'XLF', 'XLI', 'XLK', 'XLP', 'XLRE', 'XLU', 'XLV', 'XLY']
+}
+
+
+def load_universe(name: str) -> List[str]:
+    """Tickers of a named universe.
+
+    A ``<name>.txt`` file in ``QUANTDECK_UNIVERSE_DIR`` (one ticker per
+    line, ``#`` starts a comment) takes precedence over the built-in lists.
+    """
+    universe_dir = os.environ.get('QUANTDECK_UNIVERSE_DIR')
+    if universe_dir:
+        path = Path(universe_dir) / f'{name}.txt'
+        if path.exists():
+            lines = (line.split('#', 1)[0].strip() for line in path.read_text().splitlines())
+            return [line.upper() for line in lines if line]
+    if name not in UNIVERSES:
+        raise ValueError(f"Unknown universe '{name}'")
+    return list(UNIVERSES[name])
+
+
+def resolve_tickers(config: Dict[str, Any]) -> List[str]:
+    """The tickers a backtest config asks for: ``tickers``, a ``universe`` or both, deduplicated in order"""
+    tickers = list(config.get('tickers') or [])
+    if config.get('universe'):
+        tickers.extend(load_universe(config['universe']))
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+    if not tickers:
+        raise ValueError("No tickers to backtest")
+    return tickers
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class UniverseLoader:
+    """Downloads bars for many tickers in batched multi-symbol requests.
+
+    Each ticker's missing date ranges come from the bar cache first, so
+    only what the cache lacks is downloaded, including any gap bridging
+    the request to the cached range. Tickers missing the same range are
+    split into batches of ``batch_size`` symbols and downloaded on a pool
+    of ``max_workers`` threads, with request starts limited to
+    ``requests_per_second``. Symbols a request did not return are retried
+    up to ``retries`` times with exponential backoff. Every download is
+    written through to the bar cache, so later single-ticker fetches
+    (DataService.fetch_bars) hit it.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 requests_per_second: Optional[float] = None, retries: int = 3, backoff: float = 1.0,
+                 bar_cache: Optional[BarCache] = None):
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.max_workers = max_workers or DEFAULT_DOWNLOAD_WORKERS
+        self.rate_limiter = RateLimiter(
+            requests_per_second if requests_per_second is not None else DEFAULT_REQUESTS_PER_SECOND
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.bar_cache = bar_cache or DataService.bar_cache
+        self.failed: Dict[str, str] = {}
+
+    @staticmethod
+    def _download(tickers: List[str], start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+        """One multi-symbol request, with the columns and adjustment of Ticker.history"""
+        return yf.download(
+            tickers, start=start_date, end=end_date, interval=interval, group_by='ticker',
+            auto_adjust=True, actions=True, ignore_tz=True, threads=False, progress=False
+        )
+
+    @staticmethod
+    def _split(data: Optional[pd.DataFrame], tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """Per-ticker frames of a download, without the rows it only has for other symbols"""
+        frames = {}
+        if data is None or data.empty:
+            return frames
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            else:
+                frame = data
+            frame = frame.dropna(how='all', subset=[c for c in PRICE_COLUMNS if c in frame.columns])
+            if not frame.empty:
+                frames[ticker] = frame.rename_axis(columns=None)
+        return frames
+
+    def _fetch_batch(self, tickers: List[str], start_date: str, end_date: str,
+                     interval: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """Download one batch, retrying the symbols that came back missing; frames and per-symbol errors"""
+        frames: Dict[str, pd.DataFrame] = {}
+        pending = list(tickers)
+        error = 'no data returned'
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            self.rate_limiter.wait()
+            try:
+                frames.update(self._split(self._download(pending, start_date, end_date, interval), pending))
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"Download of {len(pending)} tickers failed (attempt {attempt + 1}): {error}")
+            pending = [ticker for ticker in pending if ticker not in frames]
+            if not pending:
+                break
+        return frames, {ticker: error for ticker in pending}
+
+    def _missing(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp,
+                 interval: str) -> Tuple[List[DateRange], bool]:
+        """The ranges get_bars will fetch for [start, end), and whether the ticker has cached bars"""
+        cached = self.bar_cache.load(ticker, interval)
+        if cached is None:
+            return [(start, end)], False
+        _, covered_start, covered_end = cached
+        return self.bar_cache.missing_ranges(start, end, covered_start, covered_end), True
+
+    def load(self, tickers: List[str], start_date: str, end_date: str,
+             interval: str = '1d') -> Dict[str, pd.DataFrame]:
+        """Raw bars (as Ticker.history returns them) for [start_date, end_date), keyed by ticker.
+
+        Tickers that could not be downloaded are left out and listed in
+        ``self.failed`` with the last error.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        missing = {ticker: self._missing(ticker, start, end, interval) for ticker in tickers}
+
+        # Tickers missing the same range share batched requests for exactly that range
+        by_range: Dict[DateRange, List[str]] = {}
+        for ticker, (ranges, _) in missing.items():
+            for date_range in ranges:
+                by_range.setdefault(date_range, []).append(ticker)
+        batches = [
+            (date_range, group[i:i + self.batch_size])
+            for date_range, group in by_range.items()
+            for i in range(0, len(group), self.batch_size)
+        ]
+        n_cached = sum(not ranges for ranges, _ in missing.values())
+        logger.info(f"Loading {len(tickers)} tickers: {n_cached} cached, "
+                    f"{len(tickers) - n_cached} in {len(batches)} batched requests")
+
+        def fetch_batch(batch: Tuple[DateRange, List[str]]) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+            (range_start, range_end), batch_tickers = batch
+            return self._fetch_batch(batch_tickers, range_start.strftime('%Y-%m-%d'),
+                                     range_end.strftime('%Y-%m-%d'), interval)
+
+        downloaded: Dict[str, Dict[DateRange, pd.DataFrame]] = {}
+        errors: Dict[str, str] = {}
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                for (date_range, _), (frames, batch_errors) in zip(batches, executor.map(fetch_batch, batches)):
+                    for ticker, frame in frames.items():
+                        downloaded.setdefault(ticker, {})[date_range] = frame
+                    errors.update(batch_errors)
+
+        bars = {}
+        for ticker in tickers:
+            ranges, has_cache = missing[ticker]
+            if ranges and not has_cache and ticker not in downloaded:
+                # Nothing cached and nothing downloaded: most likely an unknown symbol
+                self.failed[ticker] = errors.get(ticker, 'no data returned')
+                continue
+            fetch = self._slicer(downloaded.get(ticker, {}))
+            try:
+                # Reads cached tickers and writes the downloaded ones through to the cache
+                bars[ticker] = self.bar_cache.get_bars(ticker, start_date, end_date, interval, fetch)
+            except Exception as e:
+                logger.warning(f"Failed to cache bars for {ticker}: {str(e)}")
+                self.failed[ticker] = str(e)
+        if self.failed:
+            logger.warning(f"No data for {len(self.failed)} tickers: {', '.join(sorted(self.failed))}")
+        return bars
+
+    @staticmethod
+    def _slicer(frames: Dict[DateRange, pd.DataFrame]) -> Fetcher:
+        """A BarCache fetcher serving the date ranges of already downloaded frames.
+
+        A request outside every downloaded range (such as one whose batch
+        failed) is downloaded on its own, so the bar cache never records
+        coverage for bars that were not fetched.
+        """
+        def fetch(ticker: str, start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+            start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+            for (range_start, range_end), frame in frames.items():
+                if range_start <= start.normalize() and end.normalize() <= range_end:
+                    local_index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+                    return frame[(local_index >= start) & (local_index < end)]
+            return DataService._download_history(ticker, start_date, end_date, interval)
+        return fetch
+
+    def load_bars(self, tickers: List[str], start_date: str, end_date: str,
+                  interval: str = '1d') -> Dict[str, pd.DataFrame]:
+        """Like load, in the columnar layout of DataService.fetch_bars"""
+        return {
+            ticker: DataService._to_columnar(data)
+            for ticker, data in self.load(tickers, start_date, end_date, interval).items()
+            if not data.empty
+        }
+
+    @staticmethod
+    def to_long_frame(frames: Dict[str, pd.DataFrame], symbol_column: str = 'Symbol') -> pd.DataFrame:
+        """Stack per-ticker frames into one long frame with a symbol column, in a single concat"""
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat([frame.assign(**{symbol_column: ticker}) for ticker, frame in frames.items()])
+
+    @staticmethod
+    def close_prices(frames: Dict[str, pd.DataFrame], column: str = 'Close') -> pd.DataFrame:
+        """One column of every ticker side by side on the union of their dates, in a single concat"""
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat({ticker: frame[column] for ticker, frame in frames.items()}, axis=1).sort_index()
@@ -0,0 +1,209 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtest_service import BacktestService, EXIT_RULES
+from .data_service import DataService
+from .sweep_service import SweepService, MAX_BATCH_CELLS, _init_worker, _worker_state
+
+logger = logging.getLogger(__name__)
+
+# Metrics a fold can maximize on its train window (fields of BacktestService._calculate_metrics)
+OBJECTIVES = ('total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate', 'avg_win', 'avg_loss',
+              'profit_factor', 'final_value')
+
+
+def _init_fold_worker(bars_by_ticker: Dict[str, pd.DataFrame], parameter_sets: List[Dict[str, Any]],
+                      batch: Dict[str, np.ndarray]) -> None:
+    """Receive the bars and the grid's signal and position matrices once per worker process.
+
+    The matrices cover the ticker's full history; indicators are causal,
+    so slicing them to a window gives the signals that window would see,
+    already warmed up at its first bar.
+    """
+    _init_worker(bars_by_ticker)
+    _worker_state['parameter_sets'] = parameter_sets
+    _worker_state['grid'] = batch
+
+
+def _run_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Optimize on one fold's train window and score the winner on its test window"""
+    bars = _worker_state['bars'][task['ticker']]
+    close = bars['close'].to_numpy(dtype=np.float64)
+    backtest = _worker_state['backtest']
+    parameter_sets = _worker_state['parameter_sets']
+    batch = _worker_state['grid']
+    exits = task['exits']
+    train = slice(task['train_start'], task['train_end'])
+    test = slice(task['test_start'], task['test_end'])
+
+    train_metrics = backtest._execute_backtest_batch(
+        close[train], batch['position'][train], task['initial_capital'], task['commission'],
+        bars.iloc[train], exits
+    )
+    # Undefined scores (e.g. a NaN Sharpe ratio) never win; ties go to the first set
+    scores = np.nan_to_num(train_metrics[task['objective']].to_numpy(dtype=np.float64), nan=-np.inf)
+    best = int(np.argmax(scores))
+
+    test_metrics = backtest._execute_backtest_batch(
+        close[test], batch['position'][test, best:best + 1], task['initial_capital'], task['commission'],
+        bars.iloc[test], exits
+    )
+    return {
+        'fold': task['fold'],
+        'parameters': parameter_sets[best],
+        'train': train_metrics.iloc[best].to_dict(),
+        'test': test_metrics.iloc[0].to_dict(),
+        'signal': batch['signal'][test, best],
+        'position': batch['position'][test, best]
+    }
+
+
+class WalkForwardService:
+    """Service for walk-forward (rolling or anchored train/test) optimization"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backtest_service = BacktestService()
+
+    @staticmethod
+    def windows(n_bars: int, train_bars: int, test_bars: int, step: Optional[int] = None,
+                anchored: bool = False) -> List[Dict[str, int]]:
+        """Train/test bar ranges (half-open) covering ``n_bars``.
+
+        Windows advance by ``step`` bars (default ``test_bars``). Rolling
+        windows keep ``train_bars`` of history; anchored ones always train
+        from the first bar. The last test window is cut at the final bar and
+        dropped if that leaves fewer than two bars.
+        """
+        step = step or test_bars
+        if train_bars < 2 or test_bars < 2 or step < 1:
+            raise ValueError("Train and test windows need at least two bars and the step at least one")
+        windows = []
+        start = 0
+        while start + train_bars + 2 <= n_bars:
+            train_end = start + train_bars
+            windows.append({
+                'train_start': 0 if anchored else start,
+                'train_end': train_end,
+                'test_start': train_end,
+                'test_end': min(train_end + test_bars, n_bars)
+            })
+            start += step
+        return windows
+
+    def run_walk_forward(self, strategy_name: str, ticker: str, start_date: str, end_date: str,
+                         train_bars: int = 252, test_bars: int = 63, step: Optional[int] = None,
+                         anchored: bool = False, parameter_ranges: Optional[Dict[str, Any]] = None,
+                         objective: str = 'sharpe_ratio', initial_capital: float = 10000,
+                         commission: float = 0.001, bars: Optional[pd.DataFrame] = None,
+                         exit_rules: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Walk-forward optimization of a strategy's parameter grid on one ticker.
+
+        Each fold picks the parameter set with the highest ``objective``
+        (a _calculate_metrics field) on its train window and trades it on
+        the following test window. The grid's signal and position matrices
+        are built once; folds run in parallel on a process pool that
+        receives them and the bars once per worker. The result is a backtest
+        result for the stitched out-of-sample positions, plus a
+        ``walk_forward`` section with every fold's choice and train/test
+        metrics. With ``step`` smaller than ``test_bars`` test windows
+        overlap and each bar is traded by the latest fold covering it.
+
+        ``exit_rules`` maps stop_loss, take_profit and trailing_stop to
+        percentages, as in a backtest config; they apply to the train
+        scoring, the test windows and the stitched run alike.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown walk-forward objective '{objective}'")
+        exit_rules = exit_rules or {}
+        unknown_rules = set(exit_rules) - set(EXIT_RULES)
+        if unknown_rules:
+            raise ValueError(f"Unknown exit rules: {', '.join(sorted(unknown_rules))}")
+        exits = self.backtest_service._exit_levels(exit_rules)
+        strategy = self.backtest_service.strategy_service.create_strategy_instance(strategy_name, {})
+        parameter_sets = SweepService.parameter_grid(strategy.get_parameter_config(), parameter_ranges,
+                                                     strategy.normalize_parameters)
+        if bars is None:
+            bars = DataService.fetch_bars(ticker, start_date, end_date)
+        if len(bars) * len(parameter_sets) > MAX_BATCH_CELLS:
+            raise ValueError(f"{len(parameter_sets)} parameter sets over {len(bars)} bars is too large "
+                             f"for one walk-forward run; narrow parameter_ranges")
+
+        windows = self.windows(len(bars), train_bars, test_bars, step, anchored)
+        if not windows:
+            raise ValueError(f"{len(bars)} bars are too few for a {train_bars}-bar train window")
+
+        # The grid's signals are built once here and shipped to each worker with the bars
+        batch = strategy.generate_signals_batch(bars, parameter_sets)
+        tasks = [
+            {
+                'fold': fold,
+                'ticker': ticker,
+                'objective': objective,
+                'exits': exits,
+                'initial_capital': initial_capital,
+                'commission': commission,
+                **window
+            }
+            for fold, window in enumerate(windows)
+        ]
+        logger.info(f"Walk-forward {strategy_name} on {ticker}: {len(parameter_sets)} combinations x "
+                    f"{len(windows)} folds on {self.max_workers} workers")
+
+        workers = min(self.max_workers, len(tasks))
+        worker_args = ({ticker: bars}, parameter_sets, batch)
+        if workers == 1:
+            _init_fold_worker(*worker_args)
+            folds = [_run_fold(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_fold_worker,
+                                     initargs=worker_args) as executor:
+                folds = list(executor.map(_run_fold, tasks))
+
+        return self._stitch(folds, windows, bars, strategy_name, initial_capital, commission, objective, exits)
+
+    def _stitch(self, folds: List[Dict[str, Any]], windows: List[Dict[str, int]], bars: pd.DataFrame,
+                strategy_name: str, initial_capital: float, commission: float,
+                objective: str, exits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Backtest the out-of-sample positions of all folds as one continuous run"""
+        start = windows[0]['test_start']
+        end = windows[-1]['test_end']
+        signal = np.zeros(end - start)
+        position = np.zeros(end - start)
+        for fold, window in zip(folds, windows):
+            test = slice(window['test_start'] - start, window['test_end'] - start)
+            signal[test] = fold['signal']
+            position[test] = fold['position']
+
+        # Switching parameters between folds is a position change like any other, so it pays commission
+        oos = bars.iloc[start:end]
+        signals_df = pd.DataFrame(
+            {'close': oos['close'], 'signal': signal.astype(np.int64), 'position': position}, index=oos.index
+        )
+        result = self.backtest_service._execute_backtest(
+            signals_df, initial_capital, commission, f'{strategy_name} (walk-forward)', oos, exits
+        )
+
+        dates = bars.index.strftime('%Y-%m-%d')
+        result['walk_forward'] = {
+            'objective': objective,
+            'folds': [
+                {
+                    'fold': fold['fold'],
+                    'train_start': dates[window['train_start']],
+                    'train_end': dates[window['train_end'] - 1],
+                    'test_start': dates[window['test_start']],
+                    'test_end': dates[window['test_end'] - 1],
+                    'parameters': fold['parameters'],
+                    'train_metrics': fold['train'],
+                    'test_metrics': fold['test']
+                }
+                for fold, window in zip(folds, windows)
+            ]
+        }
+        return result
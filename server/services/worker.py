@@ -0,0 +1,124 @@
+"""Long-lived Python worker for the Node server.
+
+Run from the ``server`` directory as ``python3 -m services.worker``. The
+worker reads one JSON request per line on stdin and writes one JSON
+response per line on stdout::
+
+    -> {"id": 1, "method": "run_backtest", "params": {"config": {...}}}
+    <- {"id": 1, "result": {...}}
+    <- {"id": 1, "error": "...", "traceback": "..."}
+
+Streaming methods (``run_backtest_batch``) first send one
+``{"id": 1, "partial": {...}}`` line per item, then the final response.
+
+Imports, the StrategyService and the bar cache stay warm between requests.
+A worker answers its requests in order; the Node server (pythonWorker.ts)
+runs backtests on separate worker processes so they cannot hold up quick
+calls such as validate_ticker.
+Anything printed by library code goes to stderr so it cannot corrupt the
+protocol stream.
+"""
+import sys
+import json
+import logging
+import traceback
+from typing import Dict, Any, Callable, Iterator, Optional, TextIO
+
+from .backtest_service import BacktestService
+from .data_service import DataService
+from .result_format import encode_json
+
+logger = logging.getLogger(__name__)
+
+
+class BacktestWorker:
+    """Dispatches protocol requests to warm service instances"""
+
+    def __init__(self):
+        self.backtest_service = BacktestService()
+        self.methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            'ping': lambda params: 'pong',
+            'fetch_stock_data': self.fetch_stock_data,
+            'validate_ticker': self.validate_ticker,
+            'get_strategies': self.get_strategies,
+            'run_backtest': self.run_backtest
+        }
+        self.streams: Dict[str, Callable[[Dict[str, Any]], Iterator[Any]]] = {
+            'run_backtest_batch': self.run_backtest_batch
+        }
+
+    def fetch_stock_data(self, params: Dict[str, Any]) -> Any:
+        return DataService.fetch_stock_data(params['ticker'], params['start_date'], params['end_date'])
+
+    def validate_ticker(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        is_valid = DataService.validate_ticker(params['ticker'])
+        info = DataService.get_ticker_info(params['ticker']) if is_valid else {}
+        return {'valid': is_valid, 'info': info}
+
+    def get_strategies(self, params: Dict[str, Any]) -> Any:
+        return self.backtest_service.strategy_service.get_available_strategies()
+
+    def run_backtest(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.backtest_service.run_backtest(params['config'])
+
+    def run_backtest_batch(self, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        return self.backtest_service.iter_backtest_batch(params['config'])
+
+    def handle(self, line: str,
+               emit: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Answer one request line; partial results of streaming methods go to ``emit``"""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            method = request.get('method')
+            params = request.get('params') or {}
+            if method in self.streams:
+                count = 0
+                for item in self.streams[method](params):
+                    if emit is not None:
+                        emit({'id': request_id, 'partial': item})
+                    count += 1
+                return {'id': request_id, 'result': {'count': count}}
+            if method not in self.methods:
+                raise ValueError(f"Unknown method '{method}'")
+            return {'id': request_id, 'result': self.methods[method](params)}
+        except Exception as e:
+            logger.error(f"Worker request {request_id} failed: {str(e)}")
+            return {'id': request_id, 'error': str(e), 'traceback': traceback.format_exc()}
+
+    def serve(self, stdin: TextIO, stdout: TextIO) -> None:
+        """Serve requests until stdin closes"""
+        def write(response: Dict[str, Any]) -> None:
+            try:
+                payload = encode_json(response)
+            except Exception as e:
+                error = f"Unserializable result: {str(e)}"
+                if 'partial' in response:
+                    # One bad item must not end the stream
+                    fallback = {'id': response['id'], 'partial': {'ticker': response['partial'].get('ticker'),
+                                                                  'error': error}}
+                else:
+                    fallback = {'id': response.get('id'), 'error': error}
+                payload = json.dumps(fallback)
+            stdout.write(payload + '\n')
+            stdout.flush()
+
+        for line in stdin:
+            if not line.strip():
+                continue
+            write(self.handle(line, write))
+
+
+def main() -> None:
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    worker = BacktestWorker()
+    protocol_out.write(json.dumps({'id': None, 'result': 'ready'}) + '\n')
+    protocol_out.flush()
+    worker.serve(sys.stdin, protocol_out)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,10 @@ from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Tuple, Optional
+from services.indicators import IndicatorGraph, IndicatorRequirement
+
+# How buy (1) / sell (-1) signals turn into positions, see BaseStrategy.positions_from_signals
+POSITION_MODES = ('hold_until_opposite', 'flat_on_exit', 'long_only', 'short_only')
 
 class BaseStrategy(ABC):
     """Base class for all trading strategies"""
@@ -9,6 +13,10 @@ class BaseStrategy(ABC):
     def __init__(self, parameters: Dict[str, Any]):
         self.parameters = parameters
         self.signals = pd.DataFrame()
+        self._indicator_graph: Optional[IndicatorGraph] = None
+        self.position_mode = parameters.get('position_mode', 'hold_until_opposite')
+        if self.position_mode not in POSITION_MODES:
+            raise ValueError(f"Unknown position mode '{self.position_mode}'")
         
     @abstractmethod
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
@@ -20,22 +28,183 @@ class BaseStrategy(ABC):
         """Return parameter configuration for UI"""
         pass
     
+    def required_indicators(self) -> List[IndicatorRequirement]:
+        """Return the (indicator, parameters) pairs this strategy reads"""
+        return []
+    
+    def normalize_parameters(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Map parameters onto the equivalent set this strategy actually runs"""
+        return dict(parameters)
+    
+    def bind_indicators(self, graph: IndicatorGraph) -> None:
+        """Share an indicator graph built once per run across strategies"""
+        self._indicator_graph = graph
+    
+    def indicators(self, data: pd.DataFrame) -> IndicatorGraph:
+        """Return the bound indicator graph for ``data``, or a private one"""
+        if self._indicator_graph is not None and self._indicator_graph.data is data:
+            return self._indicator_graph
+        return IndicatorGraph(data)
+    
+    def generate_signals_batch(self, data: pd.DataFrame,
+                               parameter_sets: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Generate signals for many parameter sets at once.
+        
+        Returns ``signal`` and ``position`` matrices of shape bars x parameter
+        sets. This default runs generate_signals once per set on a shared
+        indicator graph; strategies with purely columnar logic override it to
+        evaluate all sets in one array pass.
+        """
+        indicators = self.indicators(data)
+        signals = np.empty((len(data), len(parameter_sets)))
+        positions = np.empty((len(data), len(parameter_sets)))
+        for j, parameters in enumerate(parameter_sets):
+            strategy = self.__class__(parameters)
+            strategy.bind_indicators(indicators)
+            signals_df = strategy.generate_signals(data)
+            signals[:, j] = signals_df['signal'].to_numpy(dtype=np.float64)
+            positions[:, j] = signals_df['position'].to_numpy(dtype=np.float64)
+        return {'signal': signals, 'position': positions}
+    
+    def generate_signals_panel(self, panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Generate signals for many tickers at once.
+        
+        ``panel`` maps ``close`` (required) and any of ``open``, ``high``,
+        ``low`` and ``volume`` to bars x tickers arrays on one shared time
+        axis, with NaN where a ticker has no bar. Returns ``signal`` and
+        ``position`` matrices of the same shape; on a ticker's own bars they
+        equal generate_signals over just those bars, and on bars it lacks the
+        signal is 0 and the position is held. This default runs
+        generate_signals once per ticker column; strategies with purely
+        columnar logic override it to evaluate every ticker in one array pass.
+        """
+        close = np.asarray(panel['close'], dtype=np.float64)
+        signals = np.zeros(close.shape)
+        positions = np.zeros(close.shape)
+        for j in range(close.shape[1]):
+            valid = ~np.isnan(close[:, j])
+            rows = np.flatnonzero(valid)
+            data = pd.DataFrame({field: np.asarray(values, dtype=np.float64)[rows, j] for field, values in panel.items()})
+            signals_df = self.generate_signals(data)
+            signals[rows, j] = signals_df['signal'].to_numpy(dtype=np.float64)
+            
+            # Hold each bar's position through the bars the ticker lacks
+            held = np.maximum.accumulate(np.where(valid, np.arange(len(close)), -1))
+            column = np.zeros(len(close))
+            column[rows] = signals_df['position'].to_numpy(dtype=np.float64)
+            positions[:, j] = np.where(held >= 0, column[np.maximum(held, 0)], 0.0)
+        return {'signal': signals, 'position': positions}
+    
+    def signal_panel(self, signal: np.ndarray) -> Dict[str, np.ndarray]:
+        """Panel output: a bars x tickers signal matrix and its positions in this strategy's mode"""
+        signal = np.asarray(signal, dtype=np.float64)
+        return {'signal': signal, 'position': self.positions_from_signals(signal, self.position_mode)}
+    
+    @staticmethod
+    def batch_positions(signals: np.ndarray, strategies: List['BaseStrategy']) -> np.ndarray:
+        """Positions of a bars x sets signal matrix, each column in its strategy's mode"""
+        positions = np.empty(signals.shape)
+        modes = [strategy.position_mode for strategy in strategies]
+        for mode in set(modes):
+            columns = [j for j, column_mode in enumerate(modes) if column_mode == mode]
+            positions[:, columns] = BaseStrategy.positions_from_signals(signals[:, columns], mode)
+        return positions
+    
+    @staticmethod
+    def hold_until_opposite(signals: np.ndarray) -> np.ndarray:
+        """Forward-fill non-zero signals down each column; flat before the first signal"""
+        signals = np.asarray(signals, dtype=np.float64)
+        rows = np.arange(signals.shape[0]).reshape((-1,) + (1,) * (signals.ndim - 1))
+        last_signal_row = np.maximum.accumulate(np.where(signals != 0, rows, -1), axis=0)
+        held = np.take_along_axis(signals, np.maximum(last_signal_row, 0), axis=0)
+        return np.where(last_signal_row >= 0, held, 0.0)
+    
     def validate_data(self, data: pd.DataFrame) -> bool:
         """Validate input data"""
         required_columns = ['open', 'high', 'low', 'close', 'volume']
         return all(col in data.columns for col in required_columns)
     
+    @staticmethod
+    def _flat_on_exit(signals: np.ndarray) -> np.ndarray:
+        """Positions for one column where an opposite signal only closes the open position.
+        
+        Works on the non-zero signals as runs of equal values. A run is
+        entered flat unless the previous run left a position open; the
+        previous run left one open unless it was a single signal that
+        itself only closed a position. That recurrence alternates along
+        stretches of single-signal runs, so it resolves from the last
+        longer run with a parity check instead of a loop.
+        """
+        signal_rows = np.flatnonzero(signals)
+        values = signals[signal_rows]
+        positions = np.zeros(signals.shape[0])
+        if len(values) == 0:
+            return positions
+        
+        run_starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        run_lengths = np.diff(np.r_[run_starts, len(values)])
+        runs = np.arange(len(run_starts))
+        
+        # Runs of two or more signals always end in a position; the virtual run -1 ends flat
+        anchor = np.maximum.accumulate(np.where(run_lengths >= 2, runs, -1))
+        anchor_open = anchor >= 0
+        ends_open = anchor_open ^ ((runs - anchor) % 2 == 1)
+        entered_open = np.r_[False, ends_open[:-1]]
+        
+        # Only the first signal of a run entered with an opposite position closes it
+        run_of_signal = np.repeat(runs, run_lengths)
+        closes = entered_open[run_of_signal] & (np.arange(len(values)) == run_starts[run_of_signal])
+        after_signal = np.where(closes, 0.0, values)
+        
+        # Hold each signal's resulting position until the next signal
+        filled = np.zeros(signals.shape[0])
+        filled[signal_rows] = np.arange(1, len(values) + 1)
+        last_signal = np.maximum.accumulate(filled).astype(np.int64)
+        positions[last_signal > 0] = after_signal[last_signal[last_signal > 0] - 1]
+        return positions
+    
+    @staticmethod
+    def positions_from_signals(signals: np.ndarray, mode: str = 'hold_until_opposite') -> np.ndarray:
+        """Turn buy (1) / sell (-1) / no-op (0) signals into positions.
+        
+        Modes:
+        - ``hold_until_opposite``: each signal sets the position until the next one
+        - ``flat_on_exit``: an opposite signal closes the position; the next
+          signal opens one
+        - ``long_only`` / ``short_only``: hold-until-opposite with the other
+          side replaced by flat
+        
+        Accepts one signal column or a bars x columns matrix.
+        """
+        signals = np.nan_to_num(np.asarray(signals, dtype=np.float64))
+        if mode == 'hold_until_opposite':
+            return BaseStrategy.hold_until_opposite(signals)
+        if mode == 'long_only':
+            return np.maximum(BaseStrategy.hold_until_opposite(signals), 0.0)
+        if mode == 'short_only':
+            return np.minimum(BaseStrategy.hold_until_opposite(signals), 0.0)
+        if mode == 'flat_on_exit':
+            if signals.ndim == 1:
+                return BaseStrategy._flat_on_exit(signals)
+            return np.column_stack([BaseStrategy._flat_on_exit(signals[:, j]) for j in range(signals.shape[1])])
+        raise ValueError(f"Unknown position mode '{mode}'")
+    
+    def signal_frame(self, data: pd.DataFrame, columns: Dict[str, Any], signal: np.ndarray) -> pd.DataFrame:
+        """Build the strategy output: close, the strategy's own columns, signal and position.
+        
+        Only these columns are allocated; ``data`` itself is never copied.
+        """
+        return pd.DataFrame({
+            'close': data['close'],
+            **columns,
+            'signal': signal,
+            'position': self.positions_from_signals(signal, self.position_mode)
+        }, index=data.index)
+    
     def calculate_positions(self, signals: pd.DataFrame) -> pd.DataFrame:
-        """Calculate position sizes based on signals"""
+        """Calculate positions from the signal column in this strategy's position mode"""
         positions = signals.copy()
-        positions['position'] = 0
-        
-        for i in range(len(signals)):
-            if signals.iloc[i]['signal'] == 1:  # Buy signal
-                positions.iloc[i]['position'] = 1
-            elif signals.iloc[i]['signal'] == -1:  # Sell signal
-                positions.iloc[i]['position'] = -1
-                
+        positions['position'] = self.positions_from_signals(signals['signal'].to_numpy(), self.position_mode)
         return positions
     
     def get_strategy_info(self) -> Dict[str, Any]:
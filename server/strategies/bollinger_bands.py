@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+from services.indicators import IndicatorRequirement, rolling_mean_batch, rolling_std_batch, panel_bollinger
 from .base_strategy import BaseStrategy
 
 class BollingerBandsStrategy(BaseStrategy):
@@ -11,27 +12,50 @@ class BollingerBandsStrategy(BaseStrategy):
         self.period = parameters.get('period', 20)
         self.std_dev = parameters.get('stddev', 2)
         
+    def required_indicators(self) -> List[IndicatorRequirement]:
+        """Return the Bollinger Bands this strategy reads"""
+        return [('bollinger', {'period': self.period, 'std_dev': self.std_dev})]
+        
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on Bollinger Bands"""
-        df = data.copy()
-        
         # Calculate Bollinger Bands
-        df['BB_Middle'] = df['close'].rolling(window=self.period).mean()
-        bb_std = df['close'].rolling(window=self.period).std()
-        df['BB_Upper'] = df['BB_Middle'] + (bb_std * self.std_dev)
-        df['BB_Lower'] = df['BB_Middle'] - (bb_std * self.std_dev)
-        
-        # Generate signals
-        df['signal'] = 0
+        bands = self.indicators(data).get('bollinger', period=self.period, std_dev=self.std_dev)
+        close = data['close'].to_numpy()
         
         # Buy when price touches lower band, sell when touches upper band
-        df.loc[df['close'] <= df['BB_Lower'], 'signal'] = 1
-        df.loc[df['close'] >= df['BB_Upper'], 'signal'] = -1
+        signal = np.where(close >= bands['upper'].to_numpy(), -1,
+                          np.where(close <= bands['lower'].to_numpy(), 1, 0))
         
-        # Calculate positions
-        df['position'] = df['signal'].replace(to_replace=0, method='ffill').fillna(0)
+        return self.signal_frame(data, {
+            'BB_Upper': bands['upper'],
+            'BB_Middle': bands['middle'],
+            'BB_Lower': bands['lower']
+        }, signal)
+    
+    def generate_signals_batch(self, data: pd.DataFrame,
+                               parameter_sets: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Band-touch signals for many (period, stddev) pairs in one array pass"""
+        close = data['close'].to_numpy(dtype=np.float64)
+        strategies = [self.__class__(parameters) for parameters in parameter_sets]
         
-        return df[['close', 'BB_Upper', 'BB_Middle', 'BB_Lower', 'signal', 'position']]
+        periods = sorted({s.period for s in strategies})
+        columns = [periods.index(s.period) for s in strategies]
+        middle = rolling_mean_batch(close, periods)[:, columns]
+        std = rolling_std_batch(close, periods)[:, columns]
+        width = std * np.array([s.std_dev for s in strategies], dtype=np.float64)
+        
+        price = close[:, None]
+        signals = np.zeros_like(middle)
+        signals[price <= middle - width] = 1
+        signals[price >= middle + width] = -1
+        
+        return {'signal': signals, 'position': self.batch_positions(signals, strategies)}
+    
+    def generate_signals_panel(self, panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Band-touch signals for every ticker column in one array pass"""
+        close = np.asarray(panel['close'], dtype=np.float64)
+        bands = panel_bollinger(close, self.period, self.std_dev)
+        return self.signal_panel(np.where(close >= bands['upper'], -1, np.where(close <= bands['lower'], 1, 0)))
     
     def get_parameter_config(self) -> Dict[str, Any]:
         """Return parameter configuration for UI"""
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+from services.indicators import IndicatorRequirement
 from .base_strategy import BaseStrategy
 import warnings
 warnings.filterwarnings('ignore')
@@ -14,37 +15,34 @@ class LSTMStrategy(BaseStrategy):
         self.epochs = parameters.get('epochs', 50)
         self.units = parameters.get('units', 50)
         
+    def required_indicators(self) -> List[IndicatorRequirement]:
+        """Return the rolling features this strategy reads"""
+        return [('sma', {'period': 20})]
+        
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on LSTM predictions"""
-        df = data.copy()
-        
         # Simplified LSTM-like prediction using rolling statistics
         # In a real implementation, you would use TensorFlow/Keras
         
         # Calculate features for prediction
-        df['Returns'] = df['close'].pct_change()
-        df['MA_5'] = df['close'].rolling(window=5).mean()
-        df['MA_20'] = df['close'].rolling(window=20).mean()
-        df['Volatility'] = df['Returns'].rolling(window=self.lookback_period).std()
+        indicators = self.indicators(data)
+        close = data['close']
+        ma_20 = indicators.get('sma', period=20)
         
         # Simple prediction based on momentum and mean reversion
-        df['Momentum'] = (df['close'] - df['close'].shift(self.lookback_period)) / df['close'].shift(self.lookback_period)
-        df['MeanReversion'] = (df['close'] - df['MA_20']) / df['MA_20']
+        lagged = close.shift(self.lookback_period)
+        momentum = (close - lagged) / lagged
+        mean_reversion = (close - ma_20) / ma_20
         
         # Generate prediction score
-        df['PredictionScore'] = (df['Momentum'] * 0.6 + df['MeanReversion'] * -0.4)
+        prediction_score = momentum * 0.6 + mean_reversion * -0.4
         
         # Generate signals based on prediction
-        df['signal'] = 0
-        threshold = df['PredictionScore'].std() * 0.5
-        
-        df.loc[df['PredictionScore'] > threshold, 'signal'] = 1
-        df.loc[df['PredictionScore'] < -threshold, 'signal'] = -1
-        
-        # Calculate positions
-        df['position'] = df['signal'].replace(to_replace=0, method='ffill').fillna(0)
+        threshold = prediction_score.std() * 0.5
+        score = prediction_score.to_numpy()
+        signal = np.where(score < -threshold, -1, np.where(score > threshold, 1, 0))
         
-        return df[['close', 'PredictionScore', 'signal', 'position']]
+        return self.signal_frame(data, {'PredictionScore': prediction_score}, signal)
     
     def get_parameter_config(self) -> Dict[str, Any]:
         """Return parameter configuration for UI"""
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+from services.indicators import IndicatorRequirement, panel_macd, panel_previous
 from .base_strategy import BaseStrategy
 
 class MACDStrategy(BaseStrategy):
@@ -12,28 +13,43 @@ class MACDStrategy(BaseStrategy):
         self.slow_period = parameters.get('slowPeriod', 26)
         self.signal_period = parameters.get('signalPeriod', 9)
         
+    def required_indicators(self) -> List[IndicatorRequirement]:
+        """Return the MACD lines this strategy reads"""
+        return [('macd', {'fast': self.fast_period, 'slow': self.slow_period, 'signal': self.signal_period})]
+        
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on MACD"""
-        df = data.copy()
-        
         # Calculate MACD
-        ema_fast = df['close'].ewm(span=self.fast_period).mean()
-        ema_slow = df['close'].ewm(span=self.slow_period).mean()
-        df['MACD'] = ema_fast - ema_slow
-        df['MACD_Signal'] = df['MACD'].ewm(span=self.signal_period).mean()
-        df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-        
-        # Generate signals
-        df['signal'] = 0
+        macd = self.indicators(data).get(
+            'macd', fast=self.fast_period, slow=self.slow_period, signal=self.signal_period
+        )
+        line = macd['macd'].to_numpy()
+        signal_line = macd['signal'].to_numpy()
+        prev_line = np.r_[np.nan, line[:-1]]
+        prev_signal_line = np.r_[np.nan, signal_line[:-1]]
         
         # Buy when MACD crosses above signal line, sell when crosses below
-        df.loc[(df['MACD'] > df['MACD_Signal']) & (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1)), 'signal'] = 1
-        df.loc[(df['MACD'] < df['MACD_Signal']) & (df['MACD'].shift(1) >= df['MACD_Signal'].shift(1)), 'signal'] = -1
+        crosses_up = (line > signal_line) & (prev_line <= prev_signal_line)
+        crosses_down = (line < signal_line) & (prev_line >= prev_signal_line)
+        signal = np.where(crosses_down, -1, np.where(crosses_up, 1, 0))
         
-        # Calculate positions
-        df['position'] = df['signal'].replace(to_replace=0, method='ffill').fillna(0)
+        return self.signal_frame(data, {
+            'MACD': macd['macd'],
+            'MACD_Signal': macd['signal'],
+            'MACD_Histogram': macd['histogram']
+        }, signal)
+    
+    def generate_signals_panel(self, panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Signal-line crossovers for every ticker column in one array pass"""
+        macd = panel_macd(panel['close'], self.fast_period, self.slow_period, self.signal_period)
+        line = macd['macd']
+        signal_line = macd['signal']
+        prev_line = panel_previous(line)
+        prev_signal_line = panel_previous(signal_line)
         
-        return df[['close', 'MACD', 'MACD_Signal', 'MACD_Histogram', 'signal', 'position']]
+        crosses_up = (line > signal_line) & (prev_line <= prev_signal_line)
+        crosses_down = (line < signal_line) & (prev_line >= prev_signal_line)
+        return self.signal_panel(np.where(crosses_down, -1, np.where(crosses_up, 1, 0)))
     
     def get_parameter_config(self) -> Dict[str, Any]:
         """Return parameter configuration for UI"""
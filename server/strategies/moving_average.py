@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+from services.indicators import IndicatorRequirement, rolling_mean_batch, panel_sma, panel_ema, panel_previous
 from .base_strategy import BaseStrategy
 
 class MovingAverageStrategy(BaseStrategy):
@@ -11,34 +12,74 @@ class MovingAverageStrategy(BaseStrategy):
         self.period = parameters.get('period', 20)
         self.ma_type = parameters.get('type', 'SMA')
         
+    def normalize_parameters(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """WMA runs as SMA"""
+        if parameters.get('type') == 'WMA':
+            return {**parameters, 'type': 'SMA'}
+        return dict(parameters)
+    
+    def required_indicators(self) -> List[IndicatorRequirement]:
+        """Return the moving average this strategy reads"""
+        if self.ma_type == 'EMA':
+            return [('ema', {'period': self.period})]
+        return [('sma', {'period': self.period})]
+        
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on moving average crossover"""
-        df = data.copy()
-        
-        # Calculate moving average
-        if self.ma_type == 'SMA':
-            df['MA'] = df['close'].rolling(window=self.period).mean()
-        elif self.ma_type == 'EMA':
-            df['MA'] = df['close'].ewm(span=self.period).mean()
+        # Calculate moving average (WMA falls back to SMA)
+        indicators = self.indicators(data)
+        if self.ma_type == 'EMA':
+            ma = indicators.get('ema', period=self.period)
         else:
-            df['MA'] = df['close'].rolling(window=self.period).mean()
-        
-        # Generate signals
-        df['signal'] = 0
-        df['position'] = 0
+            ma = indicators.get('sma', period=self.period)
         
         # Buy when price crosses above MA, sell when crosses below
-        df.loc[df['close'] > df['MA'], 'signal'] = 1
-        df.loc[df['close'] < df['MA'], 'signal'] = -1
+        close = data['close'].to_numpy()
+        side = np.where(close < ma.to_numpy(), -1, np.where(close > ma.to_numpy(), 1, 0))
         
         # Only trigger on crossovers
-        df['prev_signal'] = df['signal'].shift(1)
-        df['signal'] = df['signal'].where(df['signal'] != df['prev_signal'], 0)
+        changed = np.r_[True, side[1:] != side[:-1]]
+        signal = np.where(changed, side, 0)
+        
+        return self.signal_frame(data, {'MA': ma}, signal)
+    
+    def generate_signals_batch(self, data: pd.DataFrame,
+                               parameter_sets: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Crossover signals for many MA settings in one array pass"""
+        close = data['close'].to_numpy(dtype=np.float64)
+        strategies = [self.__class__(parameters) for parameters in parameter_sets]
         
-        # Calculate positions
-        df['position'] = df['signal'].replace(to_replace=0, method='ffill').fillna(0)
+        # SMA columns come from one shared cumulative sum; EMAs from the indicator graph
+        ma = np.empty((len(close), len(strategies)))
+        sma_columns = [j for j, s in enumerate(strategies) if s.ma_type != 'EMA']
+        if sma_columns:
+            periods = sorted({strategies[j].period for j in sma_columns})
+            means = rolling_mean_batch(close, periods)
+            for j in sma_columns:
+                ma[:, j] = means[:, periods.index(strategies[j].period)]
+        indicators = self.indicators(data)
+        for j, strategy in enumerate(strategies):
+            if strategy.ma_type == 'EMA':
+                ma[:, j] = indicators.get('ema', period=strategy.period).to_numpy(dtype=np.float64)
+        
+        price = close[:, None]
+        raw = np.where(price > ma, 1.0, np.where(price < ma, -1.0, 0.0))
+        
+        # Only trigger on crossovers
+        signals = raw.copy()
+        signals[1:][raw[1:] == raw[:-1]] = 0
+        
+        return {'signal': signals, 'position': self.batch_positions(signals, strategies)}
+    
+    def generate_signals_panel(self, panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Crossover signals for every ticker column in one array pass"""
+        close = np.asarray(panel['close'], dtype=np.float64)
+        ma = panel_ema(close, self.period) if self.ma_type == 'EMA' else panel_sma(close, self.period)
+        side = np.where(np.isnan(close), np.nan, np.where(close < ma, -1, np.where(close > ma, 1, 0)))
         
-        return df[['close', 'MA', 'signal', 'position']]
+        # Only trigger on crossovers, against each ticker's previous bar
+        changed = side != panel_previous(side)
+        return self.signal_panel(np.where(changed & ~np.isnan(side), side, 0))
     
     def get_parameter_config(self) -> Dict[str, Any]:
         """Return parameter configuration for UI"""
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+from services.indicators import IndicatorRequirement, rolling_mean_batch, panel_rsi
 from .base_strategy import BaseStrategy
 
 class RSIStrategy(BaseStrategy):
@@ -12,28 +13,51 @@ class RSIStrategy(BaseStrategy):
         self.overbought = parameters.get('overbought', 70)
         self.oversold = parameters.get('oversold', 30)
         
+    def required_indicators(self) -> List[IndicatorRequirement]:
+        """Return the RSI this strategy reads"""
+        return [('rsi', {'period': self.period})]
+        
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on RSI"""
-        df = data.copy()
-        
         # Calculate RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # Generate signals
-        df['signal'] = 0
+        rsi = self.indicators(data).get('rsi', period=self.period)
+        values = rsi.to_numpy()
         
         # Buy when RSI < oversold, sell when RSI > overbought
-        df.loc[df['RSI'] < self.oversold, 'signal'] = 1
-        df.loc[df['RSI'] > self.overbought, 'signal'] = -1
+        signal = np.where(values > self.overbought, -1, np.where(values < self.oversold, 1, 0))
+        
+        return self.signal_frame(data, {'RSI': rsi}, signal)
+    
+    def generate_signals_batch(self, data: pd.DataFrame,
+                               parameter_sets: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Threshold signals for many (period, overbought, oversold) sets in one array pass"""
+        close = data['close'].to_numpy(dtype=np.float64)
+        strategies = [self.__class__(parameters) for parameters in parameter_sets]
+        
+        delta = np.diff(close, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
         
-        # Calculate positions
-        df['position'] = df['signal'].replace(to_replace=0, method='ffill').fillna(0)
+        periods = sorted({s.period for s in strategies})
+        columns = [periods.index(s.period) for s in strategies]
+        avg_gain = rolling_mean_batch(gain, periods)
+        avg_loss = rolling_mean_batch(loss, periods)
+        # Windows without any gain (loss) are exactly zero, as in the pandas version
+        avg_gain[rolling_mean_batch((gain > 0).astype(np.float64), periods) < 0.5 / np.array(periods)] = 0.0
+        avg_loss[rolling_mean_batch((loss > 0).astype(np.float64), periods) < 0.5 / np.array(periods)] = 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = (100 - (100 / (1 + avg_gain / avg_loss)))[:, columns]
         
-        return df[['close', 'RSI', 'signal', 'position']]
+        signals = np.zeros_like(rsi)
+        signals[rsi < np.array([s.oversold for s in strategies], dtype=np.float64)] = 1
+        signals[rsi > np.array([s.overbought for s in strategies], dtype=np.float64)] = -1
+        
+        return {'signal': signals, 'position': self.batch_positions(signals, strategies)}
+    
+    def generate_signals_panel(self, panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Threshold signals for every ticker column in one array pass"""
+        rsi = panel_rsi(panel['close'], self.period)
+        return self.signal_panel(np.where(rsi > self.overbought, -1, np.where(rsi < self.oversold, 1, 0)))
     
     def get_parameter_config(self) -> Dict[str, Any]:
         """Return parameter configuration for UI"""
@@ -0,0 +1,77 @@
+"""Shared fixtures: the ``server`` directory on sys.path and seeded synthetic bars.
+
+Run from the repository root with ``python -m pytest server/tests``. No
+test touches the network; downloads are replaced by synthetic bars.
+"""
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from services import universe
+from services.bar_cache import BarCache
+from services.data_service import DataService
+from services.universe import UniverseLoader
+from tests.synthetic import raw_bars, slice_fetcher
+
+# Tickers starting with this have no data, offline
+UNKNOWN_PREFIX = 'BAD'
+
+
+def synthetic_history(ticker: str) -> pd.DataFrame:
+    """The full offline history of a ticker: 1500 bars seeded by its name, or none"""
+    raw = raw_bars(1500, seed=sum(ticker.encode()))
+    return raw.iloc[:0] if ticker.startswith(UNKNOWN_PREFIX) else raw
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    """Columnar bars as DataService.fetch_bars returns them"""
+    return DataService._to_columnar(raw_bars())
+
+
+@pytest.fixture
+def offline_data(tmp_path, monkeypatch):
+    """Route DataService downloads to synthetic bars (one seed per ticker) and a temporary bar cache"""
+    calls = []
+
+    def download(ticker: str, start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+        calls.append((ticker, start_date, end_date))
+        return slice_fetcher(synthetic_history(ticker))(ticker, start_date, end_date, interval)
+
+    monkeypatch.setattr(DataService, 'bar_cache', BarCache(str(tmp_path / 'bars')))
+    monkeypatch.setattr(DataService, '_download_history', staticmethod(download))
+    return calls
+
+
+@pytest.fixture
+def offline_universe(offline_data, monkeypatch):
+    """Route UniverseLoader's batched downloads to the same synthetic bars, without sleeping.
+
+    Downloads are shaped like ``yf.download(group_by='ticker', ignore_tz=True)``:
+    ticker x field columns on a naive index, all-NaN for tickers without
+    data. Returns the recorded ``downloads`` (tickers, start, end) and
+    ``sleeps`` (seconds).
+    """
+    state = SimpleNamespace(downloads=[], sleeps=[])
+
+    def download(tickers, start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+        state.downloads.append((list(tickers), start_date, end_date))
+        frames = {}
+        for ticker in tickers:
+            raw = raw_bars(1500, seed=sum(ticker.encode()))
+            frame = slice_fetcher(raw)(ticker, start_date, end_date, interval).tz_localize(None)
+            frames[ticker] = frame * np.nan if ticker.startswith(UNKNOWN_PREFIX) else frame
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(UniverseLoader, '_download', staticmethod(download))
+    monkeypatch.setattr(universe, 'time', SimpleNamespace(monotonic=time.monotonic, sleep=state.sleeps.append))
+    return state
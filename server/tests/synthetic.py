@@ -0,0 +1,30 @@
+"""Seeded synthetic bars and fetchers shared by the tests"""
+import numpy as np
+import pandas as pd
+
+
+def raw_bars(n_bars: int = 600, seed: int = 0, start: str = '2015-01-01',
+             tz: str = 'America/New_York') -> pd.DataFrame:
+    """Seeded daily bars shaped like yfinance Ticker.history output"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=n_bars, tz=tz, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.004, n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, n_bars)))
+    volume = rng.integers(100_000, 1_000_000, n_bars).astype(np.float64)
+    return pd.DataFrame({
+        'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+        'Dividends': 0.0, 'Stock Splits': 0.0
+    }, index=index)
+
+
+def slice_fetcher(raw: pd.DataFrame, calls: list = None):
+    """A BarCache fetcher serving [start_date, end_date) of ``raw``, recording each call"""
+    local_index = raw.index.tz_localize(None) if raw.index.tz is not None else raw.index
+
+    def fetch(ticker: str, start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+        if calls is not None:
+            calls.append((ticker, start_date, end_date))
+        return raw[(local_index >= pd.Timestamp(start_date)) & (local_index < pd.Timestamp(end_date))]
+    return fetch
@@ -0,0 +1,113 @@
+import io
+import json
+import threading
+
+import pytest
+
+from services.backtest_service import BacktestService
+from services.universe import load_universe, resolve_tickers
+from services.worker import BacktestWorker
+
+RESULT_KEYS = {'strategy_name', 'portfolio_value', 'dates', 'trades', 'metrics', 'signals', 'data_metadata', 'config'}
+
+
+def _config(**overrides):
+    config = {
+        'tickers': ['AAA', 'BAD1', 'BBB'],
+        'start_date': '2015-01-01',
+        'end_date': '2019-01-01',
+        'initial_capital': 10000,
+        'use_result_cache': False,
+        'strategy_config': [{'name': 'rsi', 'parameters': {}}]
+    }
+    config.update(overrides)
+    return config
+
+
+def test_errors_are_reported_inline(offline_universe):
+    items = list(BacktestService().iter_backtest_batch(_config()))
+    by_ticker = {item['ticker']: item for item in items}
+    assert sorted(by_ticker) == ['AAA', 'BAD1', 'BBB']
+    assert set(by_ticker['BAD1']) == {'ticker', 'error'}
+    assert 'No data found for ticker BAD1' in by_ticker['BAD1']['error']
+    for ticker in ['AAA', 'BBB']:
+        assert set(by_ticker[ticker]) == {'ticker', 'result'}
+        result = by_ticker[ticker]['result']
+        assert RESULT_KEYS <= set(result)
+        assert result['config']['ticker'] == ticker
+        assert 'tickers' not in result['config']
+
+    # One batched download request for every ticker
+    assert [tickers for tickers, _, _ in offline_universe.downloads][0] == ['AAA', 'BAD1', 'BBB']
+
+
+def test_batch_results_match_single_runs(offline_universe):
+    batch = BacktestService().run_backtest(_config())
+    assert batch['tickers'] == ['AAA', 'BAD1', 'BBB']
+    assert list(batch['results']) == ['AAA', 'BBB']
+    assert list(batch['errors']) == ['BAD1']
+
+    config = {key: value for key, value in _config().items() if key != 'tickers'}
+    single = BacktestService().run_backtest({**config, 'ticker': 'AAA'})
+    assert batch['results']['AAA']['metrics'] == single['metrics']
+    assert batch['results']['AAA']['portfolio_value'][1:] == single['portfolio_value'][1:]
+
+
+def test_universe_names_resolve_to_their_tickers(offline_universe, tmp_path, monkeypatch):
+    (tmp_path / 'mini.txt').write_text('aaa\n# a comment\nBBB  # trailing comment\n\nccc\n')
+    monkeypatch.setenv('QUANTDECK_UNIVERSE_DIR', str(tmp_path))
+    assert load_universe('mini') == ['AAA', 'BBB', 'CCC']
+    assert resolve_tickers({'tickers': ['ddd', 'AAA'], 'universe': 'mini'}) == ['DDD', 'AAA', 'BBB', 'CCC']
+
+    batch = BacktestService().run_backtest_batch(_config(tickers=None, universe='mini'))
+    assert batch['tickers'] == ['AAA', 'BBB', 'CCC']
+    assert sorted(batch['results']) == ['AAA', 'BBB', 'CCC']
+
+
+def test_builtin_and_unknown_universes():
+    assert len(load_universe('dow30')) == 30
+    assert 'XLK' in load_universe('sector_etfs')
+    with pytest.raises(ValueError, match="Unknown universe 'nope'"):
+        load_universe('nope')
+    with pytest.raises(ValueError, match='No tickers'):
+        resolve_tickers({'tickers': [' ']})
+
+
+def test_results_are_yielded_as_each_ticker_completes(offline_universe, monkeypatch):
+    release = threading.Event()
+    run_backtest = BacktestService.run_backtest
+
+    def gated(self, config):
+        if config.get('ticker') == 'BBB':
+            assert release.wait(10)
+        return run_backtest(self, config)
+
+    monkeypatch.setattr(BacktestService, 'run_backtest', gated)
+    stream = BacktestService().iter_backtest_batch(_config(tickers=['AAA', 'BBB']), max_workers=2)
+    try:
+        # AAA arrives while BBB is still running
+        assert next(stream)['ticker'] == 'AAA'
+    finally:
+        release.set()
+    assert next(stream)['ticker'] == 'BBB'
+    assert next(stream, None) is None
+
+
+def test_bad_strategy_fails_before_any_download(offline_universe):
+    stream = BacktestService().iter_backtest_batch(_config(strategy_config=[{'name': 'nope', 'parameters': {}}]))
+    with pytest.raises(ValueError, match="Strategy 'nope' not found"):
+        next(stream)
+    assert offline_universe.downloads == []
+
+
+def test_worker_streams_one_line_per_ticker(offline_universe):
+    request = json.dumps({'id': 7, 'method': 'run_backtest_batch', 'params': {'config': _config()}})
+    stdout = io.StringIO()
+    BacktestWorker().serve(io.StringIO(request + '\n'), stdout)
+
+    lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert all(line['id'] == 7 for line in lines)
+    partials = [line['partial'] for line in lines[:-1]]
+    assert sorted(partial['ticker'] for partial in partials) == ['AAA', 'BAD1', 'BBB']
+    assert sum('error' in partial for partial in partials) == 1
+    assert lines[-1] == {'id': 7, 'result': {'count': 3}}
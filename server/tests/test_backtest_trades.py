@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_service import BacktestService
+
+
+def _reference_trades(portfolio: pd.DataFrame):
+    """The original iterrows trade loop, kept as the oracle (NaN positions as flat)"""
+    trades = []
+    position = 0
+    entry_price = 0
+    entry_date = None
+    for date, row in portfolio.fillna({'position': 0}).iterrows():
+        if row['position'] != position:
+            if position != 0:
+                exit_price = row['price']
+                pnl = (exit_price - entry_price) * position
+                return_pct = (pnl / (entry_price * abs(position))) * 100
+                trades.append({
+                    'entry_date': entry_date.strftime('%Y-%m-%d'),
+                    'exit_date': date.strftime('%Y-%m-%d'),
+                    'side': 'LONG' if position > 0 else 'SHORT',
+                    'entry_price': round(entry_price, 2),
+                    'exit_price': round(exit_price, 2),
+                    'quantity': abs(position),
+                    'pnl': round(pnl, 2),
+                    'return_pct': round(return_pct, 2)
+                })
+            if row['position'] != 0:
+                position = row['position']
+                entry_price = row['price']
+                entry_date = date
+            else:
+                position = 0
+    return trades
+
+
+def _portfolio(seed: int, n_bars: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # Runs of long, short and flat of random length, including direct long/short flips
+    runs = rng.integers(1, 15, n_bars)
+    levels = rng.choice([-1.0, 0.0, 1.0, 2.0], len(runs))
+    position = np.repeat(levels, runs)[:n_bars]
+    position[rng.random(n_bars) < 0.01] = np.nan
+    return pd.DataFrame({
+        'position': position,
+        'price': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    }, index=pd.bdate_range('2020-01-01', periods=n_bars))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_extract_trades_matches_reference_loop(seed):
+    portfolio = _portfolio(seed)
+    service = BacktestService()
+    ledger = service._extract_trades(portfolio)
+    assert service._trades_to_records(ledger) == _reference_trades(portfolio)
+
+
+def test_open_position_on_last_bar_is_not_a_trade():
+    portfolio = pd.DataFrame({'position': [0, 1, 1, 0, -1, -1], 'price': [10.0, 11, 12, 13, 14, 15]},
+                             index=pd.bdate_range('2020-01-01', periods=6))
+    ledger = BacktestService()._extract_trades(portfolio)
+    assert ledger[['side', 'entry_price', 'exit_price', 'pnl']].values.tolist() == [['LONG', 11.0, 13.0, 2.0]]
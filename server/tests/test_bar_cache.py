@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+
+from services.bar_cache import BarCache
+from services.data_service import DataService
+from tests.synthetic import raw_bars, slice_fetcher
+
+T = pd.Timestamp
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    ('2020-02-01', '2020-03-01', []),
+    ('2020-01-01', '2020-03-01', [('2020-01-01', '2020-02-01')]),
+    ('2020-02-01', '2020-05-01', [('2020-04-01', '2020-05-01')]),
+    ('2020-01-01', '2020-05-01', [('2020-01-01', '2020-02-01'), ('2020-04-01', '2020-05-01')]),
+    # Disjoint requests bridge the gap so coverage stays contiguous
+    ('2020-06-01', '2020-07-01', [('2020-04-01', '2020-07-01')]),
+    ('2019-06-01', '2019-07-01', [('2019-06-01', '2020-02-01')]),
+])
+def test_missing_ranges(start, end, expected):
+    ranges = BarCache.missing_ranges(T(start), T(end), T('2020-02-01'), T('2020-04-01'))
+    assert ranges == [(T(a), T(b)) for a, b in expected]
+
+
+def test_store_load_round_trip(tmp_path):
+    cache = BarCache(str(tmp_path))
+    bars = raw_bars(50)
+    cache.store('AAA', '1d', bars, T('2015-01-01'), T('2015-03-15'))
+    loaded, covered_start, covered_end = cache.load('AAA', '1d')
+    pd.testing.assert_frame_equal(loaded, bars, check_freq=False)
+    assert (covered_start, covered_end) == (T('2015-01-01'), T('2015-03-15'))
+    assert cache.load('BBB', '1d') is None
+
+
+def test_get_bars_fetches_only_uncached_ranges(tmp_path):
+    cache = BarCache(str(tmp_path))
+    raw = raw_bars(600)
+    calls = []
+    fetch = slice_fetcher(raw, calls)
+
+    first = cache.get_bars('AAA', '2015-06-01', '2016-01-01', '1d', fetch)
+    assert calls == [('AAA', '2015-06-01', '2016-01-01')]
+
+    calls.clear()
+    inside = cache.get_bars('AAA', '2015-07-01', '2015-09-01', '1d', fetch)
+    assert calls == []
+    pd.testing.assert_frame_equal(inside, slice_fetcher(raw)('AAA', '2015-07-01', '2015-09-01', '1d'),
+                                  check_freq=False)
+
+    calls.clear()
+    merged = cache.get_bars('AAA', '2015-01-01', '2016-06-01', '1d', fetch)
+    assert calls == [('AAA', '2015-01-01', '2015-06-01'), ('AAA', '2016-01-01', '2016-06-01')]
+    pd.testing.assert_frame_equal(merged, slice_fetcher(raw)('AAA', '2015-01-01', '2016-06-01', '1d'),
+                                  check_freq=False)
+    assert len(first) < len(merged)
+
+    _, covered_start, covered_end = cache.load('AAA', '1d')
+    assert (covered_start, covered_end) == (T('2015-01-01'), T('2016-06-01'))
+
+
+def test_get_bars_covers_empty_past_ranges(tmp_path):
+    cache = BarCache(str(tmp_path))
+    raw = raw_bars(100)
+    cache.get_bars('AAA', '2015-01-01', '2015-03-01', '1d', slice_fetcher(raw))
+
+    calls = []
+    empty = slice_fetcher(raw.iloc[:0], calls)
+    cache.get_bars('AAA', '2015-01-01', '2015-04-01', '1d', empty)
+    assert calls == [('AAA', '2015-03-01', '2015-04-01')]
+    _, _, covered_end = cache.load('AAA', '1d')
+    assert covered_end == T('2015-04-01')
+
+    calls.clear()
+    cache.get_bars('AAA', '2015-01-01', '2015-04-01', '1d', empty)
+    assert calls == []
+
+
+def test_get_bars_covers_empty_ranges_only_up_to_today(tmp_path):
+    cache = BarCache(str(tmp_path))
+    raw = raw_bars(100)
+    cache.get_bars('AAA', '2015-01-01', '2015-03-01', '1d', slice_fetcher(raw))
+    today = pd.Timestamp.today().normalize()
+    tomorrow = (today + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    calls = []
+    empty = slice_fetcher(raw.iloc[:0], calls)
+    cache.get_bars('AAA', '2015-01-01', tomorrow, '1d', empty)
+    _, _, covered_end = cache.load('AAA', '1d')
+    assert covered_end == today
+
+    # Only the still-forming session is fetched again
+    calls.clear()
+    cache.get_bars('AAA', '2015-01-01', tomorrow, '1d', empty)
+    assert calls == [('AAA', today.strftime('%Y-%m-%d'), tomorrow)]
+
+
+def test_get_bars_does_not_cache_an_empty_first_download(tmp_path):
+    cache = BarCache(str(tmp_path))
+    calls = []
+    empty = slice_fetcher(raw_bars(10).iloc[:0], calls)
+    assert cache.get_bars('AAA', '2015-01-01', '2015-03-01', '1d', empty).empty
+    assert cache.load('AAA', '1d') is None
+    cache.get_bars('AAA', '2015-01-01', '2015-03-01', '1d', empty)
+    assert len(calls) == 2
+
+
+def test_get_bars_merges_naive_downloads_into_aware_cache(tmp_path):
+    cache = BarCache(str(tmp_path))
+    raw = raw_bars(300)
+    cache.get_bars('AAA', '2015-01-01', '2015-06-01', '1d', slice_fetcher(raw))
+    merged = cache.get_bars('AAA', '2015-01-01', '2015-10-01', '1d', slice_fetcher(raw.tz_localize(None)))
+    assert str(merged.index.tz) == 'America/New_York'
+    pd.testing.assert_frame_equal(merged, slice_fetcher(raw)('AAA', '2015-01-01', '2015-10-01', '1d'),
+                                  check_freq=False)
+
+
+def test_fetch_bars_reads_through_cache(offline_data):
+    first = DataService.fetch_bars('AAA', '2015-03-01', '2016-01-01')
+    second = DataService.fetch_bars('AAA', '2015-06-01', '2015-09-01')
+    assert len(offline_data) == 1
+    pd.testing.assert_frame_equal(second, first.loc['2015-06-01':'2015-08-31'])
+    assert list(first.columns) == ['open', 'high', 'low', 'close', 'volume']
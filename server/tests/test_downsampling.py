@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from services.backtest_service import BacktestService
+from services.data_service import DataService
+from services.downsampling import downsample_result, lttb_indices
+from tests.synthetic import raw_bars
+
+
+def _config(strategies, **overrides):
+    config = {
+        'ticker': 'AAA',
+        'start_date': '2015-01-01',
+        'end_date': '2020-12-31',
+        'initial_capital': 10000,
+        'use_result_cache': False,
+        'strategy_config': [{'name': name, 'parameters': {}} for name in strategies]
+    }
+    config.update(overrides)
+    return config
+
+
+def _trade_dates(result):
+    dates = {date for trade in result['trades'] for date in (trade['entry_date'], trade['exit_date'])}
+    for strategy in result.get('strategies', []):
+        dates |= _trade_dates(strategy)
+    return dates
+
+
+def _assert_trades_on_axis(result):
+    assert _trade_dates(result) <= set(result['dates'])
+    for strategy in result.get('strategies', []):
+        assert strategy['dates'] == result['dates']
+        _assert_trades_on_axis(strategy)
+
+
+def test_lttb_keeps_endpoints_and_size():
+    values = np.random.default_rng(0).normal(size=1000).cumsum()
+    picks = lttb_indices(values, 100)
+    assert len(picks) == 100
+    assert picks[0] == 0 and picks[-1] == 999
+    assert np.all(np.diff(picks) > 0)
+
+
+@pytest.mark.parametrize('strategies', [['rsi'], ['moving_average', 'bollinger_bands']])
+@pytest.mark.parametrize('exit_rules', [{}, {'stop_loss': 2, 'take_profit': 5, 'trailing_stop': 3}])
+def test_every_trade_date_stays_on_the_axis(offline_data, strategies, exit_rules):
+    full = BacktestService().run_backtest(_config(strategies, **exit_rules))
+    downsampled = BacktestService().run_backtest(_config(strategies, max_points=300, **exit_rules))
+
+    assert downsampled['downsampled']['points'] < len(full['dates'])
+    assert downsampled['trades'] == full['trades']
+    _assert_trades_on_axis(downsampled)
+
+
+def test_equal_to_input_when_nothing_to_drop():
+    result = {'portfolio_value': [1.0, 2.0, 3.0], 'dates': ['2020-01-01', '2020-01-02', '2020-01-03'],
+              'trades': []}
+    downsampled, kept = downsample_result(result, 10)
+    assert downsampled is result
+    assert kept.tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize('strategy_name', ['rsi', 'moving_average', 'bollinger_bands'])
+def test_signal_dense_strategies_stay_near_max_points(strategy_name):
+    bars = DataService._to_columnar(raw_bars(20_000, seed=4, start='1950-01-01'))
+    service = BacktestService()
+    signals_df = service.strategy_service.create_strategy_instance(strategy_name, {}).generate_signals(bars)
+    portfolio = service._simulate_portfolio(signals_df, 10000, 0.001, bars)
+    trades = service._extract_trades(portfolio)
+    result = service._summarize_backtest(signals_df, portfolio, trades, 10000, strategy_name)
+    assert np.count_nonzero(result['signals']['signals']) > 1000
+
+    downsampled, kept = downsample_result(result, 1000)
+    # Only the trade bars, drawdown extremes and endpoints may push past max_points
+    trade_bars = len(_trade_dates(result))
+    assert len(kept) <= max(1000, trade_bars + 6)
+    if trade_bars < 500:
+        assert len(kept) >= 800
+    _assert_trades_on_axis(downsampled)
+    assert kept[0] == 0 and kept[-1] == len(result['dates']) - 1
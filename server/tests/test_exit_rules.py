@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_service import BacktestService
+from services.kernels import (
+    EXIT_NONE, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TRAILING_STOP, exit_rules_kernel
+)
+
+
+def _run(bars, targets, stop_loss=0.0, take_profit=0.0, trailing_stop=0.0):
+    """Kernel outputs for one run over (open, high, low, close) rows"""
+    open_, high, low, close = (np.array(column, dtype=np.float64) for column in zip(*bars))
+    positions, gross, turnover, exit_price, exit_reason = exit_rules_kernel(
+        open_, high, low, close, np.array(targets, dtype=np.float64)[:, None],
+        np.array([stop_loss]), np.array([take_profit]), np.array([trailing_stop])
+    )
+    return positions[:, 0], gross[:, 0], turnover[:, 0], exit_price[:, 0], exit_reason[:, 0]
+
+
+# Entry at the close of bar 0 (100); bar 1 decides the exit
+@pytest.mark.parametrize('bar, levels, side, fill, reason', [
+    ((99, 101, 94, 96), {'stop_loss': 0.05}, 1, 95.0, EXIT_STOP_LOSS),
+    ((90, 92, 88, 91), {'stop_loss': 0.05}, 1, 90.0, EXIT_STOP_LOSS),
+    ((101, 111, 100, 109), {'take_profit': 0.10}, 1, 110.0, EXIT_TAKE_PROFIT),
+    ((115, 116, 112, 113), {'take_profit': 0.10}, 1, 115.0, EXIT_TAKE_PROFIT),
+    # Both levels inside one bar: the stop wins
+    ((100, 111, 94, 100), {'stop_loss': 0.05, 'take_profit': 0.10}, 1, 95.0, EXIT_STOP_LOSS),
+    ((101, 106, 99, 104), {'stop_loss': 0.05}, -1, 105.0, EXIT_STOP_LOSS),
+    ((108, 110, 107, 109), {'stop_loss': 0.05}, -1, 108.0, EXIT_STOP_LOSS),
+    ((99, 100, 89, 92), {'take_profit': 0.10}, -1, 90.0, EXIT_TAKE_PROFIT),
+    ((100, 101, 99, 100), {'stop_loss': 0.05, 'take_profit': 0.10}, 1, 100.0, EXIT_NONE),
+])
+def test_intrabar_fills(bar, levels, side, fill, reason):
+    bars = [(100, 100, 100, 100), bar, (100, 100, 100, 100)]
+    positions, gross, turnover, exit_price, exit_reason = _run(bars, [side, side, side], **levels)
+    assert exit_reason[1] == reason
+    assert exit_price[1] == pytest.approx(fill)
+    assert gross[1] == pytest.approx(side * (fill / 100 - 1))
+    if reason != EXIT_NONE:
+        # Flat after the exit, until the strategy's target changes
+        assert positions[1] == 0 and positions[2] == 0
+        assert turnover[1] == 1
+
+
+def test_trailing_stop_follows_the_best_high_up_to_the_previous_bar():
+    bars = [(100, 100, 100, 100), (101, 120, 100, 118), (117, 118, 107, 110)]
+    positions, _, _, exit_price, exit_reason = _run(bars, [1, 1, 1], trailing_stop=0.10)
+    assert exit_reason.tolist() == [EXIT_NONE, EXIT_NONE, EXIT_TRAILING_STOP]
+    assert exit_price[2] == pytest.approx(108.0)
+
+
+def test_reenters_when_the_target_changes():
+    bars = [(100, 100, 100, 100), (99, 100, 90, 92), (92, 93, 91, 92), (92, 93, 91, 93), (93, 94, 92, 94)]
+    positions, _, _, _, exit_reason = _run(bars, [1, 1, 1, -1, -1], stop_loss=0.05)
+    assert exit_reason[1] == EXIT_STOP_LOSS
+    assert positions.tolist() == [1, 0, 0, -1, -1]
+
+
+def test_no_levels_follows_targets(bars):
+    targets = np.sign(np.sin(np.arange(len(bars)) / 7.0))
+    positions, gross, turnover, exit_price, exit_reason = _run(
+        bars[['open', 'high', 'low', 'close']].to_numpy(), targets
+    )
+    close = bars['close'].to_numpy()
+    np.testing.assert_array_equal(positions, targets)
+    assert not exit_reason.any()
+    np.testing.assert_allclose(gross[1:], targets[:-1] * (close[1:] / close[:-1] - 1))
+    np.testing.assert_array_equal(turnover[1:], np.abs(np.diff(targets)))
+    np.testing.assert_array_equal(exit_price, close)
+
+
+def test_ledger_reports_exit_rule_fills(offline_data):
+    config = {
+        'ticker': 'AAA', 'start_date': '2015-01-01', 'end_date': '2020-12-31', 'initial_capital': 10000,
+        'use_result_cache': False, 'strategy_config': [{'name': 'moving_average', 'parameters': {}}],
+        'stop_loss': 2, 'take_profit': 5, 'trailing_stop': 3
+    }
+    result = BacktestService().run_backtest(config)
+    trades = pd.DataFrame(result['trades'])
+    assert set(trades['exit_reason']) >= {'stop_loss', 'take_profit', 'trailing_stop'}
+
+    long_ = trades['side'] == 'LONG'
+    entry = trades['entry_price']
+    take_profit = long_ & (trades['exit_reason'] == 'take_profit')
+    stop_loss = long_ & (trades['exit_reason'] == 'stop_loss')
+    # Fills at the level, or better when the bar opened beyond it
+    assert (trades.loc[take_profit, 'exit_price'] >= (entry[take_profit] * 1.05).round(2) - 0.01).all()
+    assert (trades.loc[stop_loss, 'exit_price'] <= (entry[stop_loss] * 0.98).round(2) + 0.01).all()
+
+    # Exit-rule exits happen on bars without a signal, and stay on a downsampled chart
+    signal_dates = {date for date, signal in zip(result['dates'], result['signals']['signals']) if signal}
+    rule_exits = set(trades.loc[trades['exit_reason'] != 'signal', 'exit_date'])
+    assert rule_exits - signal_dates
+    downsampled = BacktestService().run_backtest({**config, 'max_points': 200})
+    assert rule_exits <= set(downsampled['dates'])
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.incremental_indicators import (
+    IncrementalBollinger, IncrementalEMA, IncrementalIndicatorSet, IncrementalMACD, IncrementalRSI, IncrementalSMA
+)
+from services.indicators import IndicatorGraph
+
+
+def _prices(n_bars: int = 400, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    # A run of unchanged prices longer than the RSI window
+    close[104:134] = close[104]
+    return pd.Series(close, index=pd.bdate_range('2020-01-01', periods=n_bars), name='close')
+
+
+def _full(indicator, prices: pd.Series) -> np.ndarray:
+    return np.asarray(indicator.update_many(prices.to_numpy()), dtype=np.float64)
+
+
+@pytest.mark.parametrize('name, indicator, column', [
+    ('sma', IncrementalSMA(20), None),
+    ('ema', IncrementalEMA(20), None),
+    ('rsi', IncrementalRSI(14), None),
+    ('bollinger', IncrementalBollinger(20, 2), 'upper'),
+    ('macd', IncrementalMACD(12, 26, 9), 'signal'),
+])
+def test_matches_full_recompute(name, indicator, column):
+    prices = _prices()
+    reference = IndicatorGraph(prices.to_frame()).get(name)
+    values = _full(indicator, prices)
+    if column is not None:
+        values = values[:, indicator.outputs.index(column)]
+        reference = reference[column]
+    np.testing.assert_allclose(values, reference.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_rsi_is_nan_when_prices_do_not_move():
+    prices = _prices()
+    values = _full(IncrementalRSI(14), prices)
+    reference = IndicatorGraph(prices.to_frame()).get('rsi').to_numpy()
+    np.testing.assert_array_equal(np.isnan(values), np.isnan(reference))
+    assert np.isnan(values[119:134]).all()
+
+
+def test_reload_matches_uninterrupted_run():
+    prices = _prices(500)
+    indicators = lambda: {'sma': IncrementalSMA(20), 'bands': IncrementalBollinger(20, 2), 'rsi': IncrementalRSI(14),
+                          'macd': IncrementalMACD()}
+    uninterrupted = IncrementalIndicatorSet(indicators()).update(prices)
+
+    # A daily refresh: reload from JSON before every new bar
+    indicator_set = IncrementalIndicatorSet(indicators())
+    frames = [indicator_set.update(prices.iloc[:37])]
+    for end in range(38, len(prices) + 1):
+        indicator_set = IncrementalIndicatorSet.from_state(json.loads(json.dumps(indicator_set.to_state())))
+        frames.append(indicator_set.update(prices.iloc[:end]))
+    pd.testing.assert_frame_equal(pd.concat(frames), uninterrupted)
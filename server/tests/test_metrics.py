@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_service import BacktestService
+
+
+def _reference_metrics(portfolio: pd.DataFrame, trades: pd.DataFrame, initial_capital: float):
+    """The pandas implementation metrics_kernel replaced, kept as the oracle"""
+    final_value = portfolio['portfolio_value'].iloc[-1]
+    total_return = (final_value - initial_capital) / initial_capital * 100
+    returns = portfolio['strategy_returns'].dropna()
+    sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
+    cumulative = portfolio['cumulative_returns']
+    running_max = cumulative.expanding().max()
+    max_drawdown = ((cumulative - running_max) / running_max).min() * 100
+    pnl = trades['pnl'].to_numpy(dtype=np.float64).round(2)
+    winning_pnl = pnl[pnl > 0]
+    losing_pnl = pnl[pnl < 0]
+    win_rate = len(winning_pnl) / len(pnl) * 100 if len(pnl) else 0
+    avg_win = winning_pnl.mean() if len(winning_pnl) else 0
+    avg_loss = losing_pnl.mean() if len(losing_pnl) else 0
+    profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf')
+    return {
+        'total_return': round(total_return, 2),
+        'sharpe_ratio': round(sharpe_ratio, 2),
+        'max_drawdown': round(max_drawdown, 2),
+        'win_rate': round(win_rate, 1),
+        'total_trades': len(pnl),
+        'winning_trades': len(winning_pnl),
+        'losing_trades': len(losing_pnl),
+        'avg_win': round(avg_win, 2),
+        'avg_loss': round(avg_loss, 2),
+        'profit_factor': round(profit_factor, 2),
+        'final_value': round(final_value, 2)
+    }
+
+
+@pytest.mark.parametrize('strategy_name', ['moving_average', 'bollinger_bands', 'rsi', 'macd'])
+@pytest.mark.parametrize('exit_set', [{}, {'stop_loss': 3, 'trailing_stop': 4}])
+def test_calculate_metrics_matches_pandas(strategy_name, exit_set, bars):
+    service = BacktestService()
+    signals_df = service.strategy_service.create_strategy_instance(strategy_name, {}).generate_signals(bars)
+    portfolio = service._simulate_portfolio(signals_df, 10000, 0.001, bars, service._exit_levels(exit_set))
+    trades = service._extract_trades(portfolio)
+    assert service._calculate_metrics(portfolio, trades, 10000) == _reference_metrics(portfolio, trades, 10000)
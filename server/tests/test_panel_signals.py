@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import indicators
+from services.data_service import DataService
+from services.strategy_service import StrategyService
+from strategies.base_strategy import BaseStrategy
+from tests.synthetic import raw_bars
+
+STRATEGIES = ['moving_average', 'bollinger_bands', 'rsi', 'macd']
+
+
+@pytest.fixture
+def gapped_bars():
+    """Three tickers on one calendar, except BBB lacks an interior bar and starts later"""
+    bars_by_ticker = {ticker: DataService._to_columnar(raw_bars(300, seed=seed))
+                      for seed, ticker in enumerate(['AAA', 'BBB', 'CCC'])}
+    bbb = bars_by_ticker['BBB']
+    bars_by_ticker['BBB'] = bbb.drop(bbb.index[[150, 151]]).iloc[20:]
+    return bars_by_ticker
+
+
+def _panel_column(values: np.ndarray, dates: pd.DatetimeIndex, own_dates: pd.DatetimeIndex) -> np.ndarray:
+    return values[dates.get_indexer(own_dates)]
+
+
+def test_bars_panel_leaves_missing_bars_nan(gapped_bars):
+    dates, tickers, panel = DataService.bars_panel(gapped_bars)
+    assert tickers == ['AAA', 'BBB', 'CCC']
+    assert len(dates) == 300
+    assert np.isnan(panel['close'][:, 1]).sum() == 22
+    assert not np.isnan(panel['close'][:, [0, 2]]).any()
+
+
+def _rsi(close: pd.Series) -> pd.Series:
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+@pytest.mark.parametrize('compute, single', [
+    (lambda v: indicators.panel_sma(v, 20), lambda s: s.rolling(window=20).mean()),
+    (lambda v: indicators.panel_ema(v, 20), lambda s: s.ewm(span=20).mean()),
+    (lambda v: indicators.panel_bollinger(v, 20, 2)['lower'],
+     lambda s: s.rolling(window=20).mean() - s.rolling(window=20).std() * 2),
+    (lambda v: indicators.panel_rsi(v, 14), _rsi),
+    (lambda v: indicators.panel_macd(v, 12, 26, 9)['histogram'],
+     lambda s: (s.ewm(span=12).mean() - s.ewm(span=26).mean())
+     - (s.ewm(span=12).mean() - s.ewm(span=26).mean()).ewm(span=9).mean()),
+])
+def test_panel_indicators_skip_missing_bars(gapped_bars, compute, single):
+    dates, tickers, panel = DataService.bars_panel(gapped_bars)
+    out = compute(panel['close'])
+    for j, ticker in enumerate(tickers):
+        close = gapped_bars[ticker]['close'].reset_index(drop=True)
+        expected = np.asarray(single(close), dtype=np.float64)
+        np.testing.assert_array_equal(_panel_column(out[:, j], dates, gapped_bars[ticker].index), expected)
+    assert np.isnan(out[np.isnan(panel['close'])]).all()
+
+
+@pytest.mark.parametrize('strategy_name', STRATEGIES)
+@pytest.mark.parametrize('columnar', [True, False])
+def test_panel_signals_match_single_ticker_runs(gapped_bars, strategy_name, columnar):
+    strategy = StrategyService().create_strategy_instance(strategy_name, {})
+    dates, tickers, panel = DataService.bars_panel(gapped_bars)
+    out = strategy.generate_signals_panel(panel) if columnar else BaseStrategy.generate_signals_panel(strategy, panel)
+    missing = np.isnan(panel['close'])
+    for j, ticker in enumerate(tickers):
+        expected = strategy.generate_signals(gapped_bars[ticker])
+        for field in ['signal', 'position']:
+            np.testing.assert_array_equal(_panel_column(out[field][:, j], dates, gapped_bars[ticker].index),
+                                          expected[field].to_numpy(dtype=np.float64))
+    assert (out['signal'][missing] == 0).all()
+    # Positions are held through missing bars
+    gap = np.flatnonzero(missing[:, 1] & (np.arange(len(dates)) > 20))
+    np.testing.assert_array_equal(out['position'][gap, 1], out['position'][gap[0] - 1, 1])
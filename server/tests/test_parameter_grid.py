@@ -0,0 +1,58 @@
+import pytest
+
+from services.strategy_service import StrategyService
+from services.sweep_service import SweepService
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ({'min': 5, 'max': 10, 'step': 1}, [5, 6, 7, 8, 9, 10]),
+    ({'min': 5, 'max': 11, 'step': 2}, [5, 7, 9, 11]),
+    # max is included only when the steps land on it
+    ({'min': 5, 'max': 10, 'step': 2}, [5, 7, 9]),
+    ({'min': 3, 'max': 3}, [3]),
+    ({'min': 1, 'max': 2, 'step': 0.25}, [1.0, 1.25, 1.5, 1.75, 2.0]),
+    # Float steps do not drift off the grid
+    ({'min': 1, 'max': 3, 'step': 0.1}, [round(1 + 0.1 * i, 1) for i in range(21)]),
+])
+def test_slider_values(spec, expected):
+    values = SweepService._slider_values(spec)
+    assert values == expected
+    assert all(type(v) is type(expected[0]) for v in values)
+
+
+def _strategy(name):
+    return StrategyService().create_strategy_instance(name, {})
+
+
+def test_grid_is_the_product_of_every_axis():
+    config = _strategy('bollinger_bands').get_parameter_config()
+    grid = SweepService.parameter_grid(config)
+    assert len(grid) == 41 * 21
+    assert grid[0] == {'period': 10, 'stddev': 1.0}
+    assert grid[-1] == {'period': 50, 'stddev': 3.0}
+    assert len({tuple(p.items()) for p in grid}) == len(grid)
+
+
+def test_grid_overrides():
+    config = _strategy('bollinger_bands').get_parameter_config()
+    grid = SweepService.parameter_grid(config, {'period': [10, 20], 'stddev': {'min': 2, 'max': 3, 'step': 0.5}})
+    assert grid == [{'period': p, 'stddev': s} for p in (10, 20) for s in (2.0, 2.5, 3.0)]
+
+
+def test_grid_deduplicates_normalized_combinations():
+    strategy = _strategy('moving_average')
+    config = strategy.get_parameter_config()
+    assert len(SweepService.parameter_grid(config)) == 196 * 3
+
+    grid = SweepService.parameter_grid(config, normalize=strategy.normalize_parameters)
+    assert len(grid) == 196 * 2
+    assert {p['type'] for p in grid} == {'SMA', 'EMA'}
+    assert grid[:3] == [{'period': 5, 'type': 'SMA'}, {'period': 5, 'type': 'EMA'}, {'period': 6, 'type': 'SMA'}]
+
+
+def test_sweep_runs_each_normalized_combination_once(bars):
+    results = SweepService(max_workers=1).run_sweep(
+        'moving_average', ['AAA'], '2015-01-01', '2017-01-01',
+        parameter_ranges={'period': [10, 20], 'type': ['SMA', 'WMA', 'EMA']}, bars_by_ticker={'AAA': bars}
+    )
+    assert list(zip(results['period'], results['type'])) == [(10, 'SMA'), (10, 'EMA'), (20, 'SMA'), (20, 'EMA')]
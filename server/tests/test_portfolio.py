@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_service import BacktestService
+
+
+def _returns(n_bars=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'a_0': rng.normal(0, 0.01, n_bars), 'b_1': rng.normal(0, 0.03, n_bars)})
+
+
+def test_equal_weights():
+    weights = BacktestService._portfolio_weights(_returns(), 'equal', [None, None], 10)
+    np.testing.assert_array_equal(weights.to_numpy(), np.full((40, 2), 0.5))
+
+
+def test_fixed_weights_are_normalised():
+    weights = BacktestService._portfolio_weights(_returns(), 'fixed', [1, 3], 10)
+    np.testing.assert_array_equal(weights.to_numpy(), np.tile([0.25, 0.75], (40, 1)))
+
+
+@pytest.mark.parametrize('fixed', [[1, None], [0, 0], [1, -1]])
+def test_fixed_weights_reject_missing_or_non_positive(fixed):
+    with pytest.raises(ValueError):
+        BacktestService._portfolio_weights(_returns(), 'fixed', fixed, 10)
+
+
+def test_unknown_weighting():
+    with pytest.raises(ValueError, match='Unknown portfolio weighting'):
+        BacktestService._portfolio_weights(_returns(), 'momentum', [None, None], 10)
+
+
+def test_inverse_volatility_weights():
+    returns = _returns()
+    lookback = 10
+    weights = BacktestService._portfolio_weights(returns, 'inverse_volatility', [None, None], lookback).to_numpy()
+
+    # Equal until a full window exists, and a bar never uses its own return
+    np.testing.assert_array_equal(weights[:lookback], np.full((lookback, 2), 0.5))
+    for row in range(lookback, len(returns)):
+        window = returns.iloc[row - lookback:row].to_numpy()
+        inverse = 1 / window.std(axis=0, ddof=1)
+        np.testing.assert_allclose(weights[row], inverse / inverse.sum())
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    # The calmer strategy gets the larger share
+    assert (weights[lookback:, 0] > weights[lookback:, 1]).all()
+
+
+def test_inverse_volatility_falls_back_to_equal_on_zero_volatility():
+    returns = _returns()
+    returns.iloc[:25, 0] = 0.0
+    weights = BacktestService._portfolio_weights(returns, 'inverse_volatility', [None, None], 10).to_numpy()
+    # Windows ending before bar 25 have a flat strategy a
+    np.testing.assert_array_equal(weights[:26], np.full((26, 2), 0.5))
+    assert (weights[26:, 0] != 0.5).all()
+    assert np.isfinite(weights).all()
+
+
+@pytest.mark.parametrize('portfolio_config, fixed_weights', [
+    ({'weighting': 'equal'}, [None, None]),
+    ({'weighting': 'fixed'}, [1, 3]),
+    ({'weighting': 'inverse_volatility', 'lookback': 20}, [None, None]),
+])
+def test_combined_equity_is_the_weighted_sum_of_returns(bars, portfolio_config, fixed_weights):
+    service = BacktestService()
+    results, portfolios, ledgers = [], [], []
+    for name in ['moving_average', 'rsi']:
+        signals_df = service.strategy_service.create_strategy_instance(name, {}).generate_signals(bars)
+        portfolio = service._simulate_portfolio(signals_df, 10000, 0.001, bars)
+        trades = service._extract_trades(portfolio)
+        results.append(service._summarize_backtest(signals_df, portfolio, trades, 10000, name))
+        portfolios.append(portfolio)
+        ledgers.append(trades)
+
+    combined = service._combine_strategy_results(results, portfolios, ledgers, 10000,
+                                                 portfolio_config, fixed_weights)
+
+    returns = pd.concat([p['strategy_returns'] for p in portfolios], axis=1).fillna(0.0).to_numpy()
+    weights = service._portfolio_weights(pd.DataFrame(returns), portfolio_config['weighting'], fixed_weights,
+                                         portfolio_config.get('lookback', 63)).to_numpy()
+    expected = 10000 * np.cumprod(1 + (returns * weights).sum(axis=1))
+    np.testing.assert_allclose(combined['portfolio_value'], expected)
+    assert combined['weights'] == weights[-1].round(4).tolist()
+    assert combined['strategy_name'] == 'moving_average + rsi'
+    assert combined['metrics']['final_value'] == round(expected[-1], 2)
+
+    # Every strategy's trades, tagged with the strategy and ordered by entry
+    trades = pd.DataFrame(combined['trades'])
+    assert len(trades) == sum(len(ledger) for ledger in ledgers)
+    for result in results:
+        tagged = trades[trades['strategy'] == result['strategy_name']].drop(columns='strategy')
+        expected_trades = pd.DataFrame(result['trades']).sort_values('entry_date', kind='stable')
+        assert tagged.to_dict('records') == expected_trades.to_dict('records')
+    assert trades['entry_date'].is_monotonic_increasing
+
+
+def test_multi_strategy_backtest(offline_data):
+    config = {
+        'ticker': 'AAA', 'start_date': '2015-01-01', 'end_date': '2019-01-01', 'initial_capital': 10000,
+        'use_result_cache': False, 'portfolio': {'weighting': 'fixed'},
+        'strategy_config': [{'name': 'macd', 'parameters': {}, 'weight': 2},
+                            {'name': 'bollinger_bands', 'parameters': {}, 'weight': 2}]
+    }
+    result = BacktestService().run_backtest(config)
+    assert result['weighting'] == 'fixed'
+    assert result['weights'] == [0.5, 0.5]
+    assert [strategy['strategy_name'] for strategy in result['strategies']] == ['macd', 'bollinger_bands']
+    assert {trade['strategy'] for trade in result['trades']} == {'macd', 'bollinger_bands'}
+    assert len(result['portfolio_value']) == len(result['dates'])
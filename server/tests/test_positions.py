@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from services.strategy_service import StrategyService
+from strategies.base_strategy import BaseStrategy
+
+
+def _flat_on_exit_loop(signals):
+    """Reference state machine: an opposite signal closes, the next signal opens"""
+    positions = np.zeros(len(signals))
+    position = 0.0
+    for i, signal in enumerate(signals):
+        if signal != 0:
+            position = 0.0 if position != 0 and signal != position else signal
+        positions[i] = position
+    return positions
+
+
+def _hold_loop(signals):
+    positions = np.zeros(len(signals))
+    position = 0.0
+    for i, signal in enumerate(signals):
+        if signal != 0:
+            position = signal
+        positions[i] = position
+    return positions
+
+
+def test_flat_on_exit_matches_the_loop_on_random_signals():
+    rng = np.random.default_rng(0)
+    for _ in range(20_000):
+        n_bars = int(rng.integers(0, 30))
+        density = rng.uniform(0.1, 1.0)
+        signals = np.where(rng.uniform(size=n_bars) < density, rng.choice([-1.0, 1.0], n_bars), 0.0)
+        positions = BaseStrategy.positions_from_signals(signals, 'flat_on_exit')
+        assert np.array_equal(positions, _flat_on_exit_loop(signals)), signals
+
+
+def test_flat_on_exit_columns_are_independent():
+    rng = np.random.default_rng(1)
+    signals = rng.choice([-1.0, 0.0, 1.0], size=(200, 6))
+    positions = BaseStrategy.positions_from_signals(signals, 'flat_on_exit')
+    for j in range(signals.shape[1]):
+        np.testing.assert_array_equal(positions[:, j], _flat_on_exit_loop(signals[:, j]))
+
+
+SIGNALS = [0, 1, 0, 1, -1, 0, -1, -1, 1, 0, np.nan, -1]
+
+
+@pytest.mark.parametrize('mode, expected', [
+    ('hold_until_opposite', [0, 1, 1, 1, -1, -1, -1, -1, 1, 1, 1, -1]),
+    ('flat_on_exit', [0, 1, 1, 1, 0, 0, -1, -1, 0, 0, 0, -1]),
+    ('long_only', [0, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 0]),
+    ('short_only', [0, 0, 0, 0, -1, -1, -1, -1, 0, 0, 0, -1]),
+])
+def test_position_modes(mode, expected):
+    np.testing.assert_array_equal(BaseStrategy.positions_from_signals(np.array(SIGNALS), mode), expected)
+
+
+def test_hold_until_opposite_matches_the_loop():
+    signals = np.random.default_rng(2).choice([-1.0, 0.0, 0.0, 1.0], size=500)
+    np.testing.assert_array_equal(BaseStrategy.positions_from_signals(signals), _hold_loop(signals))
+
+
+def test_unknown_position_mode():
+    with pytest.raises(ValueError, match="Unknown position mode 'sideways'"):
+        BaseStrategy.positions_from_signals(np.array(SIGNALS), 'sideways')
+    with pytest.raises(ValueError, match="Unknown position mode 'sideways'"):
+        StrategyService().create_strategy_instance('rsi', {'position_mode': 'sideways'})
+
+
+def test_strategy_uses_its_position_mode(bars):
+    strategy = StrategyService().create_strategy_instance('rsi', {'position_mode': 'flat_on_exit'})
+    signals_df = strategy.generate_signals(bars)
+    np.testing.assert_array_equal(signals_df['position'].to_numpy(),
+                                  _flat_on_exit_loop(signals_df['signal'].to_numpy()))
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from services.backtest_service import BacktestService
+from services.result_cache import ResultCache
+from services.result_format import encode_json
+from services.worker import BacktestWorker
+
+
+def _config(**overrides):
+    config = {
+        'ticker': 'AAA',
+        'start_date': '2015-03-01',
+        'end_date': '2017-01-01',
+        'initial_capital': 10000,
+        'strategy_config': [{'name': 'rsi', 'parameters': {}}],
+        'profile': True
+    }
+    config.update(overrides)
+    return config
+
+
+def _stages(result):
+    return [record['stage'] for record in result['profile']['stages']]
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'use_result_cache': False},
+    {'result_format': 'compact'},
+    {'max_points': 100},
+])
+def test_serialize_stage_is_always_recorded(offline_data, monkeypatch, overrides):
+    monkeypatch.setattr(BacktestService, 'result_cache', ResultCache())
+    service = BacktestService()
+    first = service.run_backtest(_config(**overrides))
+    stages = _stages(first)
+    assert stages[-1] == 'serialize'
+    assert ('cache_store' in stages) == overrides.get('use_result_cache', True)
+    if 'max_points' in overrides:
+        assert stages[-2] == 'downsample'
+
+    # A result cache hit still formats and encodes its result
+    second = service.run_backtest(_config(**overrides))
+    assert _stages(second)[-1] == 'serialize'
+
+
+def test_worker_response_is_strict_json(offline_data):
+    worker = BacktestWorker()
+    request = json.dumps({'id': 3, 'method': 'run_backtest', 'params': {'config': _config()}})
+    response = worker.handle(request)
+    assert 'error' not in response
+    decoded = json.loads(encode_json(response))
+    # The leading NaN of the equity curve becomes null
+    assert decoded['result']['portfolio_value'][0] is None
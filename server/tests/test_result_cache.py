@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from services.backtest_service import BacktestService
+from services.result_cache import ResultCache
+
+
+def _config(**overrides):
+    config = {
+        'ticker': 'AAA',
+        'start_date': '2015-03-01',
+        'end_date': '2017-01-01',
+        'initial_capital': 10000,
+        'commission': 0.001,
+        'strategy_config': [{'name': 'moving_average', 'parameters': {'period': 20, 'type': 'SMA'}}]
+    }
+    config.update(overrides)
+    return config
+
+
+def test_config_hash_ignores_key_order_and_non_semantic_keys():
+    config = _config()
+    reordered = dict(reversed(list(config.items())))
+    assert ResultCache.config_hash(config) == ResultCache.config_hash(reordered)
+    assert ResultCache.config_hash(config) == ResultCache.config_hash({**config, 'profile': True, 'max_points': 50})
+    assert ResultCache.config_hash(config) != ResultCache.config_hash({**config, 'commission': 0.002})
+
+
+def test_bars_fingerprint_changes_with_values(bars):
+    changed = bars.copy()
+    changed.iloc[-1, changed.columns.get_loc('close')] += 0.01
+    assert ResultCache.bars_fingerprint(bars) == ResultCache.bars_fingerprint(bars.copy())
+    assert ResultCache.bars_fingerprint(bars) != ResultCache.bars_fingerprint(changed)
+
+
+def test_get_returns_copies_and_evicts_least_recently_used():
+    # Each entry serializes to 19 bytes; two fit
+    cache = ResultCache(max_bytes=40)
+    cache.put('a', {'values': [1, 2]})
+    first = cache.get('a')
+    first['values'].append(3)
+    assert cache.get('a') == {'values': [1, 2]}
+
+    cache.put('b', {'values': [3, 4]})
+    cache.get('a')
+    cache.put('c', {'values': [5, 6]})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+
+
+@pytest.mark.parametrize('robustness, cached', [
+    (None, True),
+    ({'paths': 200, 'seed': 7}, True),
+    ({'paths': 200}, False),
+])
+def test_only_deterministic_runs_are_cached(offline_data, monkeypatch, robustness, cached):
+    monkeypatch.setattr(BacktestService, 'result_cache', ResultCache())
+    service = BacktestService()
+    config = _config(robustness=robustness) if robustness else _config()
+    first = service.run_backtest(config)
+    second = service.run_backtest(config)
+    assert service.result_cache.hits == (1 if cached else 0)
+    assert len(service.result_cache._entries) == (1 if cached else 0)
+    if robustness and not cached:
+        assert first['robustness'] != second['robustness']
+    else:
+        # Compared as JSON, where the leading NaN of the equity curve equals itself
+        assert json.dumps(first, sort_keys=True) == json.dumps(second, sort_keys=True)
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_service import BacktestService
+from services.result_format import from_compact, to_compact
+
+
+def _result(strategies):
+    config = {
+        'ticker': 'AAA',
+        'start_date': '2015-03-01',
+        'end_date': '2017-01-01',
+        'initial_capital': 10000,
+        'use_result_cache': False,
+        'strategy_config': [{'name': name, 'parameters': {}} for name in strategies]
+    }
+    return BacktestService().run_backtest(config)
+
+
+def _index(result):
+    return pd.DatetimeIndex(result['dates'])
+
+
+def _as_json(result):
+    # NaN compares equal to itself once encoded
+    return json.dumps(result, sort_keys=True)
+
+
+@pytest.mark.parametrize('strategies', [['macd'], ['moving_average', 'rsi']])
+@pytest.mark.parametrize('sidecar', [False, True])
+def test_round_trip(offline_data, tmp_path, strategies, sidecar):
+    result = _result(strategies)
+    compact = to_compact(result, _index(result), str(tmp_path) if sidecar else None)
+    assert ('sidecar' in compact) == sidecar
+    assert _as_json(from_compact(json.loads(json.dumps(compact)))) == _as_json(result)
+
+
+def test_intraday_axis_keeps_time_of_day():
+    index = pd.date_range('2024-03-01 09:30', periods=6, freq='30min')
+    result = {
+        'portfolio_value': [100.0, 101.0, 100.5, 102.0, 101.0, 103.0],
+        'dates': index.strftime('%Y-%m-%d').tolist(),
+        'signals': {'dates': index.strftime('%Y-%m-%d').tolist(), 'prices': [1.0] * 6, 'signals': [0, 1, 0, 0, -1, 0]}
+    }
+    compact = to_compact(result, index)
+    assert compact['axis']['unit'] == 'second'
+    expanded = from_compact(compact)
+    assert expanded['dates'] == index.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+    assert len(set(expanded['dates'])) == len(index)
+    assert expanded['signals']['signals'] == result['signals']['signals']
+    np.testing.assert_array_equal(expanded['portfolio_value'], result['portfolio_value'])
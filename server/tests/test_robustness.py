@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.robustness import RobustnessService
+
+
+def _returns(n_obs=101, seed=0):
+    return np.random.default_rng(seed).normal(0.0005, 0.01, n_obs)
+
+
+def test_iid_indices():
+    indices = RobustnessService.bootstrap_indices(np.random.default_rng(5), 50, 200, 30)
+    assert indices.shape == (200, 30)
+    assert indices.min() == 0 and indices.max() == 49
+    np.testing.assert_array_equal(indices, np.random.default_rng(5).integers(0, 50, size=(200, 30)))
+
+
+@pytest.mark.parametrize('block_size, path_length', [(5, 40), (7, 40), (40, 40), (60, 40)])
+def test_block_indices_are_wrapped_runs(block_size, path_length):
+    n_obs = 40
+    indices = RobustnessService.bootstrap_indices(np.random.default_rng(6), n_obs, 300, path_length, block_size)
+    assert indices.shape == (300, path_length)
+    assert indices.min() >= 0 and indices.max() < n_obs
+
+    # Within a block each index follows the previous one, wrapping from the last observation to the first
+    steps = (np.diff(indices, axis=1) % n_obs) == 1
+    within_block = (np.arange(1, path_length) % block_size) != 0
+    assert steps[:, within_block].all()
+    # Blocks start independently, and some of them wrap around the end
+    if block_size < path_length:
+        assert not steps[:, ~within_block].all()
+    assert (np.diff(indices, axis=1)[:, within_block] == 1 - n_obs).any()
+
+
+def test_block_size_one_is_iid():
+    a = RobustnessService.bootstrap_indices(np.random.default_rng(7), 30, 10, 30, 1)
+    b = RobustnessService.bootstrap_indices(np.random.default_rng(7), 30, 10, 30)
+    np.testing.assert_array_equal(a, b)
+
+
+def test_path_statistics_match_a_direct_computation():
+    paths = np.random.default_rng(8).normal(0, 0.02, size=(6, 25))
+    paths[0] = -0.01  # only loses: the drawdown runs from the initial capital
+    paths[1] = 0.0  # flat: zero std
+    statistics = RobustnessService.path_statistics(paths.copy(), 1000, 252)
+    for i, path in enumerate(paths):
+        equity = 1000 * np.cumprod(1 + path)
+        peak = np.maximum.accumulate(np.r_[1000, equity])[1:]
+        std = path.std(ddof=1)
+        assert statistics['final_value'][i] == pytest.approx(equity[-1])
+        assert statistics['max_drawdown'][i] == pytest.approx(((equity / peak).min() - 1) * 100)
+        assert statistics['sharpe_ratio'][i] == pytest.approx(path.mean() / std * np.sqrt(252) if std else 0.0)
+    assert statistics['max_drawdown'][0] == pytest.approx((0.99 ** 25 - 1) * 100)
+    assert statistics['sharpe_ratio'][1] == 0
+
+
+@pytest.mark.parametrize('block_size', [1, 7])
+@pytest.mark.parametrize('chunk_bytes', [1, 101 * 8 * 4 * 3, 101 * 8 * 4 * 64, 1 << 30])
+def test_chunking_does_not_change_results(block_size, chunk_bytes):
+    returns = _returns()
+    reference = RobustnessService.bootstrap(returns, 500, block_size, seed=3, chunk_bytes=1 << 30)
+    chunked = RobustnessService.bootstrap(returns, 500, block_size, seed=3, chunk_bytes=chunk_bytes)
+    for key, values in reference.items():
+        np.testing.assert_array_equal(chunked[key], values)
+
+
+def test_bootstrap_scores_the_resampled_paths():
+    returns = _returns()
+    samples = RobustnessService.bootstrap(returns, 20, 4, initial_capital=500, seed=9)
+    indices = RobustnessService.bootstrap_indices(np.random.default_rng(9), len(returns), 20, len(returns), 4)
+    expected = RobustnessService.path_statistics(returns[indices], 500, 252)
+    for key, values in expected.items():
+        np.testing.assert_array_equal(samples[key], values)
+
+
+def test_bootstrap_drops_non_finite_returns_and_validates():
+    returns = np.r_[np.nan, _returns(30), np.inf]
+    assert RobustnessService.bootstrap(returns, 5, seed=1)['final_value'].shape == (5,)
+    with pytest.raises(ValueError, match='two observations'):
+        RobustnessService.bootstrap(np.array([0.01, np.nan]), 5)
+    with pytest.raises(ValueError, match='one path'):
+        RobustnessService.bootstrap(_returns(), 0)
+
+
+def test_analyze_is_reproducible_with_a_seed():
+    portfolio_value = 10000 * np.cumprod(1 + _returns(300))
+    config = {'method': 'block', 'block_size': 10, 'paths': 200, 'seed': 4}
+    first = RobustnessService.analyze(portfolio_value, pd.DataFrame(), config, 10000)
+    assert first == RobustnessService.analyze(portfolio_value, pd.DataFrame(), config, 10000)
+    assert first['path_length'] == 299 and first['block_size'] == 10
+    assert first['final_value']['observed'] == round(10000 * portfolio_value[-1] / portfolio_value[0], 2)
+
+
+@pytest.mark.parametrize('config', [{'source': 'prices'}, {'method': 'stationary'}])
+def test_analyze_rejects_unknown_options(config):
+    with pytest.raises(ValueError, match='Unknown bootstrap'):
+        RobustnessService.analyze(np.ones(10), pd.DataFrame(), config, 10000)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.indicators import rolling_mean_batch, rolling_std_batch
+
+PERIODS = [1, 2, 5, 20, 60]
+
+
+def _series(nan_rows=()):
+    values = 100 + np.random.default_rng(3).standard_normal(300).cumsum()
+    values[list(nan_rows)] = np.nan
+    return values
+
+
+@pytest.mark.parametrize('nan_rows', [(), (150,), (0, 1, 2), (40, 41, 200), (299,)])
+def test_rolling_batch_matches_pandas(nan_rows):
+    values = _series(nan_rows)
+    series = pd.Series(values)
+    means = rolling_mean_batch(values, PERIODS)
+    stds = rolling_std_batch(values, PERIODS)
+    for j, period in enumerate(PERIODS):
+        expected_mean = series.rolling(period).mean().to_numpy()
+        expected_std = series.rolling(period).std().to_numpy()
+        np.testing.assert_array_equal(np.isnan(means[:, j]), np.isnan(expected_mean))
+        np.testing.assert_allclose(means[:, j], expected_mean, rtol=0, atol=1e-9)
+        if period > 1:
+            np.testing.assert_array_equal(np.isnan(stds[:, j]), np.isnan(expected_std))
+            np.testing.assert_allclose(stds[:, j], expected_std, rtol=0, atol=1e-7)
+
+
+def test_a_nan_only_poisons_the_windows_holding_it():
+    means = rolling_mean_batch(_series([150]), [20])[:, 0]
+    assert np.isnan(means[150:170]).all()
+    assert not np.isnan(means[19:150]).any()
+    assert not np.isnan(means[170:]).any()
+
+
+def test_all_nan_input():
+    values = np.full(30, np.nan)
+    assert np.isnan(rolling_mean_batch(values, [5])).all()
+    assert np.isnan(rolling_std_batch(values, [5])).all()
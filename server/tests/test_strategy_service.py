@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from services.strategy_service import MANIFEST_PATH, STRATEGY_CLASSES, StrategyService
+from tests.conftest import SERVER_DIR
+
+
+def test_committed_manifest_is_up_to_date():
+    """Fails when a strategy changes without ``python -m services.strategy_service``"""
+    built = StrategyService.build_manifest()
+    assert list(built) == list(STRATEGY_CLASSES)
+    assert json.loads(MANIFEST_PATH.read_text()) == json.loads(json.dumps(built))
+
+
+def test_strategies_are_imported_on_first_use():
+    script = '''
+import sys
+from services.strategy_service import StrategyService
+
+service = StrategyService()
+listed = [strategy['id'] for strategy in service.get_available_strategies()]
+
+def strategy_modules():
+    return sorted(name for name in sys.modules if name.startswith('strategies.') and name != 'strategies.base_strategy')
+
+assert not strategy_modules(), strategy_modules()
+service.create_strategy_instance('rsi', {'period': 10})
+loaded = strategy_modules()
+print(','.join(listed) + ';' + ','.join(loaded))
+'''
+    output = subprocess.run([sys.executable, '-c', script], cwd=SERVER_DIR, capture_output=True, text=True,
+                            check=True).stdout.strip()
+    listed, loaded = output.split(';')
+    assert listed.split(',') == list(STRATEGY_CLASSES)
+    assert loaded.split(',') == ['strategies.rsi']
+
+
+def test_stale_manifest_is_rebuilt_in_memory(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    manifest_path.write_text(json.dumps({'rsi': {}}))
+    service = StrategyService(manifest_path)
+    assert list(service.manifest) == list(STRATEGY_CLASSES)
+    assert service.create_strategy_instance('macd', {}).__class__.__name__ == 'MACDStrategy'
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Strategy 'nope' not found"):
+        StrategyService().create_strategy_instance('nope', {})
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_service import BacktestService
+from services.sweep_service import SweepService
+
+STRATEGIES = ['moving_average', 'bollinger_bands', 'rsi', 'macd']
+
+
+def _parameter_ranges(parameter_config):
+    """Two slider values per parameter and every select option, to keep the grid small"""
+    ranges = {}
+    for name, spec in parameter_config.items():
+        if spec.get('type') == 'slider':
+            other = spec['min'] + (spec['max'] - spec['min']) / 3
+            if float(spec.get('step', 1)).is_integer():
+                other = int(other)
+            ranges[name] = sorted({spec['default'], other})
+    return ranges
+
+
+def _single_run(service, strategy_name, parameters, exit_set, bars):
+    strategy = service.strategy_service.create_strategy_instance(strategy_name, parameters)
+    signals_df = strategy.generate_signals(bars)
+    portfolio = service._simulate_portfolio(signals_df, 10000, 0.001, bars, service._exit_levels(exit_set))
+    return service._calculate_metrics(portfolio, service._extract_trades(portfolio), 10000)
+
+
+def _assert_metrics_match(row, expected):
+    for key, value in expected.items():
+        if key in ('total_trades', 'winning_trades', 'losing_trades'):
+            assert row[key] == value, key
+        else:
+            # The batch path uses whole-matrix reductions, equal up to the last rounding digit
+            assert row[key] == pytest.approx(value, abs=0.011), key
+
+
+@pytest.mark.parametrize('strategy_name', STRATEGIES)
+@pytest.mark.parametrize('exit_ranges', [None, {'stop_loss': [0, 3], 'trailing_stop': [0, 5]}])
+def test_batch_sweep_matches_single_runs(strategy_name, exit_ranges, bars, caplog):
+    sweep = SweepService(max_workers=1)
+    strategy = sweep.backtest_service.strategy_service.create_strategy_instance(strategy_name, {})
+    parameter_config = strategy.get_parameter_config()
+    results = sweep.run_sweep(
+        strategy_name, ['AAA'], '', '', _parameter_ranges(parameter_config), bars_by_ticker={'AAA': bars},
+        exit_ranges=exit_ranges
+    )
+    assert 'error' not in results.columns
+    # The matrix path ran, not the per-combination fallback
+    assert 'running combinations one by one' not in caplog.text
+    assert len(results) > 1
+
+    service = BacktestService()
+    for row in results.to_dict('records'):
+        parameters = {name: row[name] for name in parameter_config}
+        exit_set = {rule: row[rule] for rule in (exit_ranges or {})}
+        _assert_metrics_match(row, _single_run(service, strategy_name, parameters, exit_set, bars))
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.ta_backtest import run_stock_ta_backtest
+from tests.synthetic import raw_bars
+
+
+def _reference_ta_backtest(bt_df, stop_loss_lvl=None):
+    """The original iterrows loop of the research script, kept as the oracle"""
+    balance = 1000000
+    pnl = 0
+    position = 0
+    last_signal = "hold"
+    last_price = 0
+    c = 0
+    trade_date_start, trade_date_end, trade_days, trade_side, trade_pnl, trade_ret = [], [], [], [], [], []
+    cum_value = []
+
+    for index, row in bt_df.iterrows():
+        if row.EXIT_LONG and last_signal == "long":
+            trade_date_end.append(row.name)
+            trade_days.append(c)
+            pnl = (row.Open - last_price) * position
+            trade_pnl.append(pnl)
+            trade_ret.append((row.Open / last_price - 1) * 100)
+            balance = balance + row.Open * position
+            position = 0
+            last_signal = "hold"
+            c = 0
+        elif row.EXIT_SHORT and last_signal == "short":
+            trade_date_end.append(row.name)
+            trade_days.append(c)
+            pnl = (row.Open - last_price) * position
+            trade_pnl.append(pnl)
+            trade_ret.append((last_price / row.Open - 1) * 100)
+            balance = balance + pnl
+            position = 0
+            last_signal = "hold"
+            c = 0
+
+        if row.LONG and last_signal != "long":
+            last_signal = "long"
+            last_price = row.Open
+            trade_date_start.append(row.name)
+            trade_side.append("long")
+            position = int(balance / row.Open)
+            balance = balance - position * row.Open
+            c = 0
+        elif row.SHORT and last_signal != "short":
+            last_signal = "short"
+            last_price = row.Open
+            trade_date_start.append(row.name)
+            trade_side.append("short")
+            position = int(balance / row.Open) * -1
+            c = 0
+
+        if stop_loss_lvl:
+            if last_signal == "long" and (row.Low / last_price - 1) * 100 <= stop_loss_lvl:
+                c = c + 1
+                trade_date_end.append(row.name)
+                trade_days.append(c)
+                stop_loss_price = last_price + round(last_price * (stop_loss_lvl / 100), 4)
+                pnl = (stop_loss_price - last_price) * position
+                trade_pnl.append(pnl)
+                trade_ret.append((stop_loss_price / last_price - 1) * 100)
+                balance = balance + stop_loss_price * position
+                position = 0
+                last_signal = "hold"
+                c = 0
+            elif last_signal == "short" and (last_price / row.Low - 1) * 100 <= stop_loss_lvl:
+                c = c + 1
+                trade_date_end.append(row.name)
+                trade_days.append(c)
+                stop_loss_price = last_price - round(last_price * (stop_loss_lvl / 100), 4)
+                pnl = (stop_loss_price - last_price) * position
+                trade_pnl.append(pnl)
+                trade_ret.append((last_price / stop_loss_price - 1) * 100)
+                balance = balance + pnl
+                position = 0
+                last_signal = "hold"
+                c = 0
+
+        if last_signal == "hold":
+            market_value = balance
+        elif last_signal == "long":
+            c = c + 1
+            market_value = position * row.Close + balance
+        else:
+            c = c + 1
+            market_value = (row.Close - last_price) * position + balance
+        cum_value.append(market_value)
+
+    cum_ret_df = pd.DataFrame(cum_value, index=bt_df.index, columns=["CUM_RET"])
+    cum_ret_df["CUM_RET"] = (cum_ret_df.CUM_RET / 1000000 - 1) * 100
+    cum_ret_df["BUY_HOLD"] = (bt_df.Close / bt_df.Open.iloc[0] - 1) * 100
+    cum_ret_df["ZERO"] = 0
+
+    size = min(len(trade_date_start), len(trade_date_end))
+    trade_df = pd.DataFrame({
+        "START": trade_date_start[:size], "SIDE": trade_side[:size], "DAYS": trade_days[:size],
+        "PNL": trade_pnl[:size], "RET": trade_ret[:size],
+    })
+    by_side = trade_df.groupby("SIDE")
+    wins = trade_df[trade_df.PNL > 0].groupby("SIDE")
+    detail_df = pd.concat([
+        by_side.count()[["START"]],
+        wins.count()[["START"]],
+        by_side[["DAYS"]].mean(),
+        by_side[["RET"]].mean(),
+        wins[["RET"]].mean(),
+        trade_df[trade_df.PNL < 0].groupby("SIDE")[["RET"]].mean(),
+        by_side[["RET"]].std(),
+    ], axis=1, sort=False)
+    detail_df.columns = ["NUM_TRADES", "NUM_TRADES_WIN", "AVG_DAYS", "AVG_RET", "AVG_RET_WIN", "AVG_RET_LOSS",
+                         "STD_RET"]
+
+    mv = pd.Series(cum_value, index=bt_df.index)
+    roll_max = mv.rolling(window=len(mv), min_periods=1).max()
+    return {
+        "cum_ret_df": cum_ret_df,
+        "max_drawdown": {
+            "value": round((mv - roll_max).min(), 0),
+            "pct": round(((mv / roll_max - 1) * 100).min(), 2),
+        },
+        "trade_stats": detail_df,
+    }
+
+
+def _crossover_frame(seed: int, fast: int = 5, slow: int = 20) -> pd.DataFrame:
+    """Moving-average crossover signals; shift(1) leaves a NaN first row, as in the research script"""
+    bars = raw_bars(800, seed=seed).tz_localize(None)
+    above = bars['Close'].rolling(fast).mean() > bars['Close'].rolling(slow).mean()
+    crossed_up = above & ~above.shift(1, fill_value=False)
+    crossed_down = ~above & above.shift(1, fill_value=False)
+    frame = bars[['Open', 'High', 'Low', 'Close']].copy()
+    frame['LONG'] = crossed_up.shift(1)
+    frame['EXIT_LONG'] = crossed_down.shift(1)
+    frame['SHORT'] = crossed_down.shift(1)
+    frame['EXIT_SHORT'] = crossed_up.shift(1)
+    return frame
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('stop_loss_lvl', [None, -1, -2.5, -5])
+def test_matches_reference_loop(seed, stop_loss_lvl):
+    bt_df = _crossover_frame(seed)
+    result = run_stock_ta_backtest(bt_df, stop_loss_lvl)
+    expected = _reference_ta_backtest(bt_df, stop_loss_lvl)
+
+    pd.testing.assert_frame_equal(result['cum_ret_df'], expected['cum_ret_df'], check_exact=True)
+    assert result['max_drawdown'] == expected['max_drawdown']
+    pd.testing.assert_frame_equal(result['trade_stats'], expected['trade_stats'], check_exact=True,
+                                  check_index_type=False)
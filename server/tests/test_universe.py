@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.data_service import DataService
+from services.universe import RateLimiter, UniverseLoader
+from tests.conftest import synthetic_history
+from tests.synthetic import slice_fetcher
+
+T = pd.Timestamp
+
+
+def _loader(**overrides):
+    settings = {'batch_size': 50, 'max_workers': 2, 'requests_per_second': 0, 'retries': 3, 'backoff': 1.0}
+    settings.update(overrides)
+    return UniverseLoader(**settings)
+
+
+def _expected(ticker, start_date, end_date):
+    return slice_fetcher(synthetic_history(ticker))(ticker, start_date, end_date, '1d')
+
+
+def _assert_bars(frame, ticker, start_date, end_date):
+    expected = _expected(ticker, start_date, end_date)
+    assert len(frame) == len(expected) > 0
+    np.testing.assert_array_equal(frame['Close'].to_numpy(), expected['Close'].to_numpy())
+    np.testing.assert_array_equal(frame.index.tz_localize(None) if frame.index.tz else frame.index,
+                                  expected.index.tz_localize(None))
+
+
+def test_load_downloads_uncached_tickers_in_batches(offline_universe):
+    loader = _loader(batch_size=2)
+    bars = loader.load(['AAA', 'BBB', 'CCC', 'AAA'], '2015-01-01', '2016-01-01')
+    assert list(bars) == ['AAA', 'BBB', 'CCC']
+    for ticker, frame in bars.items():
+        _assert_bars(frame, ticker, '2015-01-01', '2016-01-01')
+    assert sorted(tickers for tickers, _, _ in offline_universe.downloads) == [['AAA', 'BBB'], ['CCC']]
+    assert {(start, end) for _, start, end in offline_universe.downloads} == {('2015-01-01', '2016-01-01')}
+    assert loader.failed == {}
+
+
+def test_missing_symbols_are_retried_with_backoff(offline_universe, offline_data):
+    loader = _loader(retries=3, backoff=0.5)
+    bars = loader.load(['AAA', 'BAD1'], '2015-01-01', '2016-01-01')
+    assert list(bars) == ['AAA']
+    assert loader.failed == {'BAD1': 'no data returned'}
+    assert [tickers for tickers, _, _ in offline_universe.downloads] == [['AAA', 'BAD1'], ['BAD1'], ['BAD1'], ['BAD1']]
+    assert offline_universe.sleeps == [0.5, 1.0, 2.0]
+    # No single-ticker fallback for a symbol nothing is known about
+    assert offline_data == []
+
+
+def test_failed_requests_report_the_last_error(offline_universe, monkeypatch):
+    def fail(tickers, start_date, end_date, interval):
+        raise ConnectionError('rate limited')
+
+    monkeypatch.setattr(UniverseLoader, '_download', staticmethod(fail))
+    loader = _loader(retries=1)
+    assert loader.load(['AAA'], '2015-01-01', '2016-01-01') == {}
+    assert loader.failed == {'AAA': 'rate limited'}
+
+
+def test_downloads_are_written_through_to_the_bar_cache(offline_universe, offline_data):
+    _loader().load(['AAA', 'BBB'], '2015-01-01', '2016-01-01')
+    bars = DataService.fetch_bars('BBB', '2015-03-01', '2015-09-01')
+    assert offline_data == []
+    np.testing.assert_array_equal(bars['close'].to_numpy(), _expected('BBB', '2015-03-01', '2015-09-01')['Close'])
+
+    # Covered tickers are read from the cache on the next load
+    downloads = len(offline_universe.downloads)
+    bars = _loader().load(['AAA', 'BBB'], '2015-02-01', '2015-12-01')
+    assert len(offline_universe.downloads) == downloads
+    _assert_bars(bars['AAA'], 'AAA', '2015-02-01', '2015-12-01')
+
+
+def test_a_gap_to_the_cached_range_is_downloaded_not_just_covered(offline_universe, offline_data):
+    DataService.fetch_bars('AAA', '2015-01-01', '2016-01-01')
+    offline_data.clear()
+
+    bars = _loader().load(['AAA', 'BBB'], '2017-01-01', '2018-01-01')
+    _assert_bars(bars['AAA'], 'AAA', '2017-01-01', '2018-01-01')
+    # AAA's request bridges the gap to its cache; BBB has none
+    assert sorted((tickers, start, end) for tickers, start, end in offline_universe.downloads) == [
+        (['AAA'], '2016-01-01', '2018-01-01'), (['BBB'], '2017-01-01', '2018-01-01')
+    ]
+
+    cached, covered_start, covered_end = DataService.bar_cache.load('AAA', '1d')
+    assert (covered_start, covered_end) == (T('2015-01-01'), T('2018-01-01'))
+    local_index = cached.index.tz_localize(None) if cached.index.tz else cached.index
+    in_2016 = (local_index >= T('2016-01-01')) & (local_index < T('2017-01-01'))
+    assert in_2016.sum() == len(_expected('AAA', '2016-01-01', '2017-01-01')) == 261
+
+    # 2016 is served from the cache afterwards
+    bars_2016 = DataService.fetch_bars('AAA', '2016-01-01', '2017-01-01')
+    assert offline_data == []
+    np.testing.assert_array_equal(bars_2016['close'].to_numpy(),
+                                  _expected('AAA', '2016-01-01', '2017-01-01')['Close'])
+
+
+def test_a_failed_range_of_a_cached_ticker_falls_back_to_a_single_download(offline_universe, offline_data,
+                                                                            monkeypatch):
+    DataService.fetch_bars('AAA', '2015-01-01', '2016-01-01')
+    offline_data.clear()
+
+    def fail(tickers, start_date, end_date, interval):
+        raise ConnectionError('timeout')
+
+    monkeypatch.setattr(UniverseLoader, '_download', staticmethod(fail))
+    loader = _loader(retries=0)
+    bars = loader.load(['AAA'], '2015-06-01', '2016-06-01')
+    assert loader.failed == {}
+    assert offline_data == [('AAA', '2016-01-01', '2016-06-01')]
+    _assert_bars(bars['AAA'], 'AAA', '2015-06-01', '2016-06-01')
+
+
+def test_load_bars_is_columnar(offline_universe):
+    bars = _loader().load_bars(['AAA', 'BAD1'], '2015-01-01', '2015-06-01')
+    assert list(bars) == ['AAA']
+    assert list(bars['AAA'].columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert bars['AAA'].index.tz is None
+
+
+def test_long_and_wide_frames(offline_universe):
+    frames = _loader().load(['AAA', 'BBB'], '2015-01-01', '2015-03-01')
+    long_frame = UniverseLoader.to_long_frame(frames)
+    assert len(long_frame) == len(frames['AAA']) + len(frames['BBB'])
+    assert set(long_frame['Symbol']) == {'AAA', 'BBB'}
+    closes = UniverseLoader.close_prices(frames)
+    assert list(closes.columns) == ['AAA', 'BBB']
+    assert closes['BBB'].dropna().tolist() == frames['BBB']['Close'].tolist()
+
+
+def test_rate_limiter_spaces_calls(offline_universe):
+    limiter = RateLimiter(4)
+    threads = [threading.Thread(target=limiter.wait) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # The first call goes straight through; the others wait for their own slot
+    assert sorted(offline_universe.sleeps) == pytest.approx([0.25 * k for k in range(1, 8)], abs=0.05)
+
+
+def test_rate_limiter_without_a_rate_never_waits(offline_universe):
+    limiter = RateLimiter(0)
+    for _ in range(5):
+        limiter.wait()
+    assert offline_universe.sleeps == []
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.walk_forward import WalkForwardService
+
+RANGES = {'period': [10, 20, 40], 'type': ['SMA', 'EMA']}
+
+
+@pytest.mark.parametrize('anchored', [False, True])
+def test_windows(anchored):
+    windows = WalkForwardService.windows(100, 40, 20, anchored=anchored)
+    assert [(w['test_start'], w['test_end']) for w in windows] == [(40, 60), (60, 80), (80, 100)]
+    assert [(w['train_start'], w['train_end']) for w in windows] == (
+        [(0, 40), (0, 60), (0, 80)] if anchored else [(0, 40), (20, 60), (40, 80)]
+    )
+
+
+def test_last_window_is_cut_at_the_final_bar():
+    windows = WalkForwardService.windows(105, 40, 20)
+    assert windows[-1] == {'train_start': 60, 'train_end': 100, 'test_start': 100, 'test_end': 105}
+    # A last test window of a single bar is dropped
+    assert WalkForwardService.windows(101, 40, 20)[-1]['test_end'] == 100
+
+
+def test_windows_with_a_shorter_step_overlap():
+    windows = WalkForwardService.windows(100, 40, 20, step=10)
+    assert [w['test_start'] for w in windows] == [40, 50, 60, 70, 80, 90]
+    assert windows[-1]['test_end'] == 100
+
+
+@pytest.mark.parametrize('args', [(100, 1, 20), (100, 40, 1), (100, 40, 20, -1)])
+def test_windows_reject_degenerate_sizes(args):
+    with pytest.raises(ValueError):
+        WalkForwardService.windows(*args)
+
+
+def _run(bars, **kwargs):
+    return WalkForwardService(max_workers=1).run_walk_forward(
+        'moving_average', 'AAA', '2015-01-01', '2017-01-01', train_bars=200, test_bars=100,
+        parameter_ranges=RANGES, bars=bars, **kwargs
+    )
+
+
+def test_folds_pick_the_best_train_window_parameters(bars):
+    service = WalkForwardService(max_workers=1)
+    result = _run(bars, objective='total_return')
+    strategy = service.backtest_service.strategy_service.create_strategy_instance('moving_average', {})
+    folds = result['walk_forward']['folds']
+    assert len(folds) == 4
+
+    dates = bars.index.strftime('%Y-%m-%d')
+    for fold in folds:
+        train = (dates >= fold['train_start']) & (dates <= fold['train_end'])
+        scores = []
+        for parameters in [{'period': p, 'type': t} for p in RANGES['period'] for t in RANGES['type']]:
+            position = strategy.__class__(parameters).generate_signals(bars)['position'].to_numpy()
+            metrics = service.backtest_service._execute_backtest_batch(
+                bars['close'].to_numpy()[train], position[train, None], 10000, 0.001
+            )
+            scores.append((metrics['total_return'].iloc[0], parameters))
+        best = max(scores, key=lambda score: score[0])
+        assert fold['parameters'] == best[1]
+        assert fold['train_metrics']['total_return'] == best[0]
+
+
+def test_stitched_equity_is_continuous_across_folds(bars):
+    result = _run(bars)
+    strategy_class = WalkForwardService().backtest_service.strategy_service._load_strategy('moving_average')
+    folds = result['walk_forward']['folds']
+    dates = bars.index.strftime('%Y-%m-%d')
+    assert result['dates'][0] == folds[0]['test_start']
+    assert result['dates'][-1] == folds[-1]['test_end']
+
+    # The out-of-sample positions are each fold's chosen set on its own test window
+    position = np.concatenate([
+        strategy_class(fold['parameters']).generate_signals(bars)['position'].to_numpy()[
+            (dates >= fold['test_start']) & (dates <= fold['test_end'])
+        ]
+        for fold in folds
+    ])
+    close = bars['close'].to_numpy()[dates >= folds[0]['test_start']]
+    returns = position[:-1] * (close[1:] / close[:-1] - 1) - np.abs(np.diff(position)) * 0.001
+    expected = 10000 * np.cumprod(1 + returns)
+    np.testing.assert_allclose(result['portfolio_value'][1:], expected)
+
+
+@pytest.mark.parametrize('exit_rules', [{'stop_loss': 1}, {'take_profit': 2, 'trailing_stop': 1.5}])
+def test_exit_rules_reach_every_fold(bars, exit_rules):
+    plain = _run(bars)
+    with_exits = _run(bars, exit_rules=exit_rules)
+    trades = pd.DataFrame(with_exits['trades'])
+    assert set(trades['exit_reason']) - {'signal'}
+    same_choice = [
+        (fold, plain_fold)
+        for fold, plain_fold in zip(with_exits['walk_forward']['folds'], plain['walk_forward']['folds'])
+        if fold['parameters'] == plain_fold['parameters']
+    ]
+    assert same_choice
+    for fold, plain_fold in same_choice:
+        assert fold['test_metrics'] != plain_fold['test_metrics']
+
+
+def test_unknown_exit_rule(bars):
+    with pytest.raises(ValueError, match='Unknown exit rules: stop'):
+        _run(bars, exit_rules={'stop': 1})
+
+
+def test_parallel_folds_match_serial(bars):
+    serial = _run(bars)
+    parallel = WalkForwardService(max_workers=2).run_walk_forward(
+        'moving_average', 'AAA', '2015-01-01', '2017-01-01', train_bars=200, test_bars=100,
+        parameter_ranges=RANGES, bars=bars
+    )
+    assert parallel['walk_forward'] == serial['walk_forward']
+    assert parallel['portfolio_value'][1:] == serial['portfolio_value'][1:]